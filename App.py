@@ -1,11 +1,26 @@
 import streamlit as st
-import google.generativeai as genai
-import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
+import time
 from datetime import datetime
-import json
-import os
+
+from athlete_pack import pack_inputs
+from batch_roster import (
+    ROSTER_MODULES, parse_roster, results_jsonl, results_zip, roster_jobs, roster_report,
+    roster_template_csv,
+)
+from generation import (
+    get_athlete_id, get_call_metrics, get_history_store, get_job_queue, get_model_router, get_plan_library,
+    get_rate_limiter, get_response_cache, get_semantic_cache, get_single_flight,
+    get_token_stats, submit_generation, submit_roster, timed_render,
+)
+from history_store import athlete_key
+from job_queue import DONE, FAILED
+from model_client import resolve_model
+from offline_plans import OFFLINE_MODEL_NAME, OfflineModel, is_offline_text, offline_forced
+from periodization import MAX_WEEKS, MIN_WEEKS, build_program, program_rows, stitch, week_inputs, week_prompt
+from plan_refinement import input_changes, refine_history, refinement_message, turn
+from prompt_registry import COACHING_MODULES, MAX_FREE_TEXT_CHARS, features_table
+from rate_limiter import PRIORITY_PACK
+from structured_plans import JSON_FORMAT, OUTPUT_FORMAT, is_structured
 
 
 st.set_page_config(
@@ -55,925 +70,782 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-if 'api_key_configured' not in st.session_state:
-    st.session_state.api_key_configured = False
+def connect_model():
+    """The Gemini model; raises with the reason CoachBot has to run offline."""
+    if offline_forced():
+        raise RuntimeError("offline mode is switched on (COACHBOT_OFFLINE).")
+    try:
+        api_key = st.secrets["GEMINI_API_KEY"]
+    except (KeyError, FileNotFoundError):
+        raise RuntimeError("there is no GEMINI_API_KEY in Streamlit secrets.")
+    return resolve_model(api_key)
 
 
+# While the API is down this fails fast: a failed probe is remembered for the whole process.
 try:
-    api_key = st.secrets["GEMINI_API_KEY"]
-    genai.configure(api_key=api_key)
-    
-    
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-    except:
-        try:
-            model = genai.GenerativeModel('gemini-pro')
-        except:
-            model = genai.GenerativeModel('gemini-1.0-pro')
-    
-    st.session_state.model = model
-    st.session_state.api_key_configured = True
-    st.session_state.temperature = 0.7  
-    st.session_state.model_name = model.model_name
+    model = connect_model()
+    st.session_state.offline_mode = False
 except Exception as e:
-    st.error(f"❌ Error: {str(e)}")
-    st.info("💡 Make sure you have a valid Gemini API key added to Streamlit secrets.")
-    st.session_state.api_key_configured = False
+    model = OfflineModel()
+    st.session_state.offline_mode = True
+    st.session_state.offline_reason = str(e)
+st.session_state.model = model
+st.session_state.model_name = model.model_name
+
+
+def render_input(spec):
+    if spec.widget == "selectbox":
+        return st.selectbox(spec.label, spec.options, key=spec.key)
+    if spec.widget == "multiselect":
+        return st.multiselect(spec.label, spec.options, key=spec.key)
+    if spec.widget == "slider":
+        return st.slider(spec.label, min_value=spec.min_value, max_value=spec.max_value,
+                         value=spec.default, key=spec.key)
+    if spec.widget == "number_input":
+        return st.number_input(spec.label, min_value=spec.min_value, max_value=spec.max_value,
+                               value=spec.default, key=spec.key)
+    if spec.widget == "text_area":
+        return st.text_area(spec.label, placeholder=spec.placeholder, max_chars=MAX_FREE_TEXT_CHARS,
+                            key=spec.key)
+    raise ValueError(f"Unknown widget type: {spec.widget}")
 
 
+def render_figures(figures):
+    # Local arithmetic, shown before (and regardless of) the model call.
+    items = list(figures.items())
+    for row in range(0, len(items), 3):
+        for column, (label, value) in zip(st.columns(3), items[row:row + 3]):
+            column.metric(label, value)
 
+
+def render_plan(structured, plan):
+    # Only structured answers need pandas, so it is imported here rather than at startup.
+    import pandas as pd
     
+    if plan.overview:
+        st.markdown(plan.overview)
+    for title, rows in structured.tables(plan).items():
+        if rows:
+            st.markdown(f"**{title}**")
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    title, data = structured.chart(plan)
+    if data:
+        st.markdown(f"**{title}**")
+        st.bar_chart(pd.DataFrame.from_dict(data, orient="index"))
+    for note in structured.notes(plan):
+        st.markdown(f"- {note}")
+
+
+def render_text(module, text, inputs=None):
+    """A JSON answer as tables and a chart, anything else as markdown."""
+    plan = None
+    if module is not None and module.structured is not None and is_structured(inputs):
+        plan = module.structured.load(text)
+    if plan is None:
+        st.markdown(text)
+    else:
+        render_plan(module.structured, plan)
 
 
+def render_result(module, text, inputs=None):
+    st.markdown(f'<div class="{module.box_class}">', unsafe_allow_html=True)
+    st.markdown(module.heading)
+    render_text(module, text, inputs)
+    st.markdown('</div>', unsafe_allow_html=True)
 
-if not st.session_state.api_key_configured:
-    st.warning("⚠️ Please add GEMINI_API_KEY to Streamlit secrets to continue.")
-else:
-    st.markdown('<div class="main-header">💪 CoachBot  - Your AI Personal Fitness Coach</div>', unsafe_allow_html=True)
-    st.markdown('<p style="text-align: center; font-size: 1.1rem;">Empowering young athletes with personalized, AI-powered coaching</p>', unsafe_allow_html=True)
+
+def render_job(module, job):
+    if job is None:
+        st.warning(f"{module.label} - this result has expired, please generate it again.")
+    elif job.status == DONE:
+        render_result(module, job.result)
+    elif job.status == FAILED:
+        st.error(f"Error generating {module.error_label}: {job.error}")
+        fallback = getattr(job.error, "fallback", None)
+        if fallback is not None:
+            render_result(module, fallback)
+    elif job.partial:
+        render_result(module, job.partial + "▌")
+    else:
+        st.info(f"⏳ {module.label} - generating...")
+
+
+@st.fragment(run_every=1.0)
+def render_job_progress(modules, job_ids):
+    # Polls the shared job queue while anything is still running; once
+    # everything has finished a full rerun collects the results.
+    jobs = [get_job_queue().get(job_id) for job_id in job_ids]
+    if all(job is None or job.finished for job in jobs):
+        st.rerun()
+    for module, job in zip(modules, jobs):
+        render_job(module, job)
+
+
+def render_roster_status(results, total):
+    st.progress(len(results) / total, text=f"{len(results)} / {total} plans")
+    if results:
+        st.dataframe([
+            {
+                "Athlete": r["athlete"],
+                "Plan": r["module"],
+                "Status": "❌ " + r["error"] if r["error"] else ("♻️ shared" if r["shared"] else "✅ done"),
+                "Latency (s)": r["latency_s"],
+            }
+            for r in results
+        ], hide_index=True)
+
+
+@st.fragment(run_every=1.0)
+def render_roster_progress(job_id, total):
+    # Like render_job_progress: a full rerun shows the report once the batch is done.
+    job = get_job_queue().get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    render_roster_status(list(job.partial or ()), total)
+
+
+def collect_result(module, pending, job):
+    """Move a finished job into the tab's stored result, with the chat turns that produced it."""
+    del st.session_state[f"{module.tab}_job"]
+    result = st.session_state[f"{module.tab}_result"] = {
+        "inputs": pending["inputs"],
+        "figures": pending["figures"],
+        "text": job.result,
+        "history": pending["history"] + [turn("user", pending["prompt"]), turn("model", job.result)],
+    }
+    return result
+
+
+def render_module_body(module):
+    st.markdown(f'<div class="sub-header">{module.sub_header}</div>', unsafe_allow_html=True)
     
+    columns = st.columns(module.column_count) if module.column_count else []
+    inputs = {}
+    for spec in module.inputs:
+        if spec.column is None:
+            inputs[spec.name] = render_input(spec)
+        else:
+            with columns[spec.column]:
+                inputs[spec.name] = render_input(spec)
+    if module.structured is not None and st.toggle("Structured plan (tables & charts)",
+                                                   key=f"{module.tab}_structured"):
+        inputs[OUTPUT_FORMAT] = JSON_FORMAT
     
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11 = st.tabs([
-        "🏋️ Workout Plan", "🏥 Recovery", "🎯 Tactical Tips", "🥗 Nutrition Guide", 
-        "🔥 Warm-up/Cool-down", "🧠 Mental Training", "💧 Hydration", "👁️ Visualization",
-        "📍 Position Drills", "🧘 Mobility", "📊 Dashboard"
-    ])
+    result_key = f"{module.tab}_result"
+    job_key = f"{module.tab}_job"
+    pending = st.session_state.get(job_key)
+    job = get_job_queue().get(pending["id"]) if pending is not None else None
+    if job is not None and job.status == DONE:
+        collect_result(module, pending, job)
     
+    result = st.session_state.get(result_key)
+    changes = input_changes(module, result["inputs"], inputs) if result is not None else []
+    if st.button(module.button, key=f"{module.tab}_generate"):
+        prompt, prompt_ms = timed_render(module, inputs)
+        st.session_state[job_key] = {
+            "id": submit_generation(module, inputs, prompt, prompt_ms),
+            "inputs": inputs,
+            "figures": module.calculate(inputs),
+            "prompt": prompt,
+            "history": [],
+        }
+    elif changes and st.button(f"Refine plan ({len(changes)} change{'s' if len(changes) > 1 else ''})",
+                               key=f"{module.tab}_refine",
+                               help="Send only the changed inputs and update the current plan"):
+        message = refinement_message(module, result["inputs"], inputs, changes)
+        history = refine_history(module, result)
+        st.session_state[job_key] = {
+            "id": submit_generation(module, inputs, message, history=history),
+            "inputs": inputs,
+            "figures": module.calculate(inputs),
+            "prompt": message,
+            "history": history,
+        }
+    
+    pending = st.session_state.get(job_key)
+    if pending is not None:
+        job = get_job_queue().get(pending["id"])
+        if job is not None and not job.finished:
+            if pending["figures"]:
+                render_figures(pending["figures"])
+            render_job_progress([module], [pending["id"]])
+            return
+        if job is not None and job.status == DONE:
+            # Finished since the top of this run.
+            result = collect_result(module, pending, job)
+        else:
+            del st.session_state[job_key]
+            if pending["figures"]:
+                render_figures(pending["figures"])
+            render_job(module, job)
+            return
+    
+    if result is not None:
+        # Keep the last plan on screen across reruns instead of asking for it again.
+        if result["inputs"] != inputs:
+            st.caption("The inputs have changed since this plan was generated.")
+        if result["figures"]:
+            render_figures(result["figures"])
+        render_result(module, result["text"], result["inputs"])
 
-    with tab1:
-        st.markdown('<div class="sub-header">🏋️ Full-Body Workout Plan Generator</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            sport = st.selectbox("Select Sport", [
-                "Football", "Cricket", "Basketball", "Tennis", 
-                "Athletics", "Swimming", "Volleyball", "Hockey", "Rugby", "Other"
-            ], key="tab1_sport")
-            position = st.selectbox("Player Position", [
-                "Striker/Forward", "Midfielder", "Defender", "Goalkeeper",
-                "Bowler", "Batsman", "Wicket Keeper", "All-rounder",
-                "Point Guard", "Shooting Guard", "Center", "Power Forward", "Small Forward",
-                "Sprinter", "Distance Runner", "Jumper", "Thrower",
-                "General Athlete"
-            ], key="tab1_position")
-        
-        with col2:
-            fitness_level = st.selectbox("Fitness Level", ["Beginner", "Intermediate", "Advanced"], key="tab1_fitness")
-            training_days = st.slider("Training Days per Week", min_value=3, max_value=7, value=4, key="tab1_days")
-            session_duration = st.slider("Session Duration (minutes)", min_value=30, max_value=120, value=60, key="tab1_duration")
-        
-        injuries = st.text_area("Current Injuries or Problem Areas (leave blank if none)", 
-                               placeholder="e.g., ankle sprain, shoulder strain, knee pain...",
-                               key="tab1_injuries")
-        
-        if st.button("Generate Workout Plan", key="tab1_generate"):
-            with st.spinner("Creating your personalized workout plan..."):
-                prompt = f"""
-                Act as an expert sports coach and create a comprehensive full-body workout plan for a {position} in {sport}.
-                
-                Athlete Profile:
-                - Fitness Level: {fitness_level}
-                - Training Days: {training_days} days/week
-                - Session Duration: {session_duration} minutes
-                - Injuries/Concerns: {injuries if injuries else 'None - fully healthy'}
-                
-                Requirements:
-                1. Create a structured weekly plan with specific exercises for each training day
-                2. Include sets, reps, and rest periods
-                3. Focus on position-specific skills and conditioning
-                4. Modify exercises to accommodate any injuries
-                5. Include progressive overload principles
-                6. Provide clear instructions for each exercise
-                7. Add intensity scales (RPE) for each session
-                8. Response should be around 250-300 words
-                9.Table is must in the workout plan
-                
-                
-                Format the output in a clear, organized structure with weekly overview and daily breakdowns.
-                Include safety warnings where applicable.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=st.session_state.temperature,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.markdown("### 📋 Your Personalized Workout Plan")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating workout plan: {e}")
-    
-
-    with tab2:
-        st.markdown('<div class="sub-header">🏥 Safe Recovery Training Schedule</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            injury_type = st.selectbox("Type of Injury", [
-                "None - General Recovery", "Knee Injury", "Ankle Sprain", "Shoulder Injury",
-                "Hamstring Strain", "Lower Back Pain", "Wrist/Elbow Injury", "Concussion Recovery",
-                "Muscle Strain", "Joint Pain", "Post-Surgery Recovery"
-            ], key="tab2_injury")
-            recovery_phase = st.selectbox("Recovery Phase", [
-                "Acute Phase (0-72 hours)", "Sub-Acute Phase (3-14 days)", 
-                "Remodeling Phase (2-6 weeks)", "Return to Sport Phase"
-            ], key="tab2_phase")
-        
-        with col2:
-            sport_focus = st.selectbox("Sport Focus", [
-                "Football", "Cricket", "Basketball", "Tennis", "Athletics", "Swimming", "Other"
-            ], key="tab2_sport")
-            recovery_goal = st.selectbox("Primary Goal", [
-                "Maintain Fitness", "Regain Mobility", "Strengthen Weak Areas",
-                "Return to Play Prep", "Prevent Re-injury"
-            ], key="tab2_goal")
-        
-        activity_level = st.text_area("Current Activity Level", 
-                                     placeholder="e.g., can walk 20 mins, light jogging possible...",
-                                     key="tab2_activity")
-        
-        if st.button("Generate Recovery Plan", key="tab2_generate"):
-            with st.spinner("Designing your safe recovery program..."):
-                prompt = f"""
-                Act as a sports physical therapist and create a safe, progressive recovery training schedule.
-                
-                Athlete Profile:
-                - Injury: {injury_type}
-                - Recovery Phase: {recovery_phase}
-                - Sport: {sport_focus}
-                - Recovery Goal: {recovery_goal}
-                - Current Activity: {activity_level if activity_level else 'Standard for this phase'}
-                
-                Requirements:
-                1. Create a phased recovery plan with clear progression criteria
-                2. Include mobility, strengthening, and conditioning exercises
-                3. Specify exercises to AVOID at this stage
-                4. Provide RPE (Rate of Perceived Exertion) guidelines
-                5. Include daily pain monitoring recommendations
-                6. Add signs to watch for that require medical attention
-                7. Suggest cross-training activities that are safe
-                8. Include timeline for progression to next phase
-                9. Response should be around 200-250 words
-                
-                Prioritize safety and gradual progression. Include specific exercises with modifications.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=0.5,  # Slightly lower for safety
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="warning-box">', unsafe_allow_html=True)
-                    st.markdown("### 🩺 Your Recovery Training Schedule")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating recovery plan: {e}")
-    
-
-    with tab3:
-        st.markdown('<div class="sub-header">🎯 Tactical Coaching Tips</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            sport_tactical = st.selectbox("Sport for Tactical Advice", [
-                "Football", "Cricket", "Basketball", "Tennis", "Volleyball", "Hockey"
-            ], key="tab3_sport")
-            position_tactical = st.selectbox("Position", [
-                "Striker/Forward", "Midfielder", "Defender", "Goalkeeper",
-                "Bowler", "Batsman", "Wicket Keeper", "All-rounder",
-                "Point Guard", "Shooting Guard", "Center", "Power Forward", "Small Forward",
-                "General Player"
-            ], key="tab3_position")
-        
-        with col2:
-            skill_focus = st.selectbox("Skill to Improve", [
-                "Decision Making", "Positioning", "Game Awareness", "Communication",
-                "Defensive Tactics", "Attacking Strategy", "Team Play", "Set Pieces",
-                "Mental Game", "Pressure Situations"
-            ], key="tab3_skill")
-            experience_level = st.selectbox("Experience Level", ["Youth (Under 14)", "Junior (14-18)", "College", "Semi-Pro"], key="tab3_experience")
-        
-        match_situation = st.text_area("Specific Match Situations", 
-                                      placeholder="e.g., defending a lead, playing against stronger opponents...",
-                                      key="tab3_situation")
-        
-        if st.button("Generate Tactical Tips", key="tab3_generate"):
-            with st.spinner("Analyzing tactical strategies..."):
-                prompt = f"""
-                Act as an expert tactical coach and provide advanced tactical coaching tips.
-                
-                Athlete Profile:
-                - Sport: {sport_tactical}
-                - Position: {position_tactical}
-                - Skill Focus: {skill_focus}
-                - Experience Level: {experience_level}
-                - Specific Situations: {match_situation if match_situation else 'General gameplay'}
-                
-                Requirements:
-                1. Provide 5-7 specific tactical tips for the chosen skill
-                2. Include game scenarios where these apply
-                3. Suggest drills to practice each tactical element
-                4. Explain the 'why' behind each tactic (tactical reasoning)
-                5. Include communication cues for teammates
-                6. Add common mistakes to avoid
-                7. Provide progression from practice to match application
-                8. Response should be around 200-250 words
-                Make the tips practical, actionable, and appropriate for the experience level.
-                Use coaching language that motivates and educates.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=st.session_state.temperature,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="info-box">', unsafe_allow_html=True)
-                    st.markdown("### 🧠 Your Tactical Coaching Tips")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating tactical tips: {e}")
-    
-
-    with tab4:
-        st.markdown('<div class="sub-header">🥗 Personalized Nutrition Guide</div>', unsafe_allow_html=True)
-        
+
+@st.fragment
+def render_module(module):
+    # A fragment: changing this tab's widgets reruns only this function, not the whole app.
+    render_module_body(module)
+
+
+@st.fragment
+def render_workout(module):
+    # The program section reads the Workout Plan inputs, so it reruns with them.
+    render_module_body(module)
+    st.divider()
+    render_program(module)
+
+
+@st.fragment(run_every=1.0)
+def render_program_progress(job_ids):
+    jobs = [get_job_queue().get(job_id) for job_id in job_ids]
+    finished = sum(1 for job in jobs if job is None or job.finished)
+    if finished == len(jobs):
+        st.rerun()
+    st.progress(finished / len(jobs), text=f"⏳ {finished} of {len(jobs)} weeks written...")
+
+
+@st.fragment
+def render_program(module):
+    st.markdown('<div class="sub-header">📆 Multi-Week Program</div>', unsafe_allow_html=True)
+    st.caption("Periodize the settings above into an 8-12 week program. "
+               "The block structure is worked out instantly; every week is then written in parallel.")
+    
+    # The Workout Plan widgets above are keyed, so their current values are in session state.
+    inputs = {spec.name: st.session_state.get(spec.key, spec.default) for spec in module.inputs}
+    weeks = st.slider("Program Length (weeks)", min_value=MIN_WEEKS, max_value=MAX_WEEKS, value=MIN_WEEKS,
+                      key="tab1_program_weeks")
+    program = build_program(inputs["fitness_level"], inputs["training_days"], inputs["session_duration"], weeks)
+    with st.expander("Periodization overview"):
+        st.dataframe(program_rows(program), use_container_width=True, hide_index=True)
+    
+    if st.button("Generate Program", key="tab1_program_generate"):
+        st.session_state.tab1_program = {
+            "inputs": dict(inputs, program_weeks=weeks),
+            "program": program,
+            "jobs": [
+                submit_generation(module, week_inputs(inputs, week, weeks), week_prompt(module, inputs, week, weeks),
+                                  priority=PRIORITY_PACK, save_history=False)
+                for week in program
+            ],
+            "started": time.time(),
+        }
+    
+    pending = st.session_state.get("tab1_program")
+    if pending is not None:
+        jobs = [get_job_queue().get(job_id) for job_id in pending["jobs"]]
+        if not all(job is None or job.finished for job in jobs):
+            render_program_progress(pending["jobs"])
+            return
+        del st.session_state.tab1_program
+        texts = [job.result if job is not None and job.status == DONE else None for job in jobs]
+        text = stitch(pending["program"], texts)
+        if None not in texts:
+            model_name = (OFFLINE_MODEL_NAME if any(is_offline_text(week) for week in texts)
+                          else st.session_state.model_name)
+            get_history_store().save(get_athlete_id(), module.tab, pending["inputs"], text, model_name)
+        finished = max([job.finished_at for job in jobs if job is not None] or [pending["started"]])
+        st.session_state.tab1_program_result = {
+            "weeks": len(pending["program"]),
+            "text": text,
+            "failed": texts.count(None),
+            "seconds": finished - pending["started"],
+        }
+    
+    result = st.session_state.get("tab1_program_result")
+    if result is not None:
+        if result["failed"]:
+            st.error(f"{result['failed']} of {result['weeks']} weeks could not be generated; "
+                     "generate the program again to retry.")
+        st.markdown('<div class="success-box">', unsafe_allow_html=True)
+        st.markdown(f"### 📆 Your {result['weeks']}-Week Program")
+        st.markdown(result["text"])
+        st.markdown('</div>', unsafe_allow_html=True)
+        st.caption(f"Generated {result['weeks']} weeks in {result['seconds']:.1f}s")
+        st.download_button("Download program", result["text"], file_name="training_program.md",
+                           mime="text/markdown", key="tab1_program_download")
+
+
+if st.session_state.offline_mode:
+    st.warning(f"⚡ Offline mode: {st.session_state.offline_reason} Plans come from saved answers, the "
+               "precomputed plan library and CoachBot's built-in rules, and are labelled as offline plans. "
+               "Add a valid GEMINI_API_KEY to Streamlit secrets for plans written by the AI coach.")
+
+st.markdown('<div class="main-header">💪 CoachBot  - Your AI Personal Fitness Coach</div>', unsafe_allow_html=True)
+st.markdown('<p style="text-align: center; font-size: 1.1rem;">Empowering young athletes with personalized, AI-powered coaching</p>', unsafe_allow_html=True)
+
+
+st.text_input("Athlete name or ID", key="athlete_id",
+              placeholder="Enter your name to keep your plans across visits")
+
+modules = list(COACHING_MODULES.values())
+*coaching_tabs, tab11, tab12, tab13, tab14 = st.tabs(
+    [module.label for module in modules] + ["📊 Dashboard", "📦 Full Pack", "👥 Squad Batch", "🗂️ My History"],
+    key="active_tab", on_change="rerun"
+)
+
+for module, module_tab in zip(modules, coaching_tabs):
+    with module_tab:
+        if module.tab == "tab1":
+            render_workout(module)
+        else:
+            render_module(module)
+
+
+with tab11:
+    # Only build the Dashboard (and import pandas) when it is the open tab.
+    if tab11.open:
+        st.markdown('<div class="sub-header">📊 CoachBot Dashboard</div>', unsafe_allow_html=True)
+    
+    
+        st.subheader("📈 Session Overview")
+    
         col1, col2, col3 = st.columns(3)
         with col1:
-            age = st.number_input("Age", min_value=10, max_value=25, value=15, key="tab4_age")
-            gender = st.selectbox("Gender", ["Male", "Female"], key="tab4_gender")
-            weight = st.number_input("Weight (kg)", min_value=30, max_value=120, value=60, key="tab4_weight")
-        
+            st.metric("Active Features", "10+ Coaching Modules")
         with col2:
-            height = st.number_input("Height (cm)", min_value=120, max_value=210, value=170, key="tab4_height")
-            diet_type = st.selectbox("Diet Type", ["Non-Vegetarian", "Vegetarian", "Vegan", "Eggetarian"], key="tab4_diet")
-            activity_level_nutrition = st.selectbox("Daily Activity Level", [
-                "Light (1-2 training sessions)", "Moderate (3-4 sessions)", 
-                "Heavy (5-6 sessions)", "Very Heavy (Daily + Competition)"
-            ], key="tab4_activity")
-        
+            st.metric("Sports Supported", "10+ Sports")
         with col3:
-            calorie_goal = st.selectbox("Calorie Goal", [
-                "Maintain Weight", "Build Muscle", "Lose Fat", "Performance Optimization"
-            ], key="tab4_calorie")
-            allergies = st.text_area("Food Allergies/Restrictions", 
-                                   placeholder="e.g., lactose intolerance, nut allergy...",
-                                   key="tab4_allergies")
-            sport_nutrition = st.selectbox("Primary Sport", [
-                "Football", "Cricket", "Basketball", "Athletics", "Swimming", "Tennis", "Other"
-            ], key="tab4_sport")
-        
-        if st.button("Generate Nutrition Plan", key="tab4_generate"):
-            with st.spinner("Creating your personalized nutrition guide..."):
-                prompt = f"""
-                Act as a sports nutritionist and create a comprehensive week-long nutrition guide.
-                
-                Athlete Profile:
-                - Age: {age}, Gender: {gender}
-                - Weight: {weight}kg, Height: {height}cm
-                - Diet Type: {diet_type}
-                - Activity Level: {activity_level_nutrition}
-                - Calorie Goal: {calorie_goal}
-                - Primary Sport: {sport_nutrition}
-                - Allergies/Restrictions: {allergies if allergies else 'None'}
-                
-                Requirements:
-                1. Calculate and display daily calorie and macronutrient needs
-                2. Create a detailed 7-day meal plan (breakfast, lunch, dinner, snacks)
-                3. Include pre-training and post-training nutrition recommendations
-                4. Suggest meal timing strategies around training sessions
-                5. Provide hydration guidelines
-                6. Include recovery nutrition tips
-                7. Suggest healthy snack options
-                8. Add supplement recommendations (if appropriate for age)
-                9. Include portion sizes and preparation tips
-                10. Response should be around 200-250 words
-                
-                All recommendations must be age-appropriate and safe for youth athletes.
-                Focus on whole foods and balanced nutrition.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=st.session_state.temperature,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.markdown("### 🍽️ Your Personalized Nutrition Guide")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating nutrition plan: {e}")
-    
-
-    with tab5:
-        st.markdown('<div class="sub-header">🔥 Warm-up & Cool-down Routines</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            sport_warmup = st.selectbox("Sport", [
-                "Football", "Cricket", "Basketball", "Tennis", "Athletics", "Swimming", "Volleyball"
-            ], key="tab5_sport")
-            routine_type = st.selectbox("Routine Type", [
-                "Pre-Training Warm-up", "Pre-Match Warm-up", "Post-Training Cool-down", 
-                "Post-Match Cool-down", "Rest Day Active Recovery"
-            ], key="tab5_routine")
-        
-        with col2:
-            position_warmup = st.selectbox("Position", [
-                "Striker/Forward", "Midfielder", "Defender", "Goalkeeper",
-                "Bowler", "Batsman", "All-rounder", "General Player"
-            ], key="tab5_position")
-            available_time = st.slider("Available Time (minutes)", min_value=5, max_value=30, value=10, key="tab5_time")
-        
-        focus_areas = st.multiselect("Focus Areas", [
-            "Dynamic Stretching", "Mobility", "Injury Prevention", 
-            "Activation", "Flexibility", "Relaxation", "Breathing"
-        ], key="tab5_focus")
-        
-        if st.button("Generate Routines", key="tab5_generate"):
-            with st.spinner("Creating your warm-up/cool-down routine..."):
-                prompt = f"""
-                Act as a sports performance coach and create personalized warm-up/cool-down routines.
-                
-                Session Details:
-                - Sport: {sport_warmup}
-                - Position: {position_warmup}
-                - Routine Type: {routine_type}
-                - Available Time: {available_time} minutes
-                - Focus Areas: {', '.join(focus_areas) if focus_areas else 'Comprehensive'}
-                
-                Requirements:
-                1. Create a structured routine fitting within the time limit
-                2. Include specific exercises with clear instructions
-                3. Specify duration for each exercise
-                4. Include variations for different fitness levels
-                5. Explain the purpose of each exercise
-                6. Add safety cues and common mistakes to avoid
-                7. Include breathing techniques where applicable
-                8. Provide modifications for any sensitive areas
-                9. Response should be around 200-250 words
-                Make the routine practical and easy to follow. Use bullet points and clear numbering.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=0.6,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="info-box">', unsafe_allow_html=True)
-                    st.markdown("### 🏃 Your Warm-up/Cool-down Routine")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating routine: {e}")
-    
-
-    with tab6:
-        st.markdown('<div class="sub-header">🧠 Mental Training & Focus Routines</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            mental_goal = st.selectbox("Mental Training Goal", [
-                "Tournament Preparation", "Match Day Focus", "Overcoming Anxiety",
-                "Building Confidence", "Handling Pressure", "Staying Motivated",
-                "Recovery from Poor Performance", "Concentration Improvement"
-            ], key="tab6_goal")
-            sport_mental = st.selectbox("Sport", [
-                "Football", "Cricket", "Basketball", "Tennis", "Athletics", "Swimming"
-            ], key="tab6_sport")
-        
-        with col2:
-            upcoming_event = st.selectbox("Upcoming Event Type", [
-                "Tournament", "Important Match", "Championship", 
-                "Regular Season Game", "Training Camp", "No Specific Event"
-            ], key="tab6_event")
-            time_to_event = st.selectbox("Time to Event", [
-                "Today (Game Day)", "1-3 Days", "1 Week", "2-4 Weeks", "Off-Season"
-            ], key="tab6_time")
-        
-        current_challenges = st.text_area("Current Mental Challenges", 
-                                         placeholder="e.g., nervousness before games, losing focus during matches...",
-                                         key="tab6_challenges")
-        
-        if st.button("Generate Mental Training Program", key="tab6_generate"):
-            with st.spinner("Designing your mental training program..."):
-                prompt = f"""
-                Act as a sports psychologist and create a comprehensive mental training program.
-                
-                Athlete Profile:
-                - Mental Goal: {mental_goal}
-                - Sport: {sport_mental}
-                - Upcoming Event: {upcoming_event}
-                - Time to Event: {time_to_event}
-                - Current Challenges: {current_challenges if current_challenges else 'None specified'}
-                
-                Requirements:
-                1. Provide daily mental training exercises
-                2. Include visualization techniques specific to the sport
-                3. Suggest breathing and relaxation methods
-                4. Create pre-performance routines
-                5. Provide positive self-talk affirmations
-                6. Include goal-setting strategies
-                7. Add techniques for managing pressure and anxiety
-                8. Provide recovery mental practices
-                9. Include progress tracking methods
-                10. Response should be around 200-250 words 
-                Make the program practical and age-appropriate for young athletes.
-                Include specific examples and scenarios.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=st.session_state.temperature,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="info-box">', unsafe_allow_html=True)
-                    st.markdown("### 🧘 Your Mental Training Program")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating mental training: {e}")
-    
-    
-    with tab7:
-        st.markdown('<div class="sub-header">💧 Hydration & Electrolyte Strategy</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
+            st.metric("User Age Range", "10-25 Years")
+    
+        cache_stats = get_response_cache().stats()
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            sport_hydration = st.selectbox("Primary Sport", [
-                "Football", "Cricket", "Basketball", "Tennis", "Athletics", "Swimming"
-            ], key="tab7_sport")
-            training_duration = st.slider("Typical Training Duration (minutes)", 
-                                       min_value=30, max_value=180, value=90, key="tab7_duration")
-        
+            st.metric("Cache Hits", cache_stats["hits"])
         with col2:
-            climate = st.selectbox("Training Climate", [
-                "Cool (Under 15°C)", "Moderate (15-25°C)", 
-                "Warm (25-30°C)", "Hot (30°C+)", "Humid"
-            ], key="tab7_climate")
-            sweat_rate = st.selectbox("Sweat Rate", ["Low", "Moderate", "High", "Very High"], key="tab7_sweat")
-        
-        if st.button("Generate Hydration Plan", key="tab7_generate"):
-            with st.spinner("Creating your hydration strategy..."):
-                prompt = f"""
-                Act as a sports nutritionist specializing in hydration and electrolyte management.
-                
-                Athlete Profile:
-                - Sport: {sport_hydration}
-                - Training Duration: {training_duration} minutes
-                - Climate: {climate}
-                - Sweat Rate: {sweat_rate}
-                
-                Requirements:
-                1. Calculate daily hydration needs (in liters)
-                2. Create a pre-training hydration protocol
-                3. Design during-training hydration schedule
-                4. Provide post-training rehydration guidelines
-                5. Explain electrolyte replacement needs
-                6. Suggest natural electrolyte sources
-                7. Include signs of dehydration to watch for
-                8. Provide hydration for different weather conditions
-                9. Create a daily hydration timeline
-                10. Add tips for carrying and consuming fluids during matches
-                11. Response should be around 200-250 words 
-                Make recommendations practical for young athletes. Include timing and quantities.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=0.6,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.markdown("### 💧 Your Hydration Strategy")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating hydration plan: {e}")
-    
-
-    with tab8:
-        st.markdown('<div class="sub-header">👁️ Pre-Match Visualization Techniques</div>', unsafe_allow_html=True)
+            st.metric("Cache Misses", cache_stats["misses"])
+        with col3:
+            st.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        with col4:
+            st.metric("Cached Responses", cache_stats["entries"])
         
-        col1, col2 = st.columns(2)
+        library_stats = get_plan_library().stats()
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            sport_viz = st.selectbox("Sport", [
-                "Football", "Cricket", "Basketball", "Tennis", "Athletics", "Swimming"
-            ], key="tab8_sport")
-            position_viz = st.selectbox("Position", [
-                "Striker/Forward", "Midfielder", "Defender", "Goalkeeper",
-                "Bowler", "Batsman", "Wicket Keeper", "All-rounder",
-                "General Player"
-            ], key="tab8_position")
-        
+            st.metric("Precomputed Plans", library_stats["plans"])
         with col2:
-            match_importance = st.selectbox("Match Importance", [
-                "Regular Season", "Tournament Game", "Championship Final", 
-                "Qualifying Match", "Friendly"
-            ], key="tab8_importance")
-            viz_preference = st.selectbox("Visualization Focus", [
-                "Performance Skills", "Confidence Building", "Handling Pressure",
-                "Specific Scenarios", "Complete Match Day Experience"
-            ], key="tab8_preference")
-        
-        specific_scenarios = st.text_area("Specific Scenarios to Visualize", 
-                                          placeholder="e.g., taking penalty kick, facing fast bowling, last minute defense...",
-                                          key="tab8_scenarios")
-        
-        if st.button("Generate Visualization Guide", key="tab8_generate"):
-            with st.spinner("Creating your visualization program..."):
-                prompt = f"""
-                Act as a sports psychology expert specializing in visualization and imagery.
-                
-                Athlete Profile:
-                - Sport: {sport_viz}
-                - Position: {position_viz}
-                - Match Importance: {match_importance}
-                - Visualization Focus: {viz_preference}
-                - Specific Scenarios: {specific_scenarios if specific_scenarios else 'General match situations'}
-                
-                Requirements:
-                1. Create a 10-15 minute pre-match visualization script
-                2. Include guided imagery for key game moments
-                3. Incorporate all senses (sight, sound, touch, feeling)
-                4. Provide visualization for success scenarios
-                5. Include techniques for managing unexpected situations
-                6. Add breathing and relaxation components
-                7. Create a match-day visualization timeline
-                8. Include quick 2-3 minute visualization options
-                9. Provide tips for effective visualization practice
-                10. Add confidence-building visualization exercises
-                12. Response should be around 200-250 words
-                Write the visualization script in first person, guiding the athlete through each step.
-                Make it engaging and emotionally positive.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=st.session_state.temperature,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="info-box">', unsafe_allow_html=True)
-                    st.markdown("### 🎯 Your Visualization Guide")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating visualization guide: {e}")
-    
- 
-    with tab9:
-        st.markdown('<div class="sub-header">📍 Position-Specific Decision Drills</div>', unsafe_allow_html=True)
+            st.metric("Library Hits", library_stats["hits"])
+        with col3:
+            st.metric("Library Hit Rate", f"{library_stats['hit_rate']:.0%}")
+        with col4:
+            st.metric("Stale Plans", library_stats["stale"],
+                      help="Built for an older prompt template; regenerated in the background.")
         
-        col1, col2 = st.columns(2)
+        flight_stats = get_single_flight().stats()
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            sport_drill = st.selectbox("Sport", [
-                "Football", "Cricket", "Basketball", "Tennis", "Volleyball", "Hockey"
-            ], key="tab9_sport")
-            position_drill = st.selectbox("Position", [
-                "Striker/Forward", "Midfielder", "Defender", "Goalkeeper",
-                "Bowler", "Batsman", "Wicket Keeper", "All-rounder",
-                "Point Guard", "Shooting Guard", "Center", "Power Forward", "Small Forward"
-            ], key="tab9_position")
-        
+            st.metric("Model Calls (deduplicated)", flight_stats["leaders"])
         with col2:
-            decision_area = st.selectbox("Decision Area", [
-                "Game Situations", "Positioning", "Timing", "Communication",
-                "Under Pressure", "Transitional Play", "Set Pieces", "Team Tactics"
-            ], key="tab9_area")
-            skill_level_drill = st.selectbox("Skill Level", ["Beginner", "Intermediate", "Advanced"], key="tab9_level")
-        
-        if st.button("Generate Decision Drills", key="tab9_generate"):
-            with st.spinner("Creating position-specific drills..."):
-                prompt = f"""
-                Act as an expert tactical coach and design position-specific decision-making drills.
-                
-                Athlete Profile:
-                - Sport: {sport_drill}
-                - Position: {position_drill}
-                - Decision Area: {decision_area}
-                - Skill Level: {skill_level_drill}
-                
-                Requirements:
-                1. Create 5-7 progressive decision-making drills
-                2. Each drill should include:
-                   - Clear setup and equipment needed
-                   - Specific objectives
-                   - Step-by-step instructions
-                   - Decision points to focus on
-                   - Progressions and variations
-                   - Coaching cues and feedback points
-                3. Include individual and team drill options
-                4. Add time requirements and space needs
-                5. Include scoring or measurement methods
-                6. Provide common mistakes and corrections
-                7. Add competitive elements where appropriate
-                8. Response should be around 200-250 words 
-                Focus on developing quick, smart decisions in game-like situations.
-                Make drills engaging and challenging for the skill level.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=st.session_state.temperature,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="info-box">', unsafe_allow_html=True)
-                    st.markdown("### 🏟️ Your Position-Specific Drills")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating drills: {e}")
-    
-    with tab10:
-        st.markdown('<div class="sub-header">🧘 Mobility & Recovery Workouts</div>', unsafe_allow_html=True)
+            st.metric("Coalesced Requests", flight_stats["coalesced"])
+        with col3:
+            st.metric("Coalescing Timeouts", flight_stats["timeouts"])
+        with col4:
+            st.metric("In Flight", flight_stats["in_flight"])
         
-        col1, col2 = st.columns(2)
+        limiter_stats = get_rate_limiter().stats()
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            mobility_focus = st.selectbox("Mobility Focus", [
-                "Full Body", "Lower Body", "Upper Body", "Spine & Core",
-                "Hip Mobility", "Shoulder Mobility", "Ankle & Foot", "Post-Injury Recovery"
-            ], key="tab10_focus")
-            mobility_goal = st.selectbox("Primary Goal", [
-                "Improve Flexibility", "Reduce Muscle Tension", "Enhance Range of Motion",
-                "Injury Prevention", "Recovery After Training", "Joint Health"
-            ], key="tab10_goal")
-        
+            st.metric("Queued Requests", limiter_stats["queue_depth"])
         with col2:
-            time_available = st.slider("Time Available (minutes)", min_value=10, max_value=60, value=20, key="tab10_time")
-            equipment = st.multiselect("Available Equipment", [
-                "None (Bodyweight only)", "Resistance Bands", "Foam Roller",
-                "Yoga Mat", "Medicine Ball", "Pilates Ball"
-            ], key="tab10_equipment")
-        
-        injury_history_mobility = st.text_area("Relevant Injury History", 
-                                              placeholder="e.g., past ankle injury, tight hamstrings, shoulder issues...",
-                                              key="tab10_injury")
-        
-        if st.button("Generate Mobility Program", key="tab10_generate"):
-            with st.spinner("Creating your mobility program..."):
-                prompt = f"""
-                Act as a sports physiotherapist and create a comprehensive mobility and recovery workout.
-                
-                Session Details:
-                - Focus Area: {mobility_focus}
-                - Primary Goal: {mobility_goal}
-                - Time Available: {time_available} minutes
-                - Equipment: {', '.join(equipment) if equipment else 'Bodyweight only'}
-                - Injury History: {injury_history_mobility if injury_history_mobility else 'None'}
-                
-                Requirements:
-                1. Create a structured mobility session fitting the time limit
-                2. Include dynamic and static mobility exercises
-                3. Specify duration and repetitions for each exercise
-                4. Provide clear instructions and technique cues
-                5. Include breathing techniques for each movement
-                6. Add progression and regression options
-                7. Include foam rolling or myofascial release if equipment allows
-                8. Provide modifications for any injury history
-                9. Add stretches for tight muscle groups
-                10. Include functional mobility movements relevant to sports
-                11. Response should be around 200-250 words 
-                Prioritize safe, effective movements. Explain the 'why' behind each exercise.
-                """
-                
-                try:
-                    generation_config = genai.types.GenerationConfig(
-                        temperature=0.5,
-                        top_p=0.9,
-                        top_k=40,
-                    )
-                    
-                    response = st.session_state.model.generate_content(
-                        prompt, 
-                        generation_config=generation_config
-                    )
-                    
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.markdown("### 🧘 Your Mobility Program")
-                    st.markdown(response.text)
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"Error generating mobility program: {e}")
-    
-
-    with tab11:
-        st.markdown('<div class="sub-header">📊 CoachBot Dashboard</div>', unsafe_allow_html=True)
-        
-        
-        st.subheader("📈 Session Overview")
+            st.metric("Avg Queue Wait", f"{limiter_stats['avg_wait_s']:.1f}s")
+        with col3:
+            st.metric("Max Queue Wait", f"{limiter_stats['max_wait_s']:.1f}s")
+        with col4:
+            st.metric("Retries (429/5xx)", limiter_stats["retries"])
         
-        col1, col2, col3 = st.columns(3)
+        job_stats = get_job_queue().stats()
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Active Features", "10+ Coaching Modules")
+            st.metric("Jobs Queued", job_stats["queued"])
         with col2:
-            st.metric("Sports Supported", "10+ Sports")
+            st.metric("Jobs Running", job_stats["running"])
         with col3:
-            st.metric("User Age Range", "10-25 Years")
-        
+            st.metric("Jobs Done", job_stats["done"])
+        with col4:
+            st.metric("Jobs Failed", job_stats["failed"])
+    
         st.divider()
-        
-        
+    
+    
         st.subheader("🎯 Available Features")
+    
+        features_data = features_table()
         
-        features_data = {
-            "Feature": [
-                "Full-Body Workout Plans",
-                "Recovery Training Schedules",
-                "Tactical Coaching Tips",
-                "Personalized Nutrition Guides",
-                "Warm-up/Cool-down Routines",
-                "Mental Training Programs",
-                "Hydration Strategies",
-                "Pre-Match Visualization",
-                "Position-Specific Drills",
-                "Mobility & Recovery Workouts"
-            ],
-            "Best For": [
-                "Strength & Conditioning",
-                "Injury Rehabilitation",
-                "Game Intelligence",
-                "Performance Nutrition",
-                "Injury Prevention",
-                "Mental Toughness",
-                "Optimal Hydration",
-                "Confidence Building",
-                "Decision Making",
-                "Flexibility & Recovery"
-            ],
-            "Temperature": [
-                "0.7 (Fixed)",
-                "0.5 (Safety)",
-                "0.7 (Fixed)",
-                "0.7 (Fixed)",
-                "0.6 (Balanced)",
-                "0.7 (Fixed)",
-                "0.6 (Scientific)",
-                "0.7 (Fixed)",
-                "0.7 (Fixed)",
-                "0.5 (Safety)"
-            ]
-        }
-        
+        import pandas as pd
         df_features = pd.DataFrame(features_data)
         st.dataframe(df_features, use_container_width=True, hide_index=True)
+    
+        st.divider()
+        
+        st.subheader("🔢 Token Usage")
+        token_rows = get_token_stats().rows({tab: m.label for tab, m in COACHING_MODULES.items()})
+        if token_rows:
+            st.dataframe(pd.DataFrame(token_rows), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No generations yet in this server process.")
+        
+        st.subheader("⏱️ Call Latency")
+        call_metrics = get_call_metrics()
+        latency_rows = call_metrics.rows({tab: m.label for tab, m in COACHING_MODULES.items()})
+        if latency_rows:
+            st.caption(f"Last {call_metrics.window_seconds / 60:.0f} minutes, all sessions.")
+            st.dataframe(pd.DataFrame(latency_rows), use_container_width=True, hide_index=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("Export Prometheus text", call_metrics.prometheus_text(),
+                                   file_name="coachbot_metrics.prom", mime="text/plain", key="tab11_prometheus")
+            with col2:
+                st.download_button("Export JSONL", call_metrics.jsonl(),
+                                   file_name="coachbot_calls.jsonl", mime="application/jsonl", key="tab11_calls_jsonl")
+        else:
+            st.caption("No generations in the current window.")
+        
+        st.subheader("🔀 Model Routing")
+        if st.session_state.offline_mode:
+            st.caption("Offline: every request is answered from the caches or the built-in rules.")
+        else:
+            router = get_model_router(st.session_state.model)
+            routes = router.routes()
+            st.dataframe(pd.DataFrame({
+                "Module": [COACHING_MODULES[tab].label if tab in COACHING_MODULES else "All other modules"
+                           for tab in routes],
+                "Models (in order)": [" → ".join(names) for names in routes.values()],
+            }), use_container_width=True, hide_index=True)
+            router_rows = router.stats()
+            if router_rows:
+                st.caption("Per model, recent calls. Hedging is "
+                           + ("on: requests past a model's p95 are raced against the fastest other model."
+                              if router.hedge else "off (set COACHBOT_HEDGE=1)."))
+                st.dataframe(pd.DataFrame(router_rows), use_container_width=True, hide_index=True)
+        
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None:
+            st.subheader("🧭 Near-Duplicate Cache")
+            semantic_stats = semantic_cache.stats()
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Near-Duplicate Hits", semantic_stats["hits"])
+            with col2:
+                st.metric("Hit Rate (of exact misses)", f"{semantic_stats['hit_rate']:.0%}")
+            with col3:
+                st.metric("Audited Hits", semantic_stats["audited"])
+            with col4:
+                st.metric("False-Hit Rate", f"{semantic_stats['false_hit_rate']:.0%}")
+            
+            audit = semantic_cache.audit_log()
+            if audit:
+                st.caption("Tick any match that should not have reused the earlier plan.")
+                edited = st.data_editor(pd.DataFrame([
+                    {
+                        "id": record["id"],
+                        "Module": COACHING_MODULES[record["tab"]].label,
+                        "Requested": "; ".join(record["query"].values()),
+                        "Matched": "; ".join(record["matched"].values()),
+                        "Similarity": record["similarity"],
+                        "False hit": record["false_hit"],
+                    }
+                    for record in audit
+                ]), disabled=["id", "Module", "Requested", "Matched", "Similarity"],
+                    use_container_width=True, hide_index=True, key="tab11_semantic_audit")
+                for audit_id, false_hit in zip(edited["id"], edited["False hit"]):
+                    semantic_cache.mark_false_hit(int(audit_id), bool(false_hit))
         
         st.divider()
         
+        st.subheader("🏟️ League Energy & Hydration Targets")
+        st.caption("Upload a CSV of athletes (same columns as the Squad Batch roster, plus optional "
+                   "training_duration, climate and sweat_rate) to compute targets for everyone at once.")
+        league_file = st.file_uploader("Athletes CSV", type=["csv"], key="tab11_league")
+        if league_file is not None:
+            from population import population_summary, population_targets
+            try:
+                league = population_targets(pd.read_csv(league_file))
+            except (ValueError, KeyError) as e:
+                st.error(f"Could not compute league targets: {e}")
+            else:
+                unknown = int(league["target_kcal"].isna().sum() + league["daily_l"].isna().sum())
+                st.metric("Athletes", f"{len(league):,}")
+                if unknown:
+                    st.warning(f"{unknown} targets could not be computed because of unrecognised values.")
+                st.dataframe(population_summary(league).round(1), use_container_width=True)
+                st.download_button("Download targets CSV", league.to_csv(index=False),
+                                   file_name="league_targets.csv", mime="text/csv", key="tab11_league_csv")
         
+        st.divider()
+    
+    
         st.subheader("💡 Pro Tips for Best Results")
-        
+    
         col1, col2 = st.columns(2)
-        
+    
         with col1:
             st.info("""
             **🎯 For Workout Plans:**
             - Always include injury history for safe recommendations
             - Start with lower fitness level if unsure
             - Follow progressive overload principles
-            
+        
             **🏥 For Recovery:**
             - Be honest about current pain levels
             - Follow medical advice first
             - Progress gradually through phases
             """)
-        
+    
         with col2:
             st.info("""
             **🧠 For Mental Training:**
             - Practice visualization daily for best results
             - Start with shorter sessions and build up
             - Combine with physical practice
-            
+        
             **🥗 For Nutrition:**
             - Be specific about allergies and restrictions
             - Consult with parents/guardians for dietary changes
             - Focus on whole foods over supplements
             """)
-        
+    
         st.divider()
-        
+    
         st.subheader("🏅 Supported Sports")
-        
+    
         sports_list = [
             "Football (Soccer)", "Cricket", "Basketball", "Tennis", "Athletics",
             "Swimming", "Volleyball", "Hockey", "Rugby", "Baseball", "Softball",
             "Badminton", "Table Tennis", "Gymnastics", "Martial Arts", "Wrestling",
             "Boxing", "Cross Country", "Track & Field", "Water Polo"
         ]
-        
+    
         cols = st.columns(5)
         for idx, sport in enumerate(sports_list):
             cols[idx % 5].markdown(f"• {sport}")
-        
+    
         st.divider()
-        
-        
+    
+    
         st.subheader("ℹ️ About CoachBot ")
-        
+    
         st.markdown("""
         **CoachBot ** is an AI-powered personal fitness coaching assistant designed specifically for young athletes (ages 10-25).
-        
-       
+    
+   
         - ✅ Empower youth with AI-based personal training
         - ✅ Generate adaptive fitness routines based on physical condition
         - ✅ Encourage safety, motivation, and nutrition awareness
         - ✅ Provide accessibility for low-resource areas
-        
-       
+    
+   
         - **AI Model**: Google gemini-2.5-flash
         - **Framework**: Streamlit
         - **Language**: Python
-        
-      
+    
+  
         - Injury-aware exercise modifications
         - Age-appropriate recommendations
         - Progressive training principles
         - Medical disclaimer for all content
-        
+    
         - Young athletes seeking personalized coaching
         - Youth sports programs
         - Schools and sports academies
         - Under-resourced communities with limited coaching access
         """)
 
+with tab12:
+    st.markdown('<div class="sub-header">📦 Weekly Athlete Pack</div>', unsafe_allow_html=True)
+    st.caption("Fill in one athlete profile and generate every coaching module at once.")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        pack_sport = st.selectbox("Sport", [
+            "Football", "Cricket", "Basketball", "Tennis", 
+            "Athletics", "Swimming", "Volleyball", "Hockey", "Rugby", "Other"
+        ], key="tab12_sport")
+        pack_position = st.selectbox("Player Position", [
+            "Striker/Forward", "Midfielder", "Defender", "Goalkeeper",
+            "Bowler", "Batsman", "Wicket Keeper", "All-rounder",
+            "Point Guard", "Shooting Guard", "Center", "Power Forward", "Small Forward",
+            "Sprinter", "Distance Runner", "Jumper", "Thrower",
+            "General Athlete"
+        ], key="tab12_position")
+        pack_level = st.selectbox("Fitness Level", ["Beginner", "Intermediate", "Advanced"], key="tab12_fitness")
+        pack_days = st.slider("Training Days per Week", min_value=3, max_value=7, value=4, key="tab12_days")
+    
+    with col2:
+        pack_age = st.number_input("Age", min_value=10, max_value=25, value=15, key="tab12_age")
+        pack_gender = st.selectbox("Gender", ["Male", "Female"], key="tab12_gender")
+        pack_weight = st.number_input("Weight (kg)", min_value=30, max_value=120, value=60, key="tab12_weight")
+        pack_height = st.number_input("Height (cm)", min_value=120, max_value=210, value=170, key="tab12_height")
+    
+    with col3:
+        pack_duration = st.slider("Session Duration (minutes)", min_value=30, max_value=120, value=60, key="tab12_duration")
+        pack_climate = st.selectbox("Training Climate", [
+            "Cool (Under 15°C)", "Moderate (15-25°C)", 
+            "Warm (25-30°C)", "Hot (30°C+)", "Humid"
+        ], key="tab12_climate")
+        pack_sweat = st.selectbox("Sweat Rate", ["Low", "Moderate", "High", "Very High"], key="tab12_sweat")
+        pack_diet = st.selectbox("Diet Type", ["Non-Vegetarian", "Vegetarian", "Vegan", "Eggetarian"], key="tab12_diet")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        pack_injuries = st.text_area("Current Injuries or Problem Areas (leave blank if none)", 
+                                     placeholder="e.g., ankle sprain, shoulder strain, knee pain...",
+                                     max_chars=MAX_FREE_TEXT_CHARS, key="tab12_injuries")
+    with col2:
+        pack_allergies = st.text_area("Food Allergies/Restrictions", 
+                                      placeholder="e.g., lactose intolerance, nut allergy...",
+                                      max_chars=MAX_FREE_TEXT_CHARS, key="tab12_allergies")
+    
+    pack_sections = st.multiselect("Sections", list(COACHING_MODULES),
+                                   default=list(COACHING_MODULES),
+                                   format_func=lambda tab: COACHING_MODULES[tab].label,
+                                   key="tab12_sections")
+    
+    if st.button("Generate Full Pack", key="tab12_generate"):
+        profile = {
+            "sport": pack_sport,
+            "position": pack_position,
+            "fitness_level": pack_level,
+            "training_days": pack_days,
+            "session_duration": pack_duration,
+            "age": pack_age,
+            "gender": pack_gender,
+            "weight": pack_weight,
+            "height": pack_height,
+            "diet_type": pack_diet,
+            "climate": pack_climate,
+            "sweat_rate": pack_sweat,
+            "injuries": pack_injuries,
+            "allergies": pack_allergies,
+        }
+        all_inputs = pack_inputs(profile)
+        jobs = {}
+        for tab in pack_sections:
+            module = COACHING_MODULES[tab]
+            prompt, prompt_ms = timed_render(module, all_inputs[tab])
+            jobs[tab] = submit_generation(module, all_inputs[tab], prompt, prompt_ms, PRIORITY_PACK)
+        st.session_state.tab12_pack = {"jobs": jobs, "started": time.time()}
+    
+    pack = st.session_state.get("tab12_pack")
+    if pack and pack["jobs"]:
+        # Sections keep their order while they finish in any order, and
+        # carry on in the background if you switch tabs.
+        job_queue = get_job_queue()
+        pack_modules = [COACHING_MODULES[tab] for tab in pack["jobs"]]
+        pack_jobs = [job_queue.get(job_id) for job_id in pack["jobs"].values()]
+        if all(job is None or job.finished for job in pack_jobs):
+            for module, job in zip(pack_modules, pack_jobs):
+                render_job(module, job)
+            finished = [job.finished_at for job in pack_jobs if job is not None]
+            if finished:
+                st.caption(f"Generated {len(pack_jobs)} sections in {max(finished) - pack['started']:.1f}s")
+        else:
+            render_job_progress(pack_modules, list(pack["jobs"].values()))
+
+with tab13:
+    st.markdown('<div class="sub-header">👥 Squad Batch Plans</div>', unsafe_allow_html=True)
+    st.caption("Upload a CSV with one athlete per row to generate plans for a whole squad.")
+    
+    st.download_button("Download CSV template", roster_template_csv(),
+                       file_name="roster_template.csv", mime="text/csv", key="tab13_template")
+    
+    roster_file = st.file_uploader("Roster CSV", type=["csv"], key="tab13_roster")
+    col1, col2 = st.columns(2)
+    with col1:
+        roster_tabs = st.multiselect("Plans to generate", list(ROSTER_MODULES),
+                                     default=list(ROSTER_MODULES),
+                                     format_func=lambda tab: COACHING_MODULES[tab].label,
+                                     key="tab13_modules")
+    with col2:
+        roster_workers = st.slider("Concurrent requests", min_value=1, max_value=8, value=4, key="tab13_workers")
+    
+    if st.button("Generate Squad Plans", key="tab13_generate", disabled=roster_file is None):
+        try:
+            athletes = parse_roster(roster_file.getvalue().decode("utf-8-sig"))
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error("Could not read roster:\n\n" + "\n".join(f"- {line}" for line in str(e).splitlines()))
+            athletes = []
+        jobs = roster_jobs(athletes, roster_tabs)
+        if jobs:
+            # Runs on the shared job queue, so it carries on if you switch tabs.
+            st.session_state.tab13_batch = {"id": submit_roster(jobs, roster_workers), "total": len(jobs)}
+        elif athletes:
+            st.warning("Choose at least one plan to generate.")
+        else:
+            st.warning("The roster has no athletes.")
+    
+    batch = st.session_state.get("tab13_batch")
+    if batch:
+        job = get_job_queue().get(batch["id"])
+        if job is None:
+            st.warning("These squad plans have expired, please generate them again.")
+        elif job.status == FAILED:
+            st.error(f"Error generating squad plans: {job.error}")
+        elif job.status == DONE:
+            results, report = job.result["results"], job.result["report"]
+            render_roster_status(results, batch["total"])
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Plans / minute", f"{report['plans_per_minute']:.1f}")
+            with col2:
+                st.metric("Failures", report["failures"])
+            with col3:
+                st.metric("Median Latency", f"{report['median_latency_s']:.1f}s")
+            with col4:
+                st.metric("Shared (deduplicated)", report["deduplicated"])
+            st.caption(f"{report['llm_calls']} model calls, {job.result['retries']} rate-limit retries, "
+                       f"slowest call {report['max_latency_s']:.1f}s")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("Download ZIP", results_zip(results),
+                                   file_name="squad_plans.zip", mime="application/zip", key="tab13_zip")
+            with col2:
+                st.download_button("Download JSONL", results_jsonl(results),
+                                   file_name="squad_plans.jsonl", mime="application/jsonl", key="tab13_jsonl")
+        else:
+            render_roster_progress(batch["id"], batch["total"])
+
+with tab14:
+    if tab14.open:
+        st.markdown('<div class="sub-header">🗂️ My History</div>', unsafe_allow_html=True)
+        history = get_history_store()
+        athlete_id = get_athlete_id()
+        if not athlete_key(st.session_state.get("athlete_id")):
+            st.caption("Showing plans from this visit only. Enter your name above to keep them for next time.")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            history_tab = st.selectbox("Module", [None] + list(COACHING_MODULES),
+                                       format_func=lambda tab: "All modules" if tab is None else COACHING_MODULES[tab].label,
+                                       key="tab14_module")
+        with col2:
+            history_sport = st.selectbox("Sport", [None] + history.sports(athlete_id),
+                                         format_func=lambda sport: "All sports" if sport is None else sport,
+                                         key="tab14_sport")
+        
+        page_size = 10
+        total = history.count(athlete_id, history_tab, history_sport)
+        pages = max(1, -(-total // page_size))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="tab14_page")
+        st.caption(f"{total} saved plans, page {page} of {pages}")
+        
+        for entry in history.page(athlete_id, history_tab, history_sport,
+                                  limit=page_size, offset=(page - 1) * page_size):
+            module = COACHING_MODULES.get(entry["tab"])
+            label = module.label if module else entry["tab"]
+            when = datetime.fromtimestamp(entry["created_at"]).strftime("%d %b %Y, %H:%M")
+            with st.expander(f"{label} · {entry['sport'] or 'General'} · {when}"):
+                render_text(module, entry["text"], entry["inputs"])
+                st.caption(", ".join(f"{name}: {value}" for name, value in entry["inputs"].items()))
+
 st.divider()
 st.markdown("""
 <div style='text-align: center; color: #666;'>
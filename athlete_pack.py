@@ -0,0 +1,133 @@
+import re
+
+from exercise_catalogue import injured_regions
+
+
+# The Recovery tab's option for each region injured_regions() can find.
+RECOVERY_INJURIES = {
+    "ankle": "Ankle Sprain",
+    "knee": "Knee Injury",
+    "hip": "Joint Pain",
+    "hamstring": "Hamstring Strain",
+    "groin": "Muscle Strain",
+    "lower_back": "Lower Back Pain",
+    "shoulder": "Shoulder Injury",
+    "elbow": "Wrist/Elbow Injury",
+    "wrist": "Wrist/Elbow Injury",
+    "neck": "Muscle Strain",
+}
+
+
+def injury_option(injuries):
+    """The closest Recovery tab injury option for a free-text description."""
+    if not injuries.strip():
+        return "None - General Recovery"
+    words = set(re.findall(r"[a-z]+", injuries.lower()))
+    if "concussion" in words:
+        return "Concussion Recovery"
+    if words & {"surgery", "operation", "reconstruction"}:
+        return "Post-Surgery Recovery"
+    regions = injured_regions(injuries)
+    return RECOVERY_INJURIES[regions[0]] if regions else "Muscle Strain"
+
+
+def experience_for_age(age):
+    if age < 14:
+        return "Youth (Under 14)"
+    if age <= 18:
+        return "Junior (14-18)"
+    return "College"
+
+
+def activity_for_days(training_days):
+    if training_days <= 2:
+        return "Light (1-2 training sessions)"
+    if training_days <= 4:
+        return "Moderate (3-4 sessions)"
+    if training_days <= 6:
+        return "Heavy (5-6 sessions)"
+    return "Very Heavy (Daily + Competition)"
+
+
+def pack_inputs(profile):
+    """Map one shared athlete profile onto the inputs of every coaching module."""
+    sport = profile["sport"]
+    position = profile["position"]
+    injuries = profile["injuries"]
+    return {
+        "tab1": {
+            "sport": sport,
+            "position": position,
+            "fitness_level": profile["fitness_level"],
+            "training_days": profile["training_days"],
+            "session_duration": profile["session_duration"],
+            "injuries": injuries,
+        },
+        "tab2": {
+            # injury_type is a closed list; the athlete's own words go in the free-text field.
+            "injury_type": injury_option(injuries),
+            "recovery_phase": "Return to Sport Phase",
+            "sport_focus": sport,
+            "recovery_goal": "Prevent Re-injury" if injuries else "Maintain Fitness",
+            "activity_level": f"Reported injury: {injuries}" if injuries.strip() else "",
+        },
+        "tab3": {
+            "sport_tactical": sport,
+            "position_tactical": position,
+            "skill_focus": "Decision Making",
+            "experience_level": experience_for_age(profile["age"]),
+            "match_situation": "",
+        },
+        "tab4": {
+            "age": profile["age"],
+            "gender": profile["gender"],
+            "weight": profile["weight"],
+            "height": profile["height"],
+            "diet_type": profile["diet_type"],
+            "activity_level_nutrition": activity_for_days(profile["training_days"]),
+            "calorie_goal": "Performance Optimization",
+            "allergies": profile["allergies"],
+            "sport_nutrition": sport,
+        },
+        "tab5": {
+            "sport_warmup": sport,
+            "routine_type": "Pre-Training Warm-up",
+            "position_warmup": position,
+            "available_time": 10,
+            "focus_areas": ["Injury Prevention"] if injuries else [],
+        },
+        "tab6": {
+            "mental_goal": "Match Day Focus",
+            "sport_mental": sport,
+            "upcoming_event": "Regular Season Game",
+            "time_to_event": "1 Week",
+            "current_challenges": "",
+        },
+        "tab7": {
+            "sport_hydration": sport,
+            "training_duration": profile["session_duration"],
+            "climate": profile["climate"],
+            "sweat_rate": profile["sweat_rate"],
+        },
+        "tab8": {
+            "sport_viz": sport,
+            "position_viz": position,
+            "match_importance": "Regular Season",
+            "viz_preference": "Performance Skills",
+            "specific_scenarios": "",
+        },
+        "tab9": {
+            "sport_drill": sport,
+            "position_drill": position,
+            "decision_area": "Game Situations",
+            "skill_level_drill": profile["fitness_level"],
+        },
+        "tab10": {
+            "mobility_focus": "Full Body",
+            "mobility_goal": "Injury Prevention" if injuries else "Recovery After Training",
+            "time_available": 20,
+            "equipment": [],
+            "injury_history_mobility": injuries,
+        },
+    }
+
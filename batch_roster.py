@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+import statistics
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from prompt_registry import COACHING_MODULES
+from response_cache import make_cache_key
+
+
+# CSV column -> default, split by the coaching module that consumes it.
+WORKOUT_COLUMNS = {
+    "sport": "Football",
+    "position": "General Athlete",
+    "fitness_level": "Intermediate",
+    "training_days": 4,
+    "session_duration": 60,
+    "injuries": "",
+}
+
+NUTRITION_COLUMNS = {
+    "age": 15,
+    "gender": "Male",
+    "weight": 60,
+    "height": 170,
+    "diet_type": "Non-Vegetarian",
+    "activity_level_nutrition": "Moderate (3-4 sessions)",
+    "calorie_goal": "Maintain Weight",
+    "allergies": "",
+    "sport_nutrition": "",
+}
+
+# tab -> CSV columns that feed that coaching module
+ROSTER_MODULES = {
+    "tab1": WORKOUT_COLUMNS,
+    "tab4": NUTRITION_COLUMNS,
+}
+
+def roster_template_csv():
+    columns = ["athlete"] + list(WORKOUT_COLUMNS) + list(NUTRITION_COLUMNS)
+    example = ["Player 1"] + [str(v) for v in WORKOUT_COLUMNS.values()] + [str(v) for v in NUTRITION_COLUMNS.values()]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    writer.writerow(example)
+    return buffer.getvalue()
+
+
+def _coerce(spec, value, default):
+    """The CSV value as the module's widget would hold it; raises ValueError naming the problem."""
+    value = (value or "").strip()
+    if not value:
+        return default
+    if isinstance(default, int):
+        try:
+            value = int(float(value))
+        except ValueError:
+            raise ValueError(f"{spec.name} '{value}' is not a number") from None
+        if not spec.min_value <= value <= spec.max_value:
+            raise ValueError(f"{spec.name} {value} is outside {spec.min_value}-{spec.max_value}")
+        return value
+    if spec.options:
+        for option in spec.options:
+            if option.lower() == value.lower():
+                return option
+        raise ValueError(f"{spec.name} '{value}' is not one of: {', '.join(spec.options)}")
+    return value
+
+
+def parse_roster(text):
+    """Parse roster CSV text into one dict per athlete, filling missing columns with defaults.
+
+    Every value is checked against the module's own options and ranges
+    (options match case-insensitively); a ValueError lists each bad row
+    before anything is generated.
+    """
+    specs = {spec.name: spec for tab in ROSTER_MODULES for spec in COACHING_MODULES[tab].inputs}
+    athletes, errors = [], []
+    for index, row in enumerate(csv.DictReader(io.StringIO(text))):
+        row = {(name or "").strip().lower(): value for name, value in row.items()}
+        athlete = {"athlete": (row.get("athlete") or "").strip() or f"Athlete {index + 1}"}
+        for column, default in {**WORKOUT_COLUMNS, **NUTRITION_COLUMNS}.items():
+            try:
+                athlete[column] = _coerce(specs[column], row.get(column), default)
+            except ValueError as e:
+                errors.append(f"Row {index + 1} ({athlete['athlete']}): {e}")
+        if not athlete.get("sport_nutrition") and "sport" in athlete:
+            sport_options = specs["sport_nutrition"].options
+            athlete["sport_nutrition"] = athlete["sport"] if athlete["sport"] in sport_options else "Other"
+        athletes.append(athlete)
+    if errors:
+        raise ValueError("\n".join(errors))
+    return athletes
+
+
+def roster_jobs(athletes, tabs):
+    jobs = []
+    for row, athlete in enumerate(athletes):
+        for tab in tabs:
+            columns = ROSTER_MODULES[tab]
+            jobs.append({
+                "row": row,
+                "athlete": athlete["athlete"],
+                "tab": tab,
+                "inputs": {column: athlete[column] for column in columns},
+            })
+    return jobs
+
+
+def run_roster(generate, jobs, model_name, max_workers=4):
+    """Run roster jobs on a bounded pool, yielding one result dict per job as it finishes.
+
+    Jobs with identical module inputs share a single call.
+    ``generate(module, inputs)`` runs in worker threads; rate limiting
+    and retries are left to it.
+    """
+    groups = {}
+    for job in jobs:
+        module = COACHING_MODULES[job["tab"]]
+        key = make_cache_key(module.tab, job["inputs"], module.temperature, module.top_p, module.top_k, model_name)
+        groups.setdefault(key, []).append(job)
+
+    def work(job):
+        module = COACHING_MODULES[job["tab"]]
+        started = time.perf_counter()
+        try:
+            text, error = generate(module, job["inputs"]), None
+        except Exception as e:
+            text, error = None, str(e)
+        return text, error, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(work, group[0]): group for group in groups.values()}
+        for future in as_completed(futures):
+            text, error, latency = future.result()
+            for position, job in enumerate(futures[future]):
+                yield {
+                    "row": job["row"],
+                    "athlete": job["athlete"],
+                    "tab": job["tab"],
+                    "module": COACHING_MODULES[job["tab"]].label,
+                    "inputs": job["inputs"],
+                    "text": text,
+                    "error": error,
+                    "latency_s": round(latency, 3),
+                    "shared": position > 0,
+                }
+
+
+def roster_report(results, elapsed_s):
+    completed = [r for r in results if r["error"] is None]
+    latencies = [r["latency_s"] for r in results if not r["shared"]]
+    return {
+        "plans": len(completed),
+        "failures": len(results) - len(completed),
+        "llm_calls": len(latencies),
+        "deduplicated": sum(1 for r in results if r["shared"]),
+        "plans_per_minute": len(completed) / elapsed_s * 60 if elapsed_s else 0.0,
+        "median_latency_s": statistics.median(latencies) if latencies else 0.0,
+        "max_latency_s": max(latencies) if latencies else 0.0,
+    }
+
+
+def results_jsonl(results):
+    return "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+
+
+def results_zip(results):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("results.jsonl", results_jsonl(results))
+        for result in results:
+            if result["error"] is not None:
+                continue
+            slug = "".join(c if c.isalnum() else "_" for c in result["athlete"]).strip("_")
+            name = f"{result['row'] + 1:03d}_{slug}_{result['tab']}.md"
+            archive.writestr(name, f"# {result['athlete']} - {result['module']}\n\n{result['text']}\n")
+    return buffer.getvalue()
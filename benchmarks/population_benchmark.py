@@ -0,0 +1,73 @@
+"""Rows/second of the vectorized population targets at league scale.
+
+    python benchmarks/population_benchmark.py --rows 10000 1000000
+
+Before timing, a sample of rows is checked against the scalar
+calculators used by the Nutrition and Hydration tabs.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculators import (  # noqa: E402
+    ACTIVITY_FACTORS, CALORIE_GOAL_FACTORS, CLIMATE_FACTORS, MACRO_SPLITS, SWEAT_RATE_L_PER_HOUR,
+    hydration_targets, nutrition_targets,
+)
+from population import population_targets  # noqa: E402
+
+
+def random_athletes(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "age": rng.integers(10, 26, rows),
+        "gender": rng.choice(["Male", "Female"], rows),
+        "weight": rng.integers(30, 121, rows),
+        "height": rng.integers(120, 211, rows),
+        "diet_type": rng.choice(list(MACRO_SPLITS), rows),
+        "activity_level_nutrition": rng.choice(list(ACTIVITY_FACTORS), rows),
+        "calorie_goal": rng.choice(list(CALORIE_GOAL_FACTORS), rows),
+        "training_duration": rng.integers(30, 181, rows),
+        "climate": rng.choice(list(CLIMATE_FACTORS), rows),
+        "sweat_rate": rng.choice(list(SWEAT_RATE_L_PER_HOUR), rows),
+    })
+
+
+def check_against_scalar(sample):
+    targets = population_targets(sample)
+    for row in targets.itertuples(index=False):
+        expected = nutrition_targets(row.age, row.gender, row.weight, row.height, row.diet_type,
+                                     row.activity_level_nutrition, row.calorie_goal)
+        expected.update(hydration_targets(row.training_duration, row.climate, row.sweat_rate, row.weight))
+        for column, value in expected.items():
+            if abs(getattr(row, column) - value) > 1e-6:
+                raise AssertionError(f"{column}: vectorized {getattr(row, column)} != scalar {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    check_against_scalar(random_athletes(500, seed=1))
+    print("scalar cross-check: ok (500 rows)")
+
+    for rows in args.rows:
+        athletes = random_athletes(rows)
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            population_targets(athletes)
+            best = min(best, time.perf_counter() - started)
+        print(f"{rows:>10,} rows: {best * 1000:9.1f} ms  ({rows / best:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
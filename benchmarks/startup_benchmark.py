@@ -0,0 +1,86 @@
+"""Cold-start and warm-rerun wall time of App.py.
+
+Each cold sample runs in a fresh interpreter so module imports are paid
+again; warm samples are further reruns of the same AppTest session. The
+Gemini client is replaced with the offline stand-in in ``stub_llm`` so
+no API key or network is needed.
+
+    python benchmarks/startup_benchmark.py --runs 5 --budget-cold-ms 4000 --budget-warm-ms 400
+
+Exits non-zero when a median exceeds its budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App.py")
+
+
+def measure_once(warm_reruns):
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    import stub_llm
+
+    stub_llm.install()
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets["GEMINI_API_KEY"] = "benchmark"
+    at.run()
+    cold_ms = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    warm_ms = []
+    for _ in range(warm_reruns):
+        start = time.perf_counter()
+        at.run()
+        warm_ms.append((time.perf_counter() - start) * 1000)
+    return {"cold_ms": cold_ms, "warm_ms": warm_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--warm-reruns", type=int, default=10, help="reruns per interpreter")
+    parser.add_argument("--budget-cold-ms", type=float, default=None)
+    parser.add_argument("--budget-warm-ms", type=float, default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_once(args.warm_reruns)))
+        return 0
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "--warm-reruns", str(args.warm_reruns)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        cold.append(sample["cold_ms"])
+        warm.extend(sample["warm_ms"])
+
+    cold_median = statistics.median(cold)
+    warm_median = statistics.median(warm)
+    print(f"cold start : median {cold_median:8.1f} ms  (min {min(cold):.1f}, max {max(cold):.1f}, n={len(cold)})")
+    print(f"warm rerun : median {warm_median:8.1f} ms  (min {min(warm):.1f}, max {max(warm):.1f}, n={len(warm)})")
+
+    over_budget = False
+    if args.budget_cold_ms is not None and cold_median > args.budget_cold_ms:
+        print(f"FAIL: cold start over budget ({args.budget_cold_ms:.0f} ms)")
+        over_budget = True
+    if args.budget_warm_ms is not None and warm_median > args.budget_warm_ms:
+        print(f"FAIL: warm rerun over budget ({args.budget_warm_ms:.0f} ms)")
+        over_budget = True
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Deterministic offline stand-in for ``genai.GenerativeModel``.
+
+Answers arrive after a fixed time-to-first-token and then stream at a
+fixed token rate, so benchmark numbers only move when App.py does.
+"""
+import hashlib
+import time
+
+import google.generativeai as genai
+
+
+CHARS_PER_TOKEN = 4
+WORDS = ("warm", "up", "sprint", "rest", "hydrate", "drill", "focus", "recover", "stretch", "plan")
+
+
+class StubUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class StubChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubResponse:
+    def __init__(self, chunks, usage, seconds_per_chunk):
+        self._chunks = chunks
+        self._seconds_per_chunk = seconds_per_chunk
+        self.usage_metadata = usage
+
+    @property
+    def text(self):
+        return "".join(self._chunks)
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            time.sleep(self._seconds_per_chunk)
+            yield StubChunk(chunk)
+
+
+class StubModel:
+    """Answers depend only on the prompt; timing only on the settings below."""
+
+    first_token_s = 0.2
+    tokens_per_second = 400.0
+    output_tokens = 400
+    tokens_per_chunk = 20
+    calls = 0
+
+    def __init__(self, model_name, **kwargs):
+        self.model_name = f"models/{model_name}"
+
+    def count_tokens(self, contents, **kwargs):
+        return StubUsage(len(str(contents)) // CHARS_PER_TOKEN, 0)
+
+    def _answer(self, prompt):
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        words = [WORDS[(seed >> (i % 200)) % len(WORDS)] for i in range(self.output_tokens)]
+        chunks = []
+        for start in range(0, len(words), self.tokens_per_chunk):
+            chunks.append(" ".join(words[start:start + self.tokens_per_chunk]) + "\n")
+        return chunks
+
+    def start_chat(self, history=None):
+        return StubChat(self, history)
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        type(self).calls += 1
+        chunks = self._answer(prompt)
+        usage = StubUsage(len(prompt) // CHARS_PER_TOKEN, self.output_tokens)
+        time.sleep(self.first_token_s)
+        seconds_per_chunk = self.tokens_per_chunk / self.tokens_per_second
+        if stream:
+            return StubResponse(chunks, usage, seconds_per_chunk)
+        time.sleep(seconds_per_chunk * len(chunks))
+        return StubResponse(chunks, usage, 0.0)
+
+
+class StubChat:
+    """``start_chat`` session; the reply depends on the history and the new message."""
+
+    def __init__(self, model, history):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, content, generation_config=None, stream=False, **kwargs):
+        context = "".join(part for message in self.history for part in message["parts"])
+        return self.model.generate_content(context + content, generation_config=generation_config, stream=stream)
+
+
+def install(first_token_s=0.2, tokens_per_second=400.0, output_tokens=400):
+    """Point google.generativeai at StubModel; returns the class for reading ``calls``."""
+    StubModel.first_token_s = first_token_s
+    StubModel.tokens_per_second = tokens_per_second
+    StubModel.output_tokens = output_tokens
+    StubModel.calls = 0
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = StubModel
+    return StubModel
+
+
+def expected_seconds():
+    """Wall time the stub itself spends on one full answer."""
+    chunks = -(-StubModel.output_tokens // StubModel.tokens_per_chunk)
+    return StubModel.first_token_s + chunks * StubModel.tokens_per_chunk / StubModel.tokens_per_second
@@ -0,0 +1,270 @@
+"""App.py overhead on the ten coaching tab flows, with Gemini stubbed out.
+
+Every flow is run headless through Streamlit's AppTest against the
+deterministic StubModel in ``stub_llm``, so no API key or network is
+needed and the stub's own latency can be subtracted from the total.
+
+    python benchmarks/tab_flow_benchmark.py --sessions 1 4 8 --first-token-ms 200 --tokens-per-second 400
+
+Reports prompt construction time per module, idle rerun time, per-tab
+click-to-answer time and App overhead, then throughput with N
+concurrent sessions, both as separate AppTest processes and as threads
+sharing one cache, rate limiter and single-flight. The response cache is disabled unless --cache is
+given, so every click reaches the stub. Exits non-zero when the median
+overhead exceeds --budget-overhead-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_llm  # noqa: E402
+from call_metrics import percentile  # noqa: E402
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App.py")
+
+
+def prompt_build_us(modules, repeats):
+    timings = {}
+    for module in modules:
+        values = module.defaults()
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            module.render(values)
+            samples.append((time.perf_counter() - start) * 1e6)
+        timings[module.tab] = statistics.median(samples)
+    return timings
+
+
+def new_session():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets["GEMINI_API_KEY"] = "benchmark"
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def run_flow(at, module, poll_seconds=0.02):
+    """Click one tab's generate button and rerun until its job is collected; returns wall time in ms.
+
+    The app's own poll interval is left out: reruns here follow each
+    other every ``poll_seconds``.
+    """
+    start = time.perf_counter()
+    at.button(key=f"{module.tab}_generate").click().run()
+    while f"{module.tab}_job" in at.session_state and not at.exception:
+        time.sleep(poll_seconds)
+        at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    if at.error:
+        raise RuntimeError(at.error[0].value)
+    return elapsed
+
+
+def single_session(modules, repeats, idle_reruns):
+    at = new_session()
+    idle = []
+    for _ in range(idle_reruns):
+        start = time.perf_counter()
+        at.run()
+        idle.append((time.perf_counter() - start) * 1000)
+    flows = {module.tab: [run_flow(at, module) for _ in range(repeats)] for module in modules}
+    return statistics.median(idle), {tab: statistics.median(samples) for tab, samples in flows.items()}
+
+
+def session_child(rounds):
+    """Body of one concurrent session process; talks to the parent over stdin/stdout."""
+    from prompt_registry import COACHING_MODULES
+
+    at = new_session()
+    print("ready", flush=True)
+    sys.stdin.readline()
+    latencies = []
+    failures = 0
+    for _ in range(rounds):
+        for module in COACHING_MODULES.values():
+            try:
+                latencies.append(run_flow(at, module))
+            except Exception:
+                failures += 1
+    print(json.dumps({"latencies": latencies, "failures": failures, "calls": stub_llm.StubModel.calls}), flush=True)
+
+
+def concurrent_sessions(sessions, rounds, stub_args):
+    """N sessions, each in its own interpreter, clicking through all ten tabs at once.
+
+    AppTest cannot drive several scripts at once in one interpreter, so
+    process-wide caches are not shared between these sessions; see
+    shared_path_sessions for that.
+    """
+    children = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--child-session", "--rounds", str(rounds)] + stub_args,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        for _ in range(sessions)
+    ]
+    for child in children:
+        while child.stdout.readline().strip() != "ready":
+            pass
+    start = time.perf_counter()
+    for child in children:
+        child.stdin.write("go\n")
+        child.stdin.flush()
+    samples = [json.loads(child.stdout.read().strip().splitlines()[-1]) for child in children]
+    wall = time.perf_counter() - start
+    for child in children:
+        child.wait()
+    latencies = sorted(ms for sample in samples for ms in sample["latencies"])
+    return {
+        "sessions": sessions,
+        "flows": len(latencies),
+        "failures": sum(sample["failures"] for sample in samples),
+        "wall_s": wall,
+        "flows_per_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 0.5) or 0.0,
+        "p95_ms": percentile(latencies, 0.95) or 0.0,
+        "model_calls": sum(sample["calls"] for sample in samples),
+    }
+
+
+def shared_path_sessions(modules, sessions, rounds):
+    """N sessions in threads sharing one cache, limiter and single-flight, as in a real server.
+
+    Calls generate_text directly, so this measures the shared generation
+    path rather than Streamlit reruns. Every session asks for the default
+    inputs, so identical in-flight requests are coalesced.
+    """
+    from call_metrics import CallMetrics
+    from generation import Services, generate_text, timed_render
+    from rate_limiter import limiter_from_env
+    from response_cache import cache_from_env
+    from single_flight import SingleFlight
+    from token_stats import TokenStats
+
+    model = stub_llm.StubModel("gemini-2.5-flash")
+    shared = dict(model=model, cache=cache_from_env(), token_stats=TokenStats(), flight=SingleFlight(),
+                  limiter=limiter_from_env(), metrics=CallMetrics())
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(session_id):
+        services = Services(session_id=session_id, **shared)
+        for _ in range(rounds):
+            for module in modules:
+                inputs = module.defaults()
+                start = time.perf_counter()
+                prompt, prompt_ms = timed_render(module, inputs)
+                generate_text(services, module.tab, inputs, prompt, module.temperature,
+                              module.top_p, module.top_k, prompt_ms=prompt_ms)
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+    calls_before = stub_llm.StubModel.calls
+    threads = [threading.Thread(target=worker, args=(f"session-{i}",)) for i in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "flows": len(latencies),
+        "failures": 0,
+        "wall_s": wall,
+        "flows_per_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 0.5) or 0.0,
+        "p95_ms": percentile(latencies, 0.95) or 0.0,
+        "model_calls": stub_llm.StubModel.calls - calls_before,
+    }
+
+
+def print_sessions(title, results):
+    print()
+    print(title)
+    print(f"{'sessions':>8}{'flows':>7}{'fail':>6}{'wall s':>9}{'flows/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'calls':>7}")
+    for result in results:
+        print(f"{result['sessions']:>8}{result['flows']:>7}{result['failures']:>6}{result['wall_s']:>9.2f}"
+              f"{result['flows_per_s']:>9.2f}{result['p50_ms']:>9.0f}{result['p95_ms']:>9.0f}"
+              f"{result['model_calls']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--first-token-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--output-tokens", type=int, default=400)
+    parser.add_argument("--repeats", type=int, default=3, help="clicks per tab in the single-session pass")
+    parser.add_argument("--idle-reruns", type=int, default=5)
+    parser.add_argument("--sessions", type=int, nargs="*", default=[1, 4, 8])
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the ten tabs per concurrent session")
+    parser.add_argument("--cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--budget-overhead-ms", type=float, default=None)
+    parser.add_argument("--child-session", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="coachbot-bench-")
+    os.environ.setdefault("COACHBOT_HISTORY_PATH", os.path.join(workdir, "history.sqlite3"))
+    os.environ.setdefault("COACHBOT_LIBRARY_PATH", os.path.join(workdir, "plans.sqlite3"))
+    os.environ.setdefault("COACHBOT_RPM", "1000000")
+    os.environ.setdefault("COACHBOT_TPM", "1000000000")
+    if not args.cache:
+        os.environ["COACHBOT_CACHE_TTL"] = "0"
+    stub_llm.install(args.first_token_ms / 1000, args.tokens_per_second, args.output_tokens)
+    if args.child_session:
+        session_child(args.rounds)
+        return 0
+
+    from prompt_registry import COACHING_MODULES
+
+    modules = list(COACHING_MODULES.values())
+    stub_ms = stub_llm.expected_seconds() * 1000
+    prompts = prompt_build_us(modules, repeats=200)
+    idle_ms, flow_ms = single_session(modules, args.repeats, args.idle_reruns)
+
+    print(f"stub model : {stub_ms:.0f} ms per answer "
+          f"({args.first_token_ms:.0f} ms to first token, {args.tokens_per_second:.0f} tokens/s)")
+    print(f"idle rerun : {idle_ms:.1f} ms")
+    print()
+    print(f"{'module':<24}{'prompt us':>10}{'click ms':>10}{'overhead ms':>13}")
+    overheads = []
+    for module in modules:
+        overhead = flow_ms[module.tab] - stub_ms
+        overheads.append(overhead)
+        print(f"{module.label:<24}{prompts[module.tab]:>10.1f}{flow_ms[module.tab]:>10.1f}{overhead:>13.1f}")
+    overhead_median = statistics.median(overheads)
+    print(f"{'median':<24}{statistics.median(prompts.values()):>10.1f}"
+          f"{statistics.median(flow_ms.values()):>10.1f}{overhead_median:>13.1f}")
+
+    if args.sessions:
+        stub_args = ["--first-token-ms", str(args.first_token_ms), "--tokens-per-second", str(args.tokens_per_second),
+                     "--output-tokens", str(args.output_tokens)] + (["--cache"] if args.cache else [])
+        print_sessions("Concurrent sessions (AppTest, one process each):",
+                       [concurrent_sessions(n, args.rounds, stub_args) for n in args.sessions])
+        print_sessions("Concurrent sessions (shared generation path, one process):",
+                       [shared_path_sessions(modules, n, args.rounds) for n in args.sessions])
+
+    if args.budget_overhead_ms is not None and overhead_median > args.budget_overhead_ms:
+        print(f"FAIL: median overhead over budget ({args.budget_overhead_ms:.0f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
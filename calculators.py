@@ -0,0 +1,140 @@
+"""Deterministic nutrition and hydration numbers, computed locally.
+
+The Nutrition and Hydration tabs show these figures as soon as the button
+is pressed and pass them into the prompt, so the model only has to write
+the plan around them. Everything here is plain arithmetic on the widget
+values and takes well under a millisecond.
+"""
+
+ACTIVITY_FACTORS = {
+    "Light (1-2 training sessions)": 1.375,
+    "Moderate (3-4 sessions)": 1.55,
+    "Heavy (5-6 sessions)": 1.725,
+    "Very Heavy (Daily + Competition)": 1.9,
+}
+
+# Multipliers on TDEE. Deficits and surpluses are kept mild for growing athletes.
+CALORIE_GOAL_FACTORS = {
+    "Maintain Weight": 1.0,
+    "Build Muscle": 1.1,
+    "Lose Fat": 0.9,
+    "Performance Optimization": 1.05,
+}
+
+# (carbohydrate, protein, fat) share of calories. Plant-based diets lean on
+# carbohydrate-rich protein sources, so their protein share is slightly lower.
+MACRO_SPLITS = {
+    "Non-Vegetarian": (0.50, 0.20, 0.30),
+    "Eggetarian": (0.52, 0.18, 0.30),
+    "Vegetarian": (0.55, 0.17, 0.28),
+    "Vegan": (0.57, 0.16, 0.27),
+}
+
+KCAL_PER_GRAM = {"carbs": 4, "protein": 4, "fat": 9}
+
+# Typical whole-body sweat loss in litres per hour.
+SWEAT_RATE_L_PER_HOUR = {
+    "Low": 0.5,
+    "Moderate": 0.8,
+    "High": 1.2,
+    "Very High": 1.6,
+}
+
+CLIMATE_FACTORS = {
+    "Cool (Under 15°C)": 0.8,
+    "Moderate (15-25°C)": 1.0,
+    "Warm (25-30°C)": 1.2,
+    "Hot (30°C+)": 1.4,
+    "Humid": 1.35,
+}
+
+# The Hydration tab does not ask for body weight, so the Nutrition tab's default is used.
+REFERENCE_WEIGHT_KG = 60
+BASELINE_FLUID_ML_PER_KG = 35
+PRE_TRAINING_ML_PER_KG = 6
+DURING_REPLACEMENT_SHARE = 0.8
+MAX_INTAKE_ML_PER_15_MIN = 250
+POST_TRAINING_REPLACEMENT = 1.5
+SWEAT_SODIUM_MG_PER_L = 900
+
+
+def bmr_mifflin_st_jeor(weight_kg, height_cm, age, gender):
+    base = 10 * weight_kg + 6.25 * height_cm - 5 * age
+    return base + 5 if gender == "Male" else base - 161
+
+
+def bmr_harris_benedict(weight_kg, height_cm, age, gender):
+    # Roza & Shizgal (1984) revision.
+    if gender == "Male":
+        return 88.362 + 13.397 * weight_kg + 4.799 * height_cm - 5.677 * age
+    return 447.593 + 9.247 * weight_kg + 3.098 * height_cm - 4.330 * age
+
+
+BMR_FORMULAS = {
+    "mifflin": bmr_mifflin_st_jeor,
+    "harris": bmr_harris_benedict,
+}
+
+
+def nutrition_targets(age, gender, weight, height, diet_type, activity_level, calorie_goal,
+                      formula="mifflin"):
+    bmr = BMR_FORMULAS[formula](weight, height, age, gender)
+    tdee = bmr * ACTIVITY_FACTORS[activity_level]
+    calories = tdee * CALORIE_GOAL_FACTORS[calorie_goal]
+    carbs_share, protein_share, fat_share = MACRO_SPLITS[diet_type]
+    return {
+        "bmr_kcal": round(bmr),
+        "tdee_kcal": round(tdee),
+        "target_kcal": round(calories),
+        "carbs_g": round(calories * carbs_share / KCAL_PER_GRAM["carbs"]),
+        "protein_g": round(calories * protein_share / KCAL_PER_GRAM["protein"]),
+        "fat_g": round(calories * fat_share / KCAL_PER_GRAM["fat"]),
+    }
+
+
+def hydration_targets(training_duration, climate, sweat_rate, weight=REFERENCE_WEIGHT_KG):
+    hours = training_duration / 60
+    sweat_loss_ml = SWEAT_RATE_L_PER_HOUR[sweat_rate] * CLIMATE_FACTORS[climate] * hours * 1000
+    intervals = max(1, training_duration // 15)
+    per_15_min = min(MAX_INTAKE_ML_PER_15_MIN, sweat_loss_ml * DURING_REPLACEMENT_SHARE / intervals)
+    during_ml = per_15_min * intervals
+    post_ml = max(0.0, sweat_loss_ml - during_ml) * POST_TRAINING_REPLACEMENT
+    baseline_ml = weight * BASELINE_FLUID_ML_PER_KG
+    return {
+        "daily_l": round((baseline_ml + sweat_loss_ml) / 100) / 10,
+        "sweat_loss_ml": round(sweat_loss_ml),
+        "pre_training_ml": round(weight * PRE_TRAINING_ML_PER_KG),
+        "per_15_min_ml": round(per_15_min),
+        "during_training_ml": round(during_ml),
+        "post_training_ml": round(post_ml),
+        "sodium_mg": round(sweat_loss_ml / 1000 * SWEAT_SODIUM_MG_PER_L),
+    }
+
+
+def nutrition_summary(inputs):
+    """Labelled figures for the Nutrition tab, in display order."""
+    targets = nutrition_targets(
+        inputs["age"], inputs["gender"], inputs["weight"], inputs["height"],
+        inputs["diet_type"], inputs["activity_level_nutrition"], inputs["calorie_goal"],
+    )
+    return {
+        "BMR (Mifflin-St Jeor)": f"{targets['bmr_kcal']:,} kcal",
+        "Maintenance (TDEE)": f"{targets['tdee_kcal']:,} kcal",
+        "Daily Target": f"{targets['target_kcal']:,} kcal",
+        "Carbohydrate": f"{targets['carbs_g']} g",
+        "Protein": f"{targets['protein_g']} g",
+        "Fat": f"{targets['fat_g']} g",
+    }
+
+
+def hydration_summary(inputs):
+    """Labelled figures for the Hydration tab, in display order."""
+    targets = hydration_targets(inputs["training_duration"], inputs["climate"], inputs["sweat_rate"])
+    return {
+        "Daily Fluid": f"{targets['daily_l']} L",
+        "Pre-Training (2-4 h before)": f"{targets['pre_training_ml']} ml",
+        "During (every 15 min)": f"{targets['per_15_min_ml']} ml",
+        "Post-Training": f"{targets['post_training_ml']} ml",
+        "Estimated Sweat Loss": f"{targets['sweat_loss_ml']} ml",
+        "Sodium to Replace": f"{targets['sodium_mg']} mg",
+    }
@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+class CallMetrics:
+    """Rolling window of per-call timings and token counts, shared by every session.
+
+    Each generation records one sample tagged with its tab and model. When
+    ``jsonl_path`` is set every sample is also appended to that file as it
+    is recorded.
+    """
+
+    def __init__(self, window_seconds=900, max_samples=10_000, jsonl_path=None):
+        self.window_seconds = window_seconds
+        self.jsonl_path = jsonl_path
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, tab, model, latency_ms, prompt_ms=None, ttft_ms=None, input_tokens=0,
+               output_tokens=0, cache_hit=False, retries=0, error=None):
+        sample = {
+            "ts": time.time(),
+            "tab": tab,
+            "model": model,
+            "prompt_ms": prompt_ms,
+            "ttft_ms": ttft_ms,
+            "latency_ms": latency_ms,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cache_hit": cache_hit,
+            "retries": retries,
+            "error": None if error is None else str(error),
+        }
+        with self._lock:
+            self._samples.append(sample)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+
+    def samples(self):
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            while self._samples and self._samples[0]["ts"] < cutoff:
+                self._samples.popleft()
+            return list(self._samples)
+
+    def summary(self):
+        """Per (tab, model) call counts and latency percentiles over the window.
+
+        Cache hits return in well under a millisecond, so their latency is a
+        separate series; mixed in, they would hide how slow the model is.
+        """
+        groups = {}
+        for sample in self.samples():
+            groups.setdefault((sample["tab"], sample["model"]), []).append(sample)
+        summary = {}
+        for key, samples in groups.items():
+            latency = sorted(s["latency_ms"] for s in samples if not s["cache_hit"])
+            hit_latency = sorted(s["latency_ms"] for s in samples if s["cache_hit"])
+            ttft = sorted(s["ttft_ms"] for s in samples if s["ttft_ms"] is not None)
+            prompt = sorted(s["prompt_ms"] for s in samples if s["prompt_ms"] is not None)
+            summary[key] = {
+                "calls": len(samples),
+                "cache_hits": sum(s["cache_hit"] for s in samples),
+                "errors": sum(s["error"] is not None for s in samples),
+                "retries": sum(s["retries"] for s in samples),
+                "input_tokens": sum(s["input_tokens"] for s in samples),
+                "output_tokens": sum(s["output_tokens"] for s in samples),
+                "latency_ms": {q: percentile(latency, q) for q in QUANTILES},
+                "cache_hit_latency_ms": {q: percentile(hit_latency, q) for q in QUANTILES},
+                "ttft_ms": {q: percentile(ttft, q) for q in QUANTILES},
+                "prompt_ms": {q: percentile(prompt, q) for q in QUANTILES},
+            }
+        return summary
+
+    def rows(self, labels=None):
+        labels = labels or {}
+
+        def ms(value):
+            return None if value is None else round(value)
+
+        return [
+            {
+                "Module": labels.get(tab, tab),
+                "Model": model,
+                "Calls": entry["calls"],
+                "Cache Hits": entry["cache_hits"],
+                "Errors": entry["errors"],
+                "Retries": entry["retries"],
+                "p50 (ms)": ms(entry["latency_ms"][0.5]),
+                "p95 (ms)": ms(entry["latency_ms"][0.95]),
+                "p99 (ms)": ms(entry["latency_ms"][0.99]),
+                "TTFT p50 (ms)": ms(entry["ttft_ms"][0.5]),
+                "TTFT p95 (ms)": ms(entry["ttft_ms"][0.95]),
+                "Cache Hit p95 (ms)": None if entry["cache_hit_latency_ms"][0.95] is None
+                else round(entry["cache_hit_latency_ms"][0.95], 2),
+                "Prompt Build p95 (ms)": None if entry["prompt_ms"][0.95] is None
+                else round(entry["prompt_ms"][0.95], 2),
+            }
+            for (tab, model), entry in sorted(self.summary().items())
+        ]
+
+    def prometheus_text(self):
+        lines = []
+        series = (
+            ("coachbot_call_latency_ms", "latency_ms", "Total generation latency, cache misses only."),
+            ("coachbot_cache_hit_latency_ms", "cache_hit_latency_ms", "Latency of answers served from a cache."),
+            ("coachbot_time_to_first_token_ms", "ttft_ms", "Time to the first streamed chunk."),
+            ("coachbot_prompt_build_ms", "prompt_ms", "Time spent rendering the prompt."),
+        )
+        summary = self.summary()
+        for name, field, help_text in series:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for (tab, model), entry in sorted(summary.items()):
+                for q, value in entry[field].items():
+                    if value is not None:
+                        lines.append(f'{name}{{tab="{tab}",model="{model}",quantile="{q}"}} {value:.3f}')
+        counters = (
+            ("coachbot_calls_total", "calls", "Generations in the window."),
+            ("coachbot_cache_hits_total", "cache_hits", "Generations answered from the cache."),
+            ("coachbot_errors_total", "errors", "Generations that failed."),
+            ("coachbot_retries_total", "retries", "Rate-limit and server-error retries."),
+            ("coachbot_input_tokens_total", "input_tokens", "Prompt tokens sent."),
+            ("coachbot_output_tokens_total", "output_tokens", "Response tokens received."),
+        )
+        for name, field, help_text in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for (tab, model), entry in sorted(summary.items()):
+                lines.append(f'{name}{{tab="{tab}",model="{model}"}} {entry[field]}')
+        return "\n".join(lines) + "\n"
+
+    def jsonl(self):
+        return "".join(json.dumps(sample, ensure_ascii=False) + "\n" for sample in self.samples())
+
+
+def metrics_from_env():
+    return CallMetrics(
+        window_seconds=float(os.environ.get("COACHBOT_METRICS_WINDOW", 900)),
+        jsonl_path=os.environ.get("COACHBOT_METRICS_JSONL") or None,
+    )
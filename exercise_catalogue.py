@@ -0,0 +1,204 @@
+"""Bundled exercise and drill catalogue used to ground the prompts.
+
+``exercise_catalogue.json`` lists every exercise once with the sports and
+positions it suits, the body regions it trains, the equipment it needs
+and the injured regions it should be kept away from. It is loaded once
+and indexed by each of those attributes, so picking a shortlist is a few
+set operations (well under a millisecond). The Workout, Warm-up,
+Position Drills and Mobility prompts then ask the model to build the plan
+from that shortlist instead of inventing exercises from scratch.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exercise_catalogue.json")
+ANY = "*"
+
+# Words in a free-text injury answer that point at a body region. A mention
+# is enough to screen the region out, even in "no knee pain": erring that
+# way only drops a few exercises.
+INJURY_KEYWORDS = {
+    "ankle": ("ankle", "achilles", "foot", "feet", "heel", "shin"),
+    "knee": ("knee", "knees", "acl", "mcl", "patella", "patellar", "meniscus"),
+    "hip": ("hip", "hips", "glute", "glutes"),
+    "hamstring": ("hamstring", "hamstrings"),
+    "groin": ("groin", "adductor", "adductors"),
+    "lower_back": ("back", "spine", "lumbar", "disc"),
+    "shoulder": ("shoulder", "shoulders", "rotator", "labrum"),
+    "elbow": ("elbow", "elbows"),
+    "wrist": ("wrist", "wrists", "hand", "hands"),
+    "neck": ("neck", "whiplash", "concussion"),
+}
+
+MOBILITY_REGIONS = {
+    "Lower Body": ("hip", "knee", "ankle", "hamstring", "groin", "lower_body"),
+    "Upper Body": ("shoulder", "elbow", "wrist", "neck", "upper_body"),
+    "Spine & Core": ("spine", "lower_back", "core"),
+    "Hip Mobility": ("hip", "groin"),
+    "Shoulder Mobility": ("shoulder",),
+    "Ankle & Foot": ("ankle",),
+}
+
+WORKOUT_KINDS = ("strength", "power", "conditioning")
+# The Warm-up tab has no equipment question; assume what is at any training ground.
+WARMUP_EQUIPMENT = frozenset({"Resistance Bands", "Cones", "Ball", "Foam Roller", "Yoga Mat"})
+BODYWEIGHT_ONLY = "None (Bodyweight only)"
+
+
+@dataclass(frozen=True)
+class Exercise:
+    name: str
+    kind: str
+    sports: tuple
+    positions: tuple
+    regions: tuple
+    equipment: tuple
+    avoid: tuple
+    dose: str
+    tags: tuple
+
+    def line(self):
+        equipment = ", ".join(self.equipment).lower() or "bodyweight"
+        return f"{self.name} ({self.dose}; {equipment})"
+
+
+class ExerciseCatalogue:
+    def __init__(self, entries):
+        self.exercises = [
+            Exercise(**{name: tuple(value) if isinstance(value, list) else value for name, value in entry.items()})
+            for entry in entries
+        ]
+        self._index = defaultdict(lambda: defaultdict(set))
+        for i, exercise in enumerate(self.exercises):
+            self._index["kind"][exercise.kind].add(i)
+            for field in ("sports", "positions", "regions", "equipment", "avoid", "tags"):
+                for value in getattr(exercise, field):
+                    self._index[field][value].add(i)
+        self._all_equipment = set(self._index["equipment"])
+
+    def _any_of(self, field, values):
+        found = set()
+        for value in values:
+            found |= self._index[field].get(value, set())
+        return found
+
+    def select(self, kinds, sport=None, position=None, regions=None, equipment=None, injured=(), tags=(),
+               limit=10):
+        """Up to ``limit`` exercises, best matches first.
+
+        ``equipment`` is what is available (None means anything is);
+        exercises contraindicated for any ``injured`` region are dropped.
+        """
+        ids = self._any_of("kind", kinds)
+        if sport is not None:
+            ids &= self._any_of("sports", (sport, ANY))
+        if position is not None:
+            ids &= self._any_of("positions", (position, ANY))
+        if regions:
+            ids &= self._any_of("regions", regions)
+        if equipment is not None:
+            ids -= self._any_of("equipment", self._all_equipment - set(equipment))
+        ids -= self._any_of("avoid", injured)
+
+        def score(i):
+            exercise = self.exercises[i]
+            return (
+                -(3 * (position in exercise.positions) + 2 * (sport in exercise.sports)
+                  + len(set(tags) & set(exercise.tags))),
+                i,
+            )
+
+        # Spread the shortlist across body regions rather than stacking one.
+        per_region = max(2, limit // 3)
+        chosen, spare, used = [], [], defaultdict(int)
+        for i in sorted(ids, key=score):
+            region = (self.exercises[i].regions or ("",))[0]
+            if used[region] < per_region:
+                used[region] += 1
+                chosen.append(i)
+            else:
+                spare.append(i)
+        chosen = (chosen + spare)[:limit]
+        return [self.exercises[i] for i in chosen]
+
+
+@lru_cache(maxsize=None)
+def get_catalogue(path=CATALOGUE_PATH):
+    with open(path, encoding="utf-8") as f:
+        return ExerciseCatalogue(json.load(f))
+
+
+@lru_cache(maxsize=None)
+def catalogue_version(path=CATALOGUE_PATH):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def injured_regions(text):
+    words = set(re.findall(r"[a-z]+", (text or "").lower()))
+    return tuple(region for region, keywords in INJURY_KEYWORDS.items() if words.intersection(keywords))
+
+
+def lines(exercises):
+    return [exercise.line() for exercise in exercises]
+
+
+def workout_exercises(values, limit=12):
+    return get_catalogue().select(
+        WORKOUT_KINDS, sport=values["sport"], position=values["position"],
+        injured=injured_regions(values["injuries"]), limit=limit,
+    )
+
+
+def warmup_exercises(values):
+    routine = values["routine_type"]
+    if routine.startswith("Pre-"):
+        kinds = ("warmup",)
+    elif routine.startswith("Rest Day"):
+        kinds = ("cooldown", "mobility")
+    else:
+        kinds = ("cooldown",)
+    return get_catalogue().select(
+        kinds, sport=values["sport_warmup"], position=values["position_warmup"], equipment=WARMUP_EQUIPMENT,
+        tags=tuple(area.lower() for area in values["focus_areas"] or ()),
+        limit=max(4, min(8, values["available_time"] // 2)),
+    )
+
+
+def drill_exercises(values):
+    return get_catalogue().select(
+        ("drill",), sport=values["sport_drill"], position=values["position_drill"],
+        tags=(values["decision_area"],), limit=7,
+    )
+
+
+def mobility_exercises(values):
+    equipment = set(values["equipment"] or ()) - {BODYWEIGHT_ONLY}
+    return get_catalogue().select(
+        ("mobility",), regions=MOBILITY_REGIONS.get(values["mobility_focus"]), equipment=equipment,
+        injured=injured_regions(values["injury_history_mobility"]),
+        limit=max(5, min(10, values["time_available"] // 3)),
+    )
+
+
+# The prompts' shortlists; the offline plans (offline_plans.py) use the exercises directly.
+def workout_shortlist(values):
+    return lines(workout_exercises(values))
+
+
+def warmup_shortlist(values):
+    return lines(warmup_exercises(values))
+
+
+def drill_shortlist(values):
+    return lines(drill_exercises(values))
+
+
+def mobility_shortlist(values):
+    return lines(mobility_exercises(values))
@@ -0,0 +1,381 @@
+import google.generativeai as genai
+import streamlit as st
+import time
+import uuid
+from dataclasses import dataclass, replace
+
+from batch_roster import roster_report, run_roster
+from call_metrics import CallMetrics, metrics_from_env
+from history_store import athlete_key, history_from_env
+from job_queue import job_queue_from_env
+from model_router import ModelRouter, router_from_env
+from offline_plans import OFFLINE_MODEL_NAME, degrade_queue_depth_from_env, is_offline_text, offline_text
+from plan_library import PlanLibrary, library_from_env
+from prompt_registry import COACHING_MODULES
+from rate_limiter import (
+    EXPECTED_OUTPUT_TOKENS, PRIORITY_BATCH, PRIORITY_INTERACTIVE, RateLimiter, is_retryable, limiter_from_env,
+)
+from response_cache import ResponseCache, cache_from_env, make_cache_key
+from semantic_cache import SemanticCache, semantic_cache_from_env
+from single_flight import SingleFlight
+from structured_plans import compact_json, is_structured
+from token_stats import TokenStats, estimate_tokens, response_usage
+
+
+@st.cache_resource
+def get_response_cache():
+    # Shared by every session in this process; set COACHBOT_CACHE_PATH to persist to SQLite.
+    return cache_from_env()
+
+
+@st.cache_resource
+def get_token_stats():
+    return TokenStats()
+
+
+@st.cache_resource
+def get_single_flight():
+    # Identical requests already in flight in any session are awaited, not re-sent.
+    return SingleFlight()
+
+
+@st.cache_resource
+def get_rate_limiter():
+    # One budget for the whole process; set COACHBOT_RPM / COACHBOT_TPM to the project's quota.
+    return limiter_from_env()
+
+
+@st.cache_resource
+def get_call_metrics():
+    # Set COACHBOT_METRICS_JSONL to also append every call to a file.
+    return metrics_from_env()
+
+
+@st.cache_resource
+def get_semantic_cache():
+    # None unless COACHBOT_SEMANTIC_CACHE is set.
+    return semantic_cache_from_env({tab: module.free_text_fields for tab, module in COACHING_MODULES.items()})
+
+
+@st.cache_resource
+def get_plan_library():
+    return library_from_env()
+
+
+@st.cache_resource
+def start_library_refresh(_model, _limiter):
+    # Runs once per process, for the first session with a real model: plans built
+    # for an older template version are regenerated in the background.
+    get_plan_library().start_refresh(_model, _limiter)
+
+
+@st.cache_resource
+def get_model_router(_model):
+    # Per-module model routes, failover and hedging; see model_router.py.
+    return router_from_env(_model)
+
+
+@st.cache_resource
+def get_job_queue():
+    # Generations run here, off the script thread, so a session can start several at once.
+    return job_queue_from_env()
+
+
+@st.cache_resource
+def get_history_store():
+    # Set COACHBOT_HISTORY_PATH to move the database.
+    return history_from_env()
+
+
+def get_session_id():
+    return st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+
+def get_athlete_id():
+    # Without a name, history only lasts as long as the browser session.
+    return athlete_key(st.session_state.get("athlete_id")) or get_session_id()
+
+
+@dataclass
+class Services:
+    """Everything a generation needs, gathered in the script thread.
+
+    Worker threads must not touch st.session_state, so Full Pack and Squad
+    Batch build one of these up front and hand it to generate_text.
+    """
+    model: object
+    cache: ResponseCache
+    token_stats: TokenStats
+    flight: SingleFlight
+    limiter: RateLimiter
+    metrics: CallMetrics
+    session_id: str
+    semantic: SemanticCache = None
+    library: PlanLibrary = None
+    router: ModelRouter = None
+    offline: bool = False
+    degrade_queue_depth: int = 0
+
+
+def get_services():
+    model = st.session_state.model
+    offline = getattr(model, "offline", False)
+    limiter = get_rate_limiter()
+    if not offline:
+        start_library_refresh(model, limiter)
+    return Services(
+        model=model,
+        cache=get_response_cache(),
+        token_stats=get_token_stats(),
+        flight=get_single_flight(),
+        limiter=limiter,
+        metrics=get_call_metrics(),
+        session_id=get_session_id(),
+        semantic=get_semantic_cache(),
+        library=get_plan_library(),
+        # The router keeps the first model it is given, so it never sees the offline stand-in.
+        router=None if offline else get_model_router(model),
+        offline=offline,
+        degrade_queue_depth=degrade_queue_depth_from_env(),
+    )
+
+
+def timed_render(module, inputs):
+    """(prompt, prompt_ms) for a coaching module."""
+    started = time.perf_counter()
+    prompt = module.render(inputs)
+    return prompt, (time.perf_counter() - started) * 1000
+
+
+def build_generation_config(temperature, top_p=0.9, top_k=40, response_schema=None):
+    if response_schema is not None:
+        return genai.types.GenerationConfig(
+            temperature=temperature,
+            top_p=top_p,
+            top_k=top_k,
+            response_mime_type="application/json",
+            response_schema=response_schema,
+        )
+    return genai.types.GenerationConfig(
+        temperature=temperature,
+        top_p=top_p,
+        top_k=top_k,
+    )
+
+
+def record_usage(services, tab, prompt, response, text, estimated_tokens):
+    input_tokens, output_tokens = response_usage(services.model, prompt, response, text)
+    services.token_stats.record(tab, input_tokens, output_tokens)
+    services.limiter.settle(estimated_tokens, input_tokens + output_tokens)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens}
+
+
+def cached_text(services, key, tab, inputs, temperature, top_p, top_k):
+    """Exact cache, then the precomputed plan library, then (when enabled) a near-duplicate."""
+    text = services.cache.get(key)
+    if text is None and services.library is not None:
+        text = services.library.lookup(COACHING_MODULES[tab], inputs)
+    if text is None and services.semantic is not None:
+        text = services.semantic.lookup(services.cache, tab, inputs, temperature, top_p, top_k, None)
+    return text
+
+
+def store_text(services, key, tab, inputs, temperature, top_p, top_k, text):
+    services.cache.set(key, text)
+    if services.semantic is not None:
+        services.semantic.add(tab, inputs, temperature, top_p, top_k, None, key)
+
+
+def record_call(services, tab, started, prompt_ms, model_name=None, **fields):
+    services.metrics.record(tab, model_name or services.model.model_name, (time.perf_counter() - started) * 1000,
+                            prompt_ms=prompt_ms, **fields)
+
+
+def overloaded(services, priority):
+    """True when an interactive request would queue behind too many others to answer promptly."""
+    return (priority == PRIORITY_INTERACTIVE and services.degrade_queue_depth > 0
+            and services.limiter.stats()["queue_depth"] >= services.degrade_queue_depth)
+
+
+def offline_answer(services, tab, inputs, started, prompt_ms):
+    # Never cached: the next request should get a real answer once the model is back.
+    text = offline_text(COACHING_MODULES[tab], inputs)
+    record_call(services, tab, started, prompt_ms, model_name=OFFLINE_MODEL_NAME)
+    return text
+
+
+def stream_text(send, on_text):
+    """Stream a response, calling on_text with the text so far; returns (text, response, attempts, ttft_ms).
+
+    send(stream) issues the request and returns (response, attempts). A
+    streaming failure is redone as one blocking call, and the attempts of
+    both count; a rate-limit or server error that send() already retried to
+    the end is raised as it is.
+    """
+    text = ""
+    ttft_ms = None
+    attempts = 0
+    started = time.perf_counter()
+    try:
+        response, attempts = send(True)
+        for chunk in response:
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started) * 1000
+            text += chunk.text
+            on_text(text)
+    except Exception as e:
+        if not attempts and is_retryable(e):
+            raise
+        # Streaming failed part-way (or isn't supported): redo it as one blocking call.
+        attempts = attempts or getattr(e, "attempts", 1)
+        on_text("")
+        try:
+            response, fallback_attempts = send(False)
+        except Exception as fallback_error:
+            fallback_error.attempts = attempts + getattr(fallback_error, "attempts", 1)
+            raise
+        attempts += fallback_attempts
+        text = response.text
+        ttft_ms = None
+    return text, response, attempts, ttft_ms
+
+
+def generate_text(services, tab, inputs, prompt, temperature, top_p=0.9, top_k=40,
+                  priority=PRIORITY_INTERACTIVE, prompt_ms=None, on_text=None, history=None):
+    """Cached or freshly generated text for one module request.
+
+    Safe to call from worker threads: it never touches st.session_state.
+    With ``on_text`` the response is streamed and on_text gets the text so far.
+    With ``history`` the prompt is sent as the next message of a chat that
+    starts from those turns (see plan_refinement.py). Offline, or under
+    overload, a cache miss is answered by offline_plans.py instead. A
+    failed model call still raises, with an offline plan attached to the
+    exception as ``fallback`` for the UI to show next to the error.
+    """
+    started = time.perf_counter()
+    if services.router is not None:
+        services = replace(services, model=services.router.primary(tab))
+    # Model-independent, like the plan library's keys: an answer is found whichever model
+    # produced it, including after a failover and while offline.
+    key = make_cache_key(tab, inputs, temperature, top_p, top_k, None)
+    text = cached_text(services, key, tab, inputs, temperature, top_p, top_k)
+    if text is not None:
+        record_call(services, tab, started, prompt_ms, cache_hit=True)
+        return text
+    if services.offline or overloaded(services, priority):
+        return offline_answer(services, tab, inputs, started, prompt_ms)
+
+    context = "".join(part for message in history or () for part in message["parts"])
+    estimated = estimate_tokens(context + prompt) + EXPECTED_OUTPUT_TOKENS
+    # Only the caller that actually reaches the model fills this in.
+    usage = {}
+
+    response_schema = COACHING_MODULES[tab].response_schema(inputs)
+
+    def send(stream):
+        generation_config = build_generation_config(temperature, top_p, top_k, response_schema)
+
+        def request(model):
+            if history is None:
+                return services.limiter.call(
+                    lambda: model.generate_content(prompt, generation_config=generation_config, stream=stream),
+                    services.session_id, estimated, priority,
+                )
+            return services.limiter.call(
+                lambda: model.start_chat(history=history).send_message(
+                    prompt, generation_config=generation_config, stream=stream),
+                services.session_id, estimated, priority,
+            )
+
+        if services.router is None:
+            return request(services.model)
+        result, model_name = services.router.call(tab, request, stream)
+        usage["model_name"] = services.router.model(model_name).model_name
+        return result
+
+    def produce():
+        if on_text is None:
+            response, attempts = send(False)
+            text, ttft_ms = response.text, None
+        else:
+            text, response, attempts, ttft_ms = stream_text(send, on_text)
+        if response_schema is not None:
+            text = compact_json(text)
+        store_text(services, key, tab, inputs, temperature, top_p, top_k, text)
+        usage.update(record_usage(services, tab, prompt, response, text, estimated),
+                     retries=attempts - 1, ttft_ms=ttft_ms)
+        return text
+
+    try:
+        text = services.flight.do(key, produce)
+    except Exception as e:
+        record_call(services, tab, started, prompt_ms, retries=getattr(e, "attempts", 1) - 1, error=e)
+        e.fallback = offline_text(COACHING_MODULES[tab], inputs)
+        raise
+    record_call(services, tab, started, prompt_ms, **usage)
+    return text
+
+
+def saved_model_name(services, text):
+    # Offline plans go into the history under their own name, not the model that was unavailable.
+    return OFFLINE_MODEL_NAME if is_offline_text(text) else services.model.model_name
+
+
+def submit_generation(module, inputs, prompt, prompt_ms=None, priority=PRIORITY_INTERACTIVE, history=None,
+                      save_history=True):
+    """Queue one module's generation on the shared job queue and return the job id.
+
+    The plan is saved to the athlete's history when it finishes, even if
+    the session has moved on to another tab by then. Parts of a larger
+    plan pass ``save_history=False`` and the caller saves the whole.
+    """
+    services = get_services()
+    store = get_history_store()
+    athlete_id = get_athlete_id()
+
+    def run(job):
+        def on_text(text):
+            job.partial = text
+
+        # Half-finished JSON is no use on screen, so structured answers arrive in one piece.
+        text = generate_text(services, module.tab, inputs, prompt, module.temperature, module.top_p,
+                             module.top_k, priority, prompt_ms,
+                             on_text=None if is_structured(inputs) else on_text, history=history)
+        if save_history:
+            store.save(athlete_id, module.tab, inputs, text, saved_model_name(services, text))
+        return text
+
+    return get_job_queue().submit(run, services.session_id, module.tab, priority)
+
+
+def submit_roster(jobs, max_workers=4):
+    """Queue a Squad Batch run on the shared job queue and return the job id.
+
+    ``job.partial`` is the list of results so far, in the order they
+    finished; the job's result is {"results", "report", "retries"}. Each
+    plan is saved to its athlete's history as soon as it comes back.
+    """
+    services = get_services()
+    store = get_history_store()
+
+    def generate(module, inputs):
+        prompt, prompt_ms = timed_render(module, inputs)
+        return generate_text(services, module.tab, inputs, prompt, module.temperature,
+                             module.top_p, module.top_k, PRIORITY_BATCH, prompt_ms)
+
+    def run(job):
+        retries_before = services.limiter.stats()["retries"]
+        started = time.perf_counter()
+        results = job.partial = []
+        for result in run_roster(generate, jobs, services.model.model_name, max_workers):
+            if result["error"] is None:
+                store.save(athlete_key(result["athlete"]), result["tab"], result["inputs"],
+                           result["text"], saved_model_name(services, result["text"]))
+            results.append(result)
+        return {
+            "results": results,
+            "report": roster_report(results, time.perf_counter() - started),
+            "retries": services.limiter.stats()["retries"] - retries_before,
+        }
+
+    return get_job_queue().submit(run, services.session_id, "tab13", PRIORITY_BATCH)
@@ -0,0 +1,148 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".coachbot", "history.sqlite3")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS history ("
+    "id INTEGER PRIMARY KEY, athlete_id TEXT NOT NULL, tab TEXT NOT NULL, sport TEXT, "
+    "model TEXT, inputs TEXT NOT NULL, text TEXT NOT NULL, created_at REAL NOT NULL)",
+    # Regenerating the same plan moves it to the top instead of adding a copy.
+    "CREATE UNIQUE INDEX IF NOT EXISTS history_entry ON history (athlete_id, tab, inputs)",
+    "CREATE INDEX IF NOT EXISTS history_athlete ON history (athlete_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS history_tab ON history (tab, created_at)",
+    "CREATE INDEX IF NOT EXISTS history_sport ON history (sport, created_at)",
+    "CREATE INDEX IF NOT EXISTS history_created_at ON history (created_at)",
+)
+
+
+def athlete_key(name):
+    return (name or "").strip().lower()
+
+
+def sport_of(inputs):
+    """The sport a module's inputs refer to (sport, sport_focus, sport_viz, ...), if any."""
+    for name, value in inputs.items():
+        if name.startswith("sport") and value:
+            return str(value)
+    return None
+
+
+class HistoryStore:
+    """SQLite log of every plan an athlete has been shown.
+
+    ``save`` only enqueues the row; a background thread owns the write
+    connection and commits whatever has queued up in one transaction, so
+    the render path never waits on disk.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._queue = queue.Queue()
+        self._read_lock = threading.Lock()
+        writer = self._connect()
+        for statement in SCHEMA:
+            writer.execute(statement)
+        writer.commit()
+        self._reader = self._connect()
+        self._writer = threading.Thread(target=self._write_loop, args=(writer,), daemon=True,
+                                        name="history-writer")
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL lets the history view read while the writer commits.
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _write_loop(self, conn):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                conn.executemany(
+                    "INSERT INTO history (athlete_id, tab, sport, model, inputs, text, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (athlete_id, tab, inputs) DO UPDATE SET "
+                    "text = excluded.text, model = excluded.model, created_at = excluded.created_at",
+                    batch,
+                )
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def save(self, athlete_id, tab, inputs, text, model=None):
+        self._queue.put((
+            athlete_id, tab, sport_of(inputs), model,
+            json.dumps(inputs, sort_keys=True, ensure_ascii=False), text, time.time(),
+        ))
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        self._queue.join()
+
+    def _where(self, athlete_id, tab=None, sport=None):
+        clauses, params = ["athlete_id = ?"], [athlete_id]
+        if tab is not None:
+            clauses.append("tab = ?")
+            params.append(tab)
+        if sport is not None:
+            clauses.append("sport = ?")
+            params.append(sport)
+        return " AND ".join(clauses), params
+
+    def count(self, athlete_id, tab=None, sport=None):
+        where, params = self._where(athlete_id, tab, sport)
+        with self._read_lock:
+            return self._reader.execute(f"SELECT COUNT(*) FROM history WHERE {where}", params).fetchone()[0]
+
+    def page(self, athlete_id, tab=None, sport=None, limit=10, offset=0):
+        """Newest-first entries for one athlete, optionally filtered by tab and sport."""
+        where, params = self._where(athlete_id, tab, sport)
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT tab, sport, model, inputs, text, created_at FROM history "
+                f"WHERE {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [
+            {"tab": tab, "sport": sport, "model": model, "inputs": json.loads(inputs), "text": text,
+             "created_at": created_at}
+            for tab, sport, model, inputs, text, created_at in rows
+        ]
+
+    def top_inputs(self, tab, limit):
+        """The ``limit`` input sets most athletes have asked ``tab`` for."""
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT inputs FROM history WHERE tab = ? GROUP BY inputs ORDER BY COUNT(*) DESC LIMIT ?",
+                (tab, limit),
+            ).fetchall()
+        return [json.loads(inputs) for (inputs,) in rows]
+
+    def sports(self, athlete_id):
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT DISTINCT sport FROM history WHERE athlete_id = ? AND sport IS NOT NULL ORDER BY sport",
+                (athlete_id,),
+            ).fetchall()
+        return [sport for (sport,) in rows]
+
+
+def history_from_env():
+    return HistoryStore(os.environ.get("COACHBOT_HISTORY_PATH", DEFAULT_HISTORY_PATH))
@@ -0,0 +1,133 @@
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+from rate_limiter import PRIORITY_INTERACTIVE
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    def __init__(self, owner, label):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.label = label
+        self.status = QUEUED
+        self.partial = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+
+class JobQueue:
+    """Shared worker pool for generations, addressed by job id.
+
+    The script thread submits work and gets an id back straight away; the
+    result stays here (not in the session) until it is collected or
+    expires, so it survives reruns and tab switches. ``fn`` receives the
+    Job and may update ``job.partial`` with its progress so far.
+
+    Queued jobs start in priority order, and within a priority the owner
+    with the fewest jobs running goes first. No owner runs more than
+    ``max_per_owner`` at once, so a 12-week program or a Full Pack from one
+    session leaves workers free for everyone else.
+    """
+
+    def __init__(self, max_workers=16, max_per_owner=4, keep_seconds=3600):
+        self.max_per_owner = max_per_owner
+        self.keep_seconds = keep_seconds
+        self._jobs = {}
+        self._pending = []
+        self._running = Counter()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        for i in range(max_workers):
+            threading.Thread(target=self._work, name=f"generation_{i}", daemon=True).start()
+
+    def submit(self, fn, owner, label="", priority=PRIORITY_INTERACTIVE):
+        job = Job(owner, label)
+        with self._cond:
+            self._purge()
+            self._jobs[job.id] = job
+            self._pending.append((priority, next(self._seq), job, fn))
+            self._cond.notify()
+        return job.id
+
+    def _next(self):
+        """Take the most urgent pending job whose owner is under the cap; call with the lock held."""
+        ready = [entry for entry in self._pending if self._running[entry[2].owner] < self.max_per_owner]
+        if not ready:
+            return None
+        entry = min(ready, key=lambda entry: (entry[0], self._running[entry[2].owner], entry[1]))
+        self._pending.remove(entry)
+        return entry
+
+    def _work(self):
+        while True:
+            with self._cond:
+                entry = self._next()
+                while entry is None:
+                    self._cond.wait()
+                    entry = self._next()
+                _, _, job, fn = entry
+                self._running[job.owner] += 1
+                job.status = RUNNING
+            try:
+                self._run(job, fn)
+            finally:
+                with self._cond:
+                    self._running[job.owner] -= 1
+                    if not self._running[job.owner]:
+                        del self._running[job.owner]
+                    # The owner is back under its cap, so one of its queued jobs may now start.
+                    self._cond.notify()
+
+    def _run(self, job, fn):
+        try:
+            job.result = fn(job)
+            status = DONE
+        except Exception as e:
+            job.error = e
+            status = FAILED
+        # Other threads treat the status as "finished", so finished_at must already be set.
+        job.finished_at = time.time()
+        job.status = status
+
+    def _purge(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._cond:
+            jobs = list(self._jobs.values())
+        return {
+            "queued": sum(job.status == QUEUED for job in jobs),
+            "running": sum(job.status == RUNNING for job in jobs),
+            "done": sum(job.status == DONE for job in jobs),
+            "failed": sum(job.status == FAILED for job in jobs),
+        }
+
+
+def job_queue_from_env():
+    return JobQueue(
+        max_workers=int(os.environ.get("COACHBOT_JOB_WORKERS", 16)),
+        max_per_owner=int(os.environ.get("COACHBOT_JOBS_PER_SESSION", 4)),
+    )
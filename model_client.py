@@ -0,0 +1,80 @@
+import google.generativeai as genai
+import streamlit as st
+import threading
+import time
+
+
+MODEL_FALLBACK_CHAIN = ("gemini-2.5-flash", "gemini-pro", "gemini-1.0-pro")
+PROBE_TIMEOUT_SECONDS = 5
+# After a failed resolution, every session waits this long before the API is probed again.
+PROBE_RETRY_SECONDS = 60
+
+
+def probe_model(model):
+    # GenerativeModel() never talks to the API, so ask the server about the
+    # model with a cheap token count before trusting it.
+    model.count_tokens("ping", request_options={"timeout": PROBE_TIMEOUT_SECONDS})
+
+
+@st.cache_resource(show_spinner=False)
+def get_model(api_key, fallback_chain=MODEL_FALLBACK_CHAIN):
+    """Configure Gemini once per process and return the first model that answers."""
+    genai.configure(api_key=api_key)
+    failures = []
+    for model_name in fallback_chain:
+        model = genai.GenerativeModel(model_name)
+        try:
+            probe_model(model)
+        except Exception as e:
+            failures.append(f"{model_name}: {e}")
+            continue
+        return model
+    raise RuntimeError("No Gemini model is available - " + "; ".join(failures))
+
+
+class ModelFailures:
+    """The last failed get_model per API key, shared by every session in the process."""
+
+    def __init__(self, retry_seconds=PROBE_RETRY_SECONDS):
+        self.retry_seconds = retry_seconds
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def recent(self, api_key):
+        """The failure message if the key failed less than retry_seconds ago, else None."""
+        with self._lock:
+            failure = self._failures.get(api_key)
+        if failure is not None and time.time() - failure[0] < self.retry_seconds:
+            return failure[1]
+        return None
+
+    def record(self, api_key, error):
+        with self._lock:
+            if error is None:
+                self._failures.pop(api_key, None)
+            else:
+                self._failures[api_key] = (time.time(), str(error))
+
+
+@st.cache_resource(show_spinner=False)
+def get_model_failures():
+    return ModelFailures()
+
+
+def resolve_model(api_key):
+    """get_model, except that a recent failure is re-raised without probing the API again.
+
+    get_model only caches successes; without this, every new session would
+    wait on the probes again while the API is down.
+    """
+    failures = get_model_failures()
+    error = failures.recent(api_key)
+    if error is not None:
+        raise RuntimeError(error)
+    try:
+        model = get_model(api_key)
+    except Exception as e:
+        failures.record(api_key, e)
+        raise
+    failures.record(api_key, None)
+    return model
@@ -0,0 +1,254 @@
+"""Per-module model choice with failover and optional hedged requests.
+
+Light modules (warm-up, hydration) do not need the reasoning of the
+model that writes workout plans, so every coaching module has its own
+ordered list of models. The first healthy model in the list is used;
+on an error the next one is tried. With hedging on, a request that runs
+past the model's own p95 is duplicated to the fastest other healthy
+model in the list and the first answer wins.
+
+Routes come from COACHBOT_MODEL_ROUTES, either inline JSON or a path to
+a JSON file:
+
+    {"tab5": ["gemini-2.5-flash-lite", "gemini-2.5-flash"], "default": ["gemini-2.5-flash"]}
+
+The model picked at startup is always appended as the last resort.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import google.generativeai as genai
+
+from call_metrics import percentile
+
+
+LIGHT_CHAIN = ("gemini-2.5-flash-lite", "gemini-2.5-flash")
+DEFAULT_ROUTES = {
+    "tab5": LIGHT_CHAIN,  # Warm-up/Cool-down
+    "tab7": LIGHT_CHAIN,  # Hydration
+}
+LATENCY_WINDOW = 200
+ERROR_WINDOW = 20
+# A model failing more than this share of its recent calls goes to the back of every route.
+UNHEALTHY_ERROR_RATE = 0.5
+# Outcomes older than this are forgotten, so a demoted model that gets no
+# traffic is tried again once its failures have aged out.
+HEALTH_WINDOW_SECONDS = 120
+HEDGE_MIN_SAMPLES = 20
+
+
+def short_name(model_name):
+    return model_name.split("/")[-1]
+
+
+class ModelStats:
+    """Recent latencies and outcomes of one model.
+
+    Streamed and blocking calls are kept apart: a streamed call returns at
+    the first chunk, so its latency is a time to first token.
+    """
+
+    def __init__(self, health_window_seconds=HEALTH_WINDOW_SECONDS):
+        self.health_window_seconds = health_window_seconds
+        self.latencies = {True: deque(maxlen=LATENCY_WINDOW), False: deque(maxlen=LATENCY_WINDOW)}
+        # (monotonic time, failed) of the most recent calls
+        self.outcomes = deque(maxlen=ERROR_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def record(self, stream, latency_ms, error):
+        self.calls += 1
+        self.outcomes.append((time.monotonic(), error))
+        if error:
+            self.errors += 1
+        else:
+            self.latencies[stream].append(latency_ms)
+
+    def recent(self):
+        cutoff = time.monotonic() - self.health_window_seconds
+        while self.outcomes and self.outcomes[0][0] < cutoff:
+            self.outcomes.popleft()
+        return [failed for _, failed in self.outcomes]
+
+    def error_rate(self):
+        recent = self.recent()
+        return sum(recent) / len(recent) if recent else 0.0
+
+    def healthy(self):
+        return len(self.recent()) < 5 or self.error_rate() <= UNHEALTHY_ERROR_RATE
+
+    def quantile(self, stream, q):
+        return percentile(sorted(self.latencies[stream]), q)
+
+
+class ModelRouter:
+    def __init__(self, default_model, routes=None, hedge=False, hedge_min_samples=HEDGE_MIN_SAMPLES,
+                 health_window_seconds=HEALTH_WINDOW_SECONDS, max_workers=16):
+        self.default_name = short_name(default_model.model_name)
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.health_window_seconds = health_window_seconds
+        self._models = {self.default_name: default_model}
+        self._routes = {}
+        routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        default_route = tuple(routes.pop("default", ()))
+        self._default_route = self._with_fallback(default_route)
+        for tab, names in routes.items():
+            self._routes[tab] = self._with_fallback(names)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+
+    def _with_fallback(self, names):
+        names = [short_name(name) for name in names]
+        if self.default_name not in names:
+            names.append(self.default_name)
+        return tuple(dict.fromkeys(names))
+
+    def route(self, tab):
+        return self._routes.get(tab, self._default_route)
+
+    def routes(self):
+        return {tab: self.route(tab) for tab in sorted(set(self._routes) | {"default"})}
+
+    def model(self, name):
+        with self._lock:
+            if name not in self._models:
+                # GenerativeModel() does not call the API; a bad name shows up as errors.
+                self._models[name] = genai.GenerativeModel(name)
+            return self._models[name]
+
+    def _model_stats(self, name):
+        with self._lock:
+            if name not in self._stats:
+                self._stats[name] = ModelStats(self.health_window_seconds)
+            return self._stats[name]
+
+    def candidates(self, tab):
+        """The tab's route with unhealthy models moved to the back."""
+        stats = {name: self._model_stats(name) for name in self.route(tab)}
+        with self._lock:
+            healthy = {name: model_stats.healthy() for name, model_stats in stats.items()}
+        return sorted(self.route(tab), key=lambda name: not healthy[name])
+
+    def primary(self, tab):
+        return self.model(self.candidates(tab)[0])
+
+    def _timed(self, name, send, stream):
+        stats = self._model_stats(name)
+        started = time.perf_counter()
+        try:
+            result = send(self.model(name))
+        except Exception:
+            with self._lock:
+                stats.record(stream, (time.perf_counter() - started) * 1000, True)
+            raise
+        with self._lock:
+            stats.record(stream, (time.perf_counter() - started) * 1000, False)
+        return result
+
+    def _hedge_target(self, name, others, stream):
+        """(deadline_s, backup) when ``name`` is slow enough to hedge, else None."""
+        stats = self._model_stats(name)
+        with self._lock:
+            if len(stats.latencies[stream]) < self.hedge_min_samples:
+                return None
+            deadline_ms = stats.quantile(stream, 0.95)
+            known = [
+                (self._stats[other].quantile(stream, 0.5), other) for other in others
+                if other in self._stats and self._stats[other].latencies[stream] and self._stats[other].healthy()
+            ]
+        if not known:
+            return None
+        return deadline_ms / 1000, min(known)[1]
+
+    def _hedged(self, name, others, send, stream):
+        """Run ``name``; past its p95, race it against the fastest other model."""
+        target = self._hedge_target(name, others, stream) if self.hedge else None
+        if target is None:
+            return self._timed(name, send, stream), name
+        deadline_s, backup = target
+        first = self._pool.submit(self._timed, name, send, stream)
+        done, _ = wait([first], timeout=deadline_s)
+        if done:
+            return first.result(), name
+        with self._lock:
+            self._stats[name].hedges += 1
+        second = self._pool.submit(self._timed, backup, send, stream)
+        futures = {first: name, second: backup}
+        error = None
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                winner = futures.pop(future)
+                if future.exception() is None:
+                    if winner == backup:
+                        with self._lock:
+                            self._stats[name].hedge_wins += 1
+                    return future.result(), winner
+                error = future.exception()
+        raise error
+
+    def call(self, tab, send, stream=False):
+        """``send(model)`` on the tab's models in order; returns (result, model_name).
+
+        Raises the last error when every model in the route has failed.
+        """
+        candidates = self.candidates(tab)
+        error = None
+        for i, name in enumerate(candidates):
+            if i:
+                with self._lock:
+                    self._stats[candidates[i - 1]].failovers += 1
+            try:
+                return self._hedged(name, candidates[i + 1:], send, stream)
+            except Exception as e:
+                error = e
+        raise error
+
+    def stats(self):
+        """One row per model that has been called, for tuning the routes."""
+        rows = []
+        with self._lock:
+            for name, stats in sorted(self._stats.items()):
+                rows.append({
+                    "model": name,
+                    "calls": stats.calls,
+                    "error_rate": stats.error_rate(),
+                    "healthy": stats.healthy(),
+                    "p50_ms": stats.quantile(False, 0.5),
+                    "p95_ms": stats.quantile(False, 0.95),
+                    "ttft_p50_ms": stats.quantile(True, 0.5),
+                    "ttft_p95_ms": stats.quantile(True, 0.95),
+                    "hedges": stats.hedges,
+                    "hedge_wins": stats.hedge_wins,
+                    "failovers": stats.failovers,
+                })
+        return rows
+
+
+def load_routes(value):
+    """Routes from inline JSON or a JSON file path; None when unset."""
+    if not value:
+        return None
+    if os.path.exists(value):
+        with open(value, encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(value)
+
+
+def router_from_env(default_model):
+    return ModelRouter(
+        default_model,
+        routes=load_routes(os.environ.get("COACHBOT_MODEL_ROUTES")),
+        hedge=os.environ.get("COACHBOT_HEDGE", "").lower() in ("1", "true", "yes", "on"),
+        hedge_min_samples=int(os.environ.get("COACHBOT_HEDGE_MIN_SAMPLES", HEDGE_MIN_SAMPLES)),
+        health_window_seconds=float(os.environ.get("COACHBOT_HEALTH_WINDOW", HEALTH_WINDOW_SECONDS)),
+    )
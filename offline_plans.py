@@ -0,0 +1,421 @@
+"""Plans written locally, for when the model cannot be used.
+
+Without a GEMINI_API_KEY, while the API is unreachable, or when the rate
+limiter's queue is too deep to answer promptly, the coaching tabs are
+answered by these rule-based generators instead. Cached answers and
+precomputed library plans are still served first. Each generator builds
+its plan from the inputs with the same calculators and exercise catalogue
+the prompts use, takes well under a millisecond, and labels the result as
+an offline plan. Offline plans are never written to the response cache.
+"""
+import os
+
+from calculators import hydration_targets, nutrition_targets
+from exercise_catalogue import (
+    drill_exercises, get_catalogue, injured_regions, mobility_exercises, warmup_exercises,
+)
+from periodization import LEVEL_SETTINGS, MINUTES_PER_EXERCISE, build_program
+
+
+OFFLINE_MODEL_NAME = "offline-rules"
+OFFLINE_LABEL = "*⚡ Offline plan - built from CoachBot's rules and exercise catalogue, not written by the AI coach.*"
+
+
+class OfflineModel:
+    """Stands in for the Gemini model when none is available.
+
+    Cache keys do not depend on the model, so answers cached while the API
+    was up are still served; anything that would reach the API fails.
+    """
+    offline = True
+    model_name = OFFLINE_MODEL_NAME
+
+    def _unavailable(self, *args, **kwargs):
+        raise RuntimeError("CoachBot is offline: no Gemini model is available")
+
+    generate_content = count_tokens = start_chat = _unavailable
+
+
+def offline_forced():
+    return os.environ.get("COACHBOT_OFFLINE", "").lower() in ("1", "true", "yes", "on")
+
+
+def is_offline_text(text):
+    # Offline plans are never cached, so only a fresh offline answer starts with the label.
+    return text.startswith(OFFLINE_LABEL)
+
+
+def degrade_queue_depth_from_env():
+    # Interactive requests are answered offline once this many calls are queued; 0 turns it off.
+    return int(os.environ.get("COACHBOT_DEGRADE_QUEUE_DEPTH", 0))
+
+
+def bullets(items):
+    return "\n".join(f"- {item}" for item in items)
+
+
+def numbered(items):
+    return "\n".join(f"{i}. {item}" for i, item in enumerate(items, 1))
+
+
+def exercise_bullets(exercises):
+    return bullets(exercise.line() for exercise in exercises) or "- Bodyweight circuit of your choice, pain-free only"
+
+
+# (focus, exercise kinds, regions) for each training day, in order.
+WORKOUT_DAYS = (
+    ("Lower Body Strength", ("strength",), ("lower_body", "knee", "hip", "hamstring", "ankle", "groin")),
+    ("Upper Body & Core", ("strength",), ("upper_body", "shoulder", "core", "elbow", "wrist")),
+    ("Speed & Power", ("power", "conditioning"), None),
+    ("Full Body Strength", ("strength",), ("full_body", "lower_body", "upper_body", "core")),
+    ("Conditioning", ("conditioning", "power"), None),
+    ("Strength Endurance", ("strength",), None),
+    ("Mobility & Recovery", ("mobility",), None),
+)
+
+
+def workout_plan(values):
+    start_rpe, max_rpe, sets = LEVEL_SETTINGS.get(values["fitness_level"], LEVEL_SETTINGS["Intermediate"])
+    rpe, reps = start_rpe, None
+    if "week" in values:
+        # One week of a periodized program: follow that week's targets.
+        week = build_program(values["fitness_level"], values["training_days"], values["session_duration"],
+                             values["program_weeks"])[values["week"] - 1]
+        rpe, sets, reps = week.rpe, week.sets, week.reps
+    injured = injured_regions(values["injuries"])
+    per_day = max(3, values["session_duration"] // MINUTES_PER_EXERCISE)
+    catalogue = get_catalogue()
+    sections = []
+    for day, (focus, kinds, regions) in enumerate(WORKOUT_DAYS[:values["training_days"]], 1):
+        exercises = catalogue.select(kinds, sport=values["sport"], position=values["position"], regions=regions,
+                                     injured=injured, limit=per_day)
+        sections.append(f"**Day {day} - {focus}** (RPE {rpe}, {sets} working sets"
+                        + (f" of {reps} reps" if reps else "") + ")\n" + exercise_bullets(exercises))
+    notes = [
+        f"Start every session with 10 minutes of the Warm-up tab's routine for {values['sport']}.",
+        f"Add a rep per set each week; once the top of the range feels like RPE {max_rpe}, add load.",
+    ]
+    if injured:
+        notes.append(f"Exercises that load the {', '.join(injured).replace('_', ' ')} were left out. "
+                     "Stop anything that hurts and have the injury checked.")
+    return (f"### {values['training_days']}-Day Plan for a {values['position']} ({values['sport']})\n\n"
+            + "\n\n".join(sections) + "\n\n**Progression & safety**\n" + bullets(notes))
+
+
+INJURY_REGIONS = {
+    "Knee Injury": ("knee",),
+    "Ankle Sprain": ("ankle",),
+    "Shoulder Injury": ("shoulder",),
+    "Hamstring Strain": ("hamstring",),
+    "Lower Back Pain": ("lower_back",),
+    "Wrist/Elbow Injury": ("wrist", "elbow"),
+    "Concussion Recovery": ("neck",),
+}
+
+# (goal, intensity, exercise kinds, sessions per week)
+RECOVERY_PHASES = {
+    "Acute Phase (0-72 hours)": ("Protect the area and settle pain and swelling", "RPE 1-2", (), 7),
+    "Sub-Acute Phase (3-14 days)": ("Restore pain-free range of motion", "RPE 3-4", ("mobility",), 5),
+    "Remodeling Phase (2-6 weeks)": ("Rebuild strength and load tolerance", "RPE 5-6",
+                                     ("mobility", "strength"), 4),
+    "Return to Sport Phase": ("Restore speed, change of direction and sport skills", "RPE 7-8",
+                              ("strength", "power", "conditioning"), 4),
+}
+
+WARNING_SIGNS = (
+    "Pain that is sharp, or worse the next morning",
+    "New swelling, numbness, tingling or giving way",
+    "Headache, dizziness or blurred vision (stop all training)",
+)
+
+
+def recovery_plan(values):
+    goal, intensity, kinds, sessions = RECOVERY_PHASES[values["recovery_phase"]]
+    injury = values["injury_type"]
+    # Not always one of the options: Full Pack sends the athlete's own description.
+    injured = tuple(dict.fromkeys(
+        INJURY_REGIONS.get(injury, ()) + injured_regions(injury) + injured_regions(values["activity_level"])
+    ))
+    if injury == "Post-Surgery Recovery":
+        plan = ("Follow your surgeon's and physio's protocol first; use the guidance here only for the "
+                "parts of the body they have cleared.")
+    elif injury == "Concussion Recovery":
+        plan = ("Follow a graded return-to-play protocol cleared by a doctor. Move to the next stage only after "
+                "24 hours without symptoms: rest, light walking, sport-specific running, non-contact drills, "
+                "then full training.")
+    elif not kinds:
+        plan = ("Relative rest, compression and elevation. Gently move the joints around the injury within "
+                "a pain-free range a few times a day and keep the rest of the body moving.")
+    else:
+        exercises = get_catalogue().select(kinds, sport=values["sport_focus"], injured=injured, limit=6)
+        plan = f"Each session ({intensity}):\n" + exercise_bullets(exercises)
+    return (f"### {injury} - {values['recovery_phase']}\n\n"
+            f"**Goal:** {goal}, working towards *{values['recovery_goal'].lower()}*.\n\n"
+            f"**Sessions:** {sessions} a week at {intensity}, keeping pain at or below 3/10.\n\n"
+            f"{plan}\n\n**Stop and see a physio or doctor if you notice**\n" + bullets(WARNING_SIGNS))
+
+
+# Tips and the drill tag to pair them with, per skill focus.
+TACTICAL_TIPS = {
+    "Decision Making": ("Game Situations", (
+        "Scan before the ball arrives so you already know your next action",
+        "Pick the simplest option that keeps possession when under pressure",
+        "Review one decision after every match: what did you see, what else was on?",
+    )),
+    "Positioning": ("Positioning", (
+        "Check your distance to the nearest teammate and opponent every few seconds",
+        "Move when the ball moves; arrive in space rather than waiting in it",
+        "Know your default position for attack and defence before kick-off",
+    )),
+    "Game Awareness": ("Game Situations", (
+        "Track the score, time and momentum and adjust your risk to them",
+        "Note which opponent is tiring or out of position",
+        "Talk to the coach at breaks about one pattern you have spotted",
+    )),
+    "Communication": ("Communication", (
+        "Use short, agreed calls: name, then instruction",
+        "Talk early, before the action, not after it",
+        "Encourage after mistakes; keep criticism for the debrief",
+    )),
+    "Defensive Tactics": ("Positioning", (
+        "Stay goal-side and on your toes; do not commit to the tackle early",
+        "Show attackers towards the sideline or their weaker side",
+        "Recover your shape first, then press as a unit",
+    )),
+    "Attacking Strategy": ("Transitional Play", (
+        "Attack quickly in the first seconds after winning the ball",
+        "Make runs that pull defenders away for a teammate",
+        "Commit a defender before releasing the pass",
+    )),
+    "Team Play": ("Team Tactics", (
+        "Know the role of the players next to you, not only your own",
+        "Offer a passing angle whenever a teammate is under pressure",
+        "Keep the team's shape when you are not involved in the play",
+    )),
+    "Set Pieces": ("Set Pieces", (
+        "Learn one primary and one backup routine until they are automatic",
+        "Use a clear signal so everyone knows which routine is on",
+        "Watch the opposition's marking set-up before every set piece",
+    )),
+    "Mental Game": ("Under Pressure", (
+        "Have a one-breath reset and a cue word for after every mistake",
+        "Judge yourself on decisions and effort, not only the result",
+        "Keep your body language strong; teammates and opponents read it",
+    )),
+    "Pressure Situations": ("Under Pressure", (
+        "Decide your plan for the big moment before it arrives",
+        "Slow your breathing before set plays and restarts",
+        "Choose the high-percentage option late in close games",
+    )),
+}
+
+EXPERIENCE_NOTES = {
+    "Youth (Under 14)": "Focus on one idea per session and keep it fun.",
+    "Junior (14-18)": "Work on one idea per week and check it in match footage or with your coach.",
+    "College": "Set a measurable target for each match and review it afterwards.",
+    "Semi-Pro": "Study the next opponent and plan two situations where you will apply this.",
+}
+
+
+def tactical_plan(values):
+    tag, tips = TACTICAL_TIPS[values["skill_focus"]]
+    drills = get_catalogue().select(("drill",), sport=values["sport_tactical"],
+                                    position=values["position_tactical"], tags=(tag,), limit=2)
+    situation = (values["match_situation"] or "").strip()
+    return (f"### {values['skill_focus']} for a {values['position_tactical']} ({values['sport_tactical']})\n\n"
+            + numbered(tips)
+            + (f"\n\n**Your situation:** _{situation}_ - pick the tip above that applies and rehearse it "
+               "in the drills below." if situation else "")
+            + "\n\n**Drills**\n" + exercise_bullets(drills)
+            + f"\n\n**Next step:** {EXPERIENCE_NOTES[values['experience_level']]}")
+
+
+# (meal, share of the day's calories)
+MEALS = (
+    ("Breakfast", 0.25),
+    ("Lunch", 0.30),
+    ("Pre-training snack", 0.10),
+    ("Dinner", 0.25),
+    ("Recovery snack", 0.10),
+)
+
+PROTEIN_FOODS = {
+    "Non-Vegetarian": "chicken, fish, eggs, yoghurt, milk",
+    "Eggetarian": "eggs, paneer, yoghurt, lentils, milk",
+    "Vegetarian": "paneer, lentils, chickpeas, yoghurt, milk",
+    "Vegan": "tofu, lentils, chickpeas, soy milk, peanut butter",
+}
+
+
+def nutrition_plan(values):
+    targets = nutrition_targets(
+        values["age"], values["gender"], values["weight"], values["height"],
+        values["diet_type"], values["activity_level_nutrition"], values["calorie_goal"],
+    )
+    rows = ["| Meal | kcal | Carbs (g) | Protein (g) | Fat (g) |", "|---|---|---|---|---|"]
+    for meal, share in MEALS:
+        rows.append(f"| {meal} | {round(targets['target_kcal'] * share)} | {round(targets['carbs_g'] * share)} "
+                    f"| {round(targets['protein_g'] * share)} | {round(targets['fat_g'] * share)} |")
+    notes = [
+        f"Protein at every meal from {PROTEIN_FOODS[values['diet_type']]}.",
+        "Carbohydrate from rice, oats, roti, potatoes and fruit, more on heavy training days.",
+        "Eat the pre-training snack 60-90 minutes before and the recovery snack within an hour after.",
+        "Fill half of lunch and dinner plates with vegetables.",
+    ]
+    allergies = (values["allergies"] or "").strip()
+    if allergies:
+        notes.append(f"Check every food against your restrictions: {allergies}.")
+    if values["age"] < 18:
+        notes.append("Skip supplements unless a doctor or dietitian recommends them.")
+    return (f"### Daily plan: {targets['target_kcal']:,} kcal ({values['calorie_goal']}, "
+            f"{values['diet_type']})\n\n" + "\n".join(rows) + "\n\n" + bullets(notes))
+
+
+WARMUP_CLOSERS = {
+    "Pre-Training Warm-up": "Finish with 2-3 build-up runs at 70-80% pace.",
+    "Pre-Match Warm-up": "Finish with 2-3 short sprints at match pace and a few sport-specific touches.",
+    "Post-Training Cool-down": "Finish with 2 minutes of slow nasal breathing.",
+    "Post-Match Cool-down": "Finish with 2 minutes of slow nasal breathing, then rehydrate and refuel.",
+    "Rest Day Active Recovery": "Add an easy 15-20 minute walk, swim or bike ride.",
+}
+
+
+def warmup_plan(values):
+    exercises = warmup_exercises(values)
+    minutes = max(1, values["available_time"] // max(1, len(exercises)))
+    return (f"### {values['routine_type']} - {values['sport_warmup']} ({values['available_time']} min)\n\n"
+            + numbered(f"{exercise.line()} - about {minutes} min" for exercise in exercises)
+            + f"\n\n{WARMUP_CLOSERS[values['routine_type']]}")
+
+
+MENTAL_TECHNIQUES = {
+    "Tournament Preparation": "Plan each day of the event: sleep, meals, warm-up and one focus cue per game.",
+    "Match Day Focus": "Use a fixed pre-match routine and one cue word you repeat before every restart.",
+    "Overcoming Anxiety": "Breathe 4 counts in, 6 counts out for two minutes; name the feeling as excitement.",
+    "Building Confidence": "Write down three things you did well after every session and reread them before games.",
+    "Handling Pressure": "Focus on the next action only; reset with one breath and your cue word after mistakes.",
+    "Staying Motivated": "Set one small weekly goal and track it where you will see it every day.",
+    "Recovery from Poor Performance": "Review the game once within 24 hours: one thing to keep, one to fix, then move on.",
+    "Concentration Improvement": "Practise 5 minutes of focused breathing daily and bring attention back each time it drifts.",
+}
+
+EVENT_SCHEDULES = {
+    "Today (Game Day)": ("Morning: 5 minutes of breathing and visualization", "Pre-match: your routine and cue word",
+                         "After: note one positive before anything else"),
+    "1-3 Days": ("Daily: 10 minutes of visualization of your role", "Night before: prepare kit and sleep early",
+                 "Game day: follow your routine"),
+    "1 Week": ("Days 1-5: 10 minutes of breathing and visualization daily",
+               "Days 6-7: lighten training and rehearse your pre-match routine", "Game day: follow your routine"),
+    "2-4 Weeks": ("Weeks 1-2: build the routine and practise it at training",
+                  "Final week: use it in every session", "Game day: follow your routine"),
+    "Off-Season": ("Three 10-minute sessions a week", "Review last season's highlights and set goals",
+                   "Keep a short training journal"),
+}
+
+
+def mental_plan(values):
+    challenges = (values["current_challenges"] or "").strip()
+    return (f"### {values['mental_goal']} - {values['sport_mental']}\n\n"
+            f"**Technique:** {MENTAL_TECHNIQUES[values['mental_goal']]}\n\n"
+            f"**Schedule ({values['upcoming_event']}, {values['time_to_event']})**\n"
+            + bullets(EVENT_SCHEDULES[values["time_to_event"]])
+            + (f"\n\n**Your challenge:** _{challenges}_ - when it shows up, use one breath and your cue word, "
+               "then go back to the next action." if challenges else "")
+            + "\n\nTalk to a coach, parent or sports psychologist if worries last for weeks or affect sleep.")
+
+
+def hydration_plan(values):
+    targets = hydration_targets(values["training_duration"], values["climate"], values["sweat_rate"])
+    schedule = [
+        f"Through the day: about {targets['daily_l']} L in total, spread across meals",
+        f"2-4 hours before: {targets['pre_training_ml']} ml of water",
+        f"During: {targets['per_15_min_ml']} ml every 15 minutes ({targets['during_training_ml']} ml in total)",
+        f"After: {targets['post_training_ml']} ml within 2 hours, with a salty snack or meal",
+    ]
+    notes = ["Check your urine: pale straw colour means you are well hydrated."]
+    if targets["sodium_mg"] >= 500 or values["training_duration"] > 60:
+        notes.append(f"Use a sports drink or electrolyte tablet to replace about {targets['sodium_mg']} mg of sodium.")
+    if values["climate"] in ("Hot (30°C+)", "Humid"):
+        notes.append("Drink cool fluids, train in the shade where possible and watch for headache or dizziness.")
+    return (f"### {values['training_duration']}-minute {values['sport_hydration']} session - "
+            f"{values['climate']}\n\n" + numbered(schedule) + "\n\n" + bullets(notes))
+
+
+VISUALIZATION_FOCUS = {
+    "Performance Skills": "Play out your three most important skills, slowly, then at full speed.",
+    "Confidence Building": "Replay your best recent performance, then see yourself repeating it in this game.",
+    "Handling Pressure": "Picture a tense moment, feel your heart rate rise, breathe out and execute calmly.",
+    "Specific Scenarios": "Run through the scenarios below, choosing your response before the moment comes.",
+    "Complete Match Day Experience": "Walk through the whole day: arrival, warm-up, kick-off, key moments, final whistle.",
+}
+
+
+def visualization_plan(values):
+    scenarios = (values["specific_scenarios"] or "").strip()
+    steps = [
+        "Relax (1 min): sit or lie down, eyes closed, slow breathing.",
+        f"Set the scene (1 min): the venue, the crowd and your kit for this {values['match_importance'].lower()}.",
+        f"Rehearse (5 min): {VISUALIZATION_FOCUS[values['viz_preference']]}",
+        f"Handle a setback (1 min): something goes wrong; see yourself reset and make your next "
+        f"{values['position_viz'].lower()} action a good one.",
+        "Finish (1 min): the final whistle, how proud you feel, then open your eyes.",
+    ]
+    return (f"### Visualization script - {values['position_viz']}, {values['sport_viz']}\n\n"
+            + numbered(steps)
+            + (f"\n\n**Scenarios to rehearse:** _{scenarios}_" if scenarios else "")
+            + "\n\nUse it once a day in the week before the game and again the night before.")
+
+
+DRILL_LEVELS = {
+    "Beginner": "Start unopposed and slow; add a passive defender once it is clean.",
+    "Intermediate": "Add active opposition and a time limit for each decision.",
+    "Advanced": "Play at match speed with fatigue: do the drill after conditioning work.",
+}
+
+
+def drill_plan(values):
+    drills = drill_exercises(values)
+    return (f"### {values['decision_area']} drills - {values['position_drill']} ({values['sport_drill']})\n\n"
+            + numbered(drill.line() for drill in drills)
+            + f"\n\n**Progression:** {DRILL_LEVELS[values['skill_level_drill']]}\n\n"
+              "**Coaching cue:** ask the player what they saw before every rep, not only what they did.")
+
+
+MOBILITY_DOSES = {
+    "Improve Flexibility": "hold each position 45-60 seconds",
+    "Reduce Muscle Tension": "hold 30 seconds with long, slow exhales",
+    "Enhance Range of Motion": "8-10 slow controlled reps to end range",
+    "Injury Prevention": "8-10 controlled reps, then a 20-second hold",
+    "Recovery After Training": "30-45 second holds with relaxed breathing",
+    "Joint Health": "10 slow circles or reps each direction",
+}
+
+
+def mobility_plan(values):
+    exercises = mobility_exercises(values)
+    injured = injured_regions(values["injury_history_mobility"])
+    return (f"### {values['mobility_focus']} mobility - {values['time_available']} minutes\n\n"
+            f"**Dose:** {MOBILITY_DOSES[values['mobility_goal']]}.\n\n" + exercise_bullets(exercises)
+            + (f"\n\nMovements that stress the {', '.join(injured).replace('_', ' ')} were left out."
+               if injured else "")
+            + "\n\nMove slowly and stay pain-free; mild stretch is fine, pain is not.")
+
+
+OFFLINE_PLANS = {
+    "tab1": workout_plan,
+    "tab2": recovery_plan,
+    "tab3": tactical_plan,
+    "tab4": nutrition_plan,
+    "tab5": warmup_plan,
+    "tab6": mental_plan,
+    "tab7": hydration_plan,
+    "tab8": visualization_plan,
+    "tab9": drill_plan,
+    "tab10": mobility_plan,
+}
+
+
+def offline_text(module, inputs):
+    """A labelled, rule-based plan for one module request."""
+    values = dict(module.defaults(), **inputs)
+    return OFFLINE_LABEL + "\n\n" + OFFLINE_PLANS[module.tab](values)
@@ -0,0 +1,152 @@
+"""Multi-week periodized programs built on the Workout Plan settings.
+
+The macro structure is plain arithmetic done locally: the program is
+split into Foundation, Strength and Power blocks, every fourth week is a
+deload, and volume and intensity (RPE) progress week on week from a
+starting point set by the fitness level. Only each week's detail is
+written by the model, one short request per week, and the requests run
+in parallel so a 12-week program takes about as long as a single week.
+"""
+from dataclasses import dataclass
+
+
+MIN_WEEKS = 8
+MAX_WEEKS = 12
+DELOAD_EVERY = 4
+MINUTES_PER_EXERCISE = 12
+
+# (name, focus, rep range, volume % of week 1 at the start of the block)
+BLOCKS = (
+    ("Foundation", "movement quality, work capacity and technique", "10-15", 100),
+    ("Strength", "heavier compound lifts with full recovery between sets", "5-8", 95),
+    ("Power", "explosive, sport-specific speed and power", "3-5", 85),
+)
+
+# (starting RPE, highest RPE, working sets per exercise in week 1)
+LEVEL_SETTINGS = {
+    "Beginner": (6.0, 8.0, 2),
+    "Intermediate": (6.5, 8.5, 3),
+    "Advanced": (7.0, 9.0, 4),
+}
+
+VOLUME_STEP = 5  # % added every loading week inside a block
+RPE_STEP = 0.25
+BLOCK_RPE_STEP = 0.5
+DELOAD_VOLUME = 0.6
+DELOAD_RPE_DROP = 1.5
+
+WEEK_TEMPLATE = """Act as an expert sports coach. Write week {number} of a {weeks}-week periodized program for a {position} in {sport}.
+
+Athlete: {fitness_level}, {training_days} training days/week, {session_duration}-minute sessions.
+Injuries/Concerns: {injuries}
+
+Week {number} targets ({phase} block{deload}):
+- Focus: {focus}
+- About {exercises} exercises per session, {sets} working sets of {reps} reps
+- Session intensity: RPE {rpe}
+- Volume: about {weekly_sets} working sets across the week ({volume}% of week 1)
+
+Give a table with one row per training day (day, exercises, sets x reps, RPE), then one line on how this week builds on the last.
+Modify exercises for any injuries. Around 120-150 words."""
+
+
+@dataclass(frozen=True)
+class Week:
+    number: int
+    phase: str
+    focus: str
+    reps: str
+    volume_pct: int
+    rpe: float
+    sets: int
+    exercises: int
+    weekly_sets: int
+    deload: bool = False
+
+
+def block_lengths(weeks):
+    """Weeks per block; the remainder goes to the earlier blocks."""
+    size, extra = divmod(weeks, len(BLOCKS))
+    return [size + (1 if i < extra else 0) for i in range(len(BLOCKS))]
+
+
+def build_program(fitness_level, training_days, session_duration, weeks=MIN_WEEKS):
+    """The week-by-week macro structure, computed locally."""
+    weeks = max(MIN_WEEKS, min(MAX_WEEKS, weeks))
+    start_rpe, max_rpe, base_sets = LEVEL_SETTINGS.get(fitness_level, LEVEL_SETTINGS["Intermediate"])
+    exercises = max(3, session_duration // MINUTES_PER_EXERCISE)
+    program = []
+    number = 0
+    for block, ((phase, focus, reps, block_volume), length) in enumerate(zip(BLOCKS, block_lengths(weeks))):
+        for week_in_block in range(length):
+            number += 1
+            volume = block_volume + VOLUME_STEP * week_in_block
+            rpe = min(max_rpe, start_rpe + BLOCK_RPE_STEP * block + RPE_STEP * week_in_block)
+            deload = number % DELOAD_EVERY == 0
+            if deload:
+                volume = round(volume * DELOAD_VOLUME)
+                rpe = rpe - DELOAD_RPE_DROP
+            program.append(Week(
+                number=number,
+                phase=phase,
+                focus=focus,
+                reps=reps,
+                volume_pct=volume,
+                rpe=round(rpe * 2) / 2,
+                sets=max(2, round(base_sets * volume / 100)),
+                exercises=exercises,
+                weekly_sets=round(base_sets * exercises * training_days * volume / 100),
+                deload=deload,
+            ))
+    return program
+
+
+def program_rows(program):
+    return [
+        {
+            "Week": week.number,
+            "Block": week.phase + (" (deload)" if week.deload else ""),
+            "Reps": week.reps,
+            "Sets": week.sets,
+            "RPE": week.rpe,
+            "Volume %": week.volume_pct,
+            "Weekly Sets": week.weekly_sets,
+        }
+        for week in program
+    ]
+
+
+def week_inputs(inputs, week, weeks):
+    # Extra keys make every week its own cache and single-flight entry.
+    return dict(inputs, program_weeks=weeks, week=week.number)
+
+
+def week_prompt(module, inputs, week, weeks):
+    values = {spec.name: spec.prompt_value(inputs[spec.name]) for spec in module.inputs}
+    prompt = WEEK_TEMPLATE.format(
+        number=week.number,
+        weeks=weeks,
+        phase=week.phase,
+        deload=", deload week" if week.deload else "",
+        focus=week.focus,
+        exercises=week.exercises,
+        sets=week.sets,
+        reps=week.reps,
+        rpe=week.rpe,
+        volume=week.volume_pct,
+        weekly_sets=week.weekly_sets,
+        **values,
+    )
+    shortlist = module.shortlist(inputs) if module.shortlist is not None else []
+    if shortlist:
+        prompt += "\nUse exercises from this injury-screened catalogue shortlist: " + "; ".join(shortlist)
+    return prompt
+
+
+def stitch(program, texts):
+    """One markdown program from each week's text (None for a week that failed)."""
+    sections = []
+    for week, text in zip(program, texts):
+        title = f"#### Week {week.number} - {week.phase}" + (" (deload)" if week.deload else "")
+        sections.append(f"{title}\n\n{text if text is not None else '_This week could not be generated._'}")
+    return "\n\n".join(sections)
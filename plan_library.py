@@ -0,0 +1,261 @@
+"""Precomputed plans for the most common no-free-text requests.
+
+When every free-text field of a request is empty, the remaining inputs
+are closed selections, so the popular combinations can be generated
+ahead of time. The library is a SQLite file keyed by the same
+normalised inputs as the response cache. Every plan records the
+template version it was generated with, and is only served while that
+version is current.
+
+Build or top up the library offline (uses GEMINI_API_KEY):
+
+    python plan_library.py --top 100 --tabs tab5 tab7
+
+Combinations are taken from the generation history, most popular first,
+then filled up from the selectbox options. Inside the app, plans whose
+template version has changed are regenerated by a background thread.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import google.generativeai as genai
+
+from exercise_catalogue import catalogue_version
+from prompt_registry import COACHING_MODULES
+from rate_limiter import EXPECTED_OUTPUT_TOKENS, PRIORITY_BATCH
+from response_cache import make_cache_key
+from token_stats import estimate_tokens
+
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.expanduser("~"), ".coachbot", "plans.sqlite3")
+DEFAULT_TOP_N = 100
+
+
+def template_version(module):
+    """Short hash of everything that shapes a module's answer."""
+    payload = json.dumps([
+        module.template, module.temperature, module.top_p, module.top_k,
+        [(spec.name, spec.widget, list(spec.options), spec.blank) for spec in module.inputs],
+        getattr(module.calculator, "__name__", None),
+        getattr(module.shortlist, "__name__", None),
+        catalogue_version() if module.shortlist is not None else None,
+    ], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def has_free_text(module, inputs):
+    return any((inputs.get(name) or "").strip() for name in module.free_text_fields)
+
+
+def library_key(module, inputs):
+    # Model-independent: a library plan is served whichever fallback model is active.
+    return make_cache_key(module.tab, inputs, module.temperature, module.top_p, module.top_k, None)
+
+
+def enumerate_combinations(module, limit):
+    """Selectbox combinations in option order; every other input keeps its default."""
+    selects = [spec for spec in module.inputs if spec.widget == "selectbox"]
+    defaults = module.defaults()
+    for values in itertools.islice(itertools.product(*(spec.options for spec in selects)), limit):
+        combination = dict(defaults)
+        combination.update(zip((spec.name for spec in selects), values))
+        yield combination
+
+
+def popular_combinations(module, history, limit):
+    """Up to ``limit`` distinct no-free-text inputs, most requested first."""
+    seen = set()
+    candidates = history.top_inputs(module.tab, limit * 4) if history is not None else []
+    for inputs in itertools.chain(candidates, enumerate_combinations(module, limit)):
+        if set(inputs) != {spec.name for spec in module.inputs} or has_free_text(module, inputs):
+            continue
+        key = library_key(module, inputs)
+        if key not in seen:
+            seen.add(key)
+            yield inputs
+            if len(seen) >= limit:
+                return
+
+
+class PlanLibrary:
+    def __init__(self, path=DEFAULT_LIBRARY_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "tab TEXT NOT NULL, key TEXT NOT NULL, version TEXT NOT NULL, model TEXT, "
+            "inputs TEXT NOT NULL, text TEXT NOT NULL, built_at REAL NOT NULL, "
+            "PRIMARY KEY (tab, key))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._versions = {tab: template_version(module) for tab, module in COACHING_MODULES.items()}
+        self.hits = 0
+        self.misses = 0
+        self.refreshing = False
+        self.refreshed = 0
+
+    def lookup(self, module, inputs):
+        """A current-version plan for a no-free-text request, or None."""
+        if has_free_text(module, inputs):
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM plans WHERE tab = ? AND key = ? AND version = ?",
+                (module.tab, library_key(module, inputs), self._versions[module.tab]),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def store(self, module, inputs, text, model_name=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plans (tab, key, version, model, inputs, text, built_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (module.tab, library_key(module, inputs), self._versions[module.tab], model_name,
+                 json.dumps(inputs, sort_keys=True, ensure_ascii=False), text, time.time()),
+            )
+            self._conn.commit()
+
+    def contains(self, module, inputs):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM plans WHERE tab = ? AND key = ? AND version = ?",
+                (module.tab, library_key(module, inputs), self._versions[module.tab]),
+            ).fetchone() is not None
+
+    def stale(self):
+        """(module, inputs) for every plan built with an out-of-date template."""
+        with self._lock:
+            rows = self._conn.execute("SELECT tab, version, inputs FROM plans").fetchall()
+        return [
+            (COACHING_MODULES[tab], json.loads(inputs))
+            for tab, version, inputs in rows
+            if tab in COACHING_MODULES and version != self._versions[tab]
+        ]
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT tab, version FROM plans").fetchall()
+            lookups = self.hits + self.misses
+            return {
+                "plans": sum(1 for tab, version in rows if self._versions.get(tab) == version),
+                "stale": sum(1 for tab, version in rows if self._versions.get(tab) != version),
+                "hits": self.hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "refreshing": self.refreshing,
+                "refreshed": self.refreshed,
+            }
+
+    def build(self, generate, jobs, max_workers=4):
+        """Generate and store (module, inputs) jobs, yielding (module, inputs, error) as each finishes.
+
+        ``generate(module, prompt)`` returns (text, model_name).
+        """
+        def work(module, inputs):
+            text, model_name = generate(module, module.render(inputs))
+            self.store(module, inputs, text, model_name)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(work, *job): job for job in jobs}
+            for future in as_completed(futures):
+                module, inputs = futures[future]
+                try:
+                    future.result()
+                    yield module, inputs, None
+                except Exception as e:
+                    yield module, inputs, e
+
+    def start_refresh(self, model, limiter, max_workers=2):
+        """Regenerate stale plans on a daemon thread, at batch priority."""
+        jobs = self.stale()
+        if not jobs or self.refreshing:
+            return
+        self.refreshing = True
+
+        def generate(module, prompt):
+            return limited_generate(model, limiter, "plan-library", module, prompt), model.model_name
+
+        def run():
+            try:
+                for _, _, error in self.build(generate, jobs, max_workers=max_workers):
+                    if error is None:
+                        self.refreshed += 1
+            finally:
+                self.refreshing = False
+
+        threading.Thread(target=run, daemon=True, name="plan-library-refresh").start()
+
+
+def limited_generate(model, limiter, session_id, module, prompt):
+    generation_config = genai.types.GenerationConfig(
+        temperature=module.temperature, top_p=module.top_p, top_k=module.top_k,
+    )
+    response, _ = limiter.call(
+        lambda: model.generate_content(prompt, generation_config=generation_config),
+        session_id, estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS, PRIORITY_BATCH,
+    )
+    return response.text
+
+
+def library_from_env():
+    return PlanLibrary(os.environ.get("COACHBOT_LIBRARY_PATH", DEFAULT_LIBRARY_PATH))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_N, help="combinations per module")
+    parser.add_argument("--tabs", nargs="*", default=list(COACHING_MODULES))
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    from history_store import history_from_env
+    from model_client import get_model
+    from rate_limiter import limiter_from_env
+
+    try:
+        model = get_model(os.environ["GEMINI_API_KEY"])
+    except (KeyError, RuntimeError) as e:
+        print(f"Cannot build the library: {e}")
+        return 1
+
+    library = library_from_env()
+    history = history_from_env()
+    limiter = limiter_from_env()
+    jobs = [
+        (module, inputs)
+        for tab in args.tabs
+        for module in [COACHING_MODULES[tab]]
+        for inputs in popular_combinations(module, history, args.top)
+        if not library.contains(module, inputs)
+    ] + library.stale()
+
+    def generate(module, prompt):
+        return limited_generate(model, limiter, "plan-library", module, prompt), model.model_name
+
+    failures = 0
+    for done, (module, inputs, error) in enumerate(library.build(generate, jobs, args.workers), start=1):
+        if error is not None:
+            failures += 1
+            print(f"[{done}/{len(jobs)}] {module.tab} failed: {error}")
+        elif done % 10 == 0 or done == len(jobs):
+            print(f"[{done}/{len(jobs)}] built")
+    print(library.stats())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Refine a plan by sending only what changed.
+
+After a plan has been generated, changing an input no longer has to mean
+a full regeneration: the previous request and plan are replayed as chat
+history (``model.start_chat``) and the new message lists just the
+changed inputs, plus the recalculated targets and the re-screened
+exercise shortlist whenever those moved with them. Each refinement adds one exchange; once the history
+holds more than ``MAX_REFINE_TURNS`` of them it is collapsed back to a
+single exchange, the full prompt for the latest inputs and the latest
+plan, so the context sent never keeps growing.
+"""
+from structured_plans import OUTPUT_FORMAT, is_structured
+
+
+MAX_REFINE_TURNS = 3
+
+
+def turn(role, text):
+    return {"role": role, "parts": [text]}
+
+
+def input_changes(module, before, after):
+    """[(label, old, new)] for every input that differs, as the prompt would show it."""
+    if is_structured(before) != is_structured(after):
+        # A format switch changes the whole answer; that needs a fresh generation.
+        return []
+    changes = []
+    for spec in module.inputs:
+        if spec.name == OUTPUT_FORMAT or spec.name not in before:
+            continue
+        old, new = spec.prompt_value(before[spec.name]), spec.prompt_value(after[spec.name])
+        if old != new:
+            changes.append((spec.label, old, new))
+    return changes
+
+
+def refinement_message(module, before, after, changes):
+    lines = ["The athlete's details have changed:"]
+    lines.extend(f"- {label}: {old} -> {new}" for label, old, new in changes)
+    # The first prompt's targets and shortlist are still in the history; replace them when they moved.
+    figures = module.calculate(after)
+    if figures != module.calculate(before):
+        lines.append("Updated pre-calculated targets (use these exact numbers, do not recalculate):")
+        lines.extend(f"- {label}: {value}" for label, value in figures.items())
+    if module.shortlist is not None:
+        shortlist = module.shortlist(after)
+        if shortlist != module.shortlist(before):
+            lines.append("Updated shortlist from the exercise catalogue, screened for any injuries "
+                         "(use these in place of the earlier shortlist):")
+            lines.extend(f"- {line}" for line in shortlist)
+    lines.append("Update your previous plan for these changes only. Keep its format and length, "
+                 "and keep everything the changes do not affect.")
+    return "\n".join(lines)
+
+
+def refine_history(module, result):
+    """Chat history to send with the next refinement of ``result``."""
+    history = result["history"]
+    if len(history) > 2 * MAX_REFINE_TURNS:
+        # The latest plan already reflects every earlier change.
+        history = [turn("user", module.render(result["inputs"])), turn("model", result["text"])]
+    return history
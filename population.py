@@ -0,0 +1,148 @@
+"""Vectorized nutrition and hydration targets for whole leagues.
+
+Same formulas and constants as ``calculators``, applied to pandas/NumPy
+columns without per-row Python loops, so league-wide reports over
+millions of athletes take seconds.
+"""
+import numpy as np
+import pandas as pd
+
+from calculators import (
+    ACTIVITY_FACTORS, BASELINE_FLUID_ML_PER_KG, CALORIE_GOAL_FACTORS, CLIMATE_FACTORS,
+    DURING_REPLACEMENT_SHARE, KCAL_PER_GRAM, MACRO_SPLITS, MAX_INTAKE_ML_PER_15_MIN,
+    POST_TRAINING_REPLACEMENT, PRE_TRAINING_ML_PER_KG, REFERENCE_WEIGHT_KG,
+    SWEAT_RATE_L_PER_HOUR, SWEAT_SODIUM_MG_PER_L,
+)
+
+
+# Input columns (named like the Nutrition/Hydration widgets) and the value
+# used when a column is missing from the uploaded data.
+POPULATION_COLUMNS = {
+    "age": 15,
+    "gender": "Male",
+    "weight": 60,
+    "height": 170,
+    "diet_type": "Non-Vegetarian",
+    "activity_level_nutrition": "Moderate (3-4 sessions)",
+    "calorie_goal": "Maintain Weight",
+    "training_duration": 90,
+    "climate": "Moderate (15-25°C)",
+    "sweat_rate": "Moderate",
+}
+
+TARGET_COLUMNS = [
+    "bmr_kcal", "tdee_kcal", "target_kcal", "carbs_g", "protein_g", "fat_g",
+    "daily_l", "sweat_loss_ml", "pre_training_ml", "per_15_min_ml",
+    "during_training_ml", "post_training_ml", "sodium_mg",
+]
+
+
+def bmr_mifflin_st_jeor(weight, height, age, is_male):
+    base = 10 * weight + 6.25 * height - 5 * age
+    return base + np.where(is_male, 5.0, -161.0)
+
+
+def bmr_harris_benedict(weight, height, age, is_male):
+    male = 88.362 + 13.397 * weight + 4.799 * height - 5.677 * age
+    female = 447.593 + 9.247 * weight + 3.098 * height - 4.330 * age
+    return np.where(is_male, male, female)
+
+
+BMR_FORMULAS = {
+    "mifflin": bmr_mifflin_st_jeor,
+    "harris": bmr_harris_benedict,
+}
+
+
+def _lookup(series, table):
+    """Map labels to numbers via categorical codes; unknown labels become NaN.
+
+    ``table`` maps each label to a number or a tuple of numbers; tuples give
+    one output array per position, sharing a single code computation.
+    """
+    codes = pd.Categorical(series, categories=list(table)).codes
+    values = np.asarray(list(table.values()), dtype=float)
+    # Code -1 (unknown label) indexes the trailing NaN row.
+    values = np.concatenate([values, np.full((1,) + values.shape[1:], np.nan)])
+    looked_up = values[codes]
+    return looked_up if looked_up.ndim == 1 else tuple(looked_up.T)
+
+
+def nutrition_arrays(age, weight, height, is_male, activity_factor, goal_factor,
+                     carbs_share, protein_share, fat_share, formula="mifflin"):
+    """Energy and macro targets from plain NumPy arrays."""
+    bmr = BMR_FORMULAS[formula](weight, height, age, is_male)
+    tdee = bmr * activity_factor
+    calories = tdee * goal_factor
+    return {
+        "bmr_kcal": np.round(bmr),
+        "tdee_kcal": np.round(tdee),
+        "target_kcal": np.round(calories),
+        "carbs_g": np.round(calories * carbs_share / KCAL_PER_GRAM["carbs"]),
+        "protein_g": np.round(calories * protein_share / KCAL_PER_GRAM["protein"]),
+        "fat_g": np.round(calories * fat_share / KCAL_PER_GRAM["fat"]),
+    }
+
+
+def hydration_arrays(training_duration, sweat_l_per_hour, climate_factor, weight=REFERENCE_WEIGHT_KG):
+    """Fluid and sodium targets from plain NumPy arrays."""
+    sweat_loss_ml = sweat_l_per_hour * climate_factor * (training_duration / 60) * 1000
+    intervals = np.maximum(1, training_duration // 15)
+    per_15_min = np.minimum(MAX_INTAKE_ML_PER_15_MIN, sweat_loss_ml * DURING_REPLACEMENT_SHARE / intervals)
+    during_ml = per_15_min * intervals
+    post_ml = np.maximum(0.0, sweat_loss_ml - during_ml) * POST_TRAINING_REPLACEMENT
+    baseline_ml = weight * BASELINE_FLUID_ML_PER_KG
+    return {
+        "daily_l": np.round((baseline_ml + sweat_loss_ml) / 100) / 10,
+        "sweat_loss_ml": np.round(sweat_loss_ml),
+        "pre_training_ml": np.round(weight * PRE_TRAINING_ML_PER_KG + np.zeros_like(sweat_loss_ml)),
+        "per_15_min_ml": np.round(per_15_min),
+        "during_training_ml": np.round(during_ml),
+        "post_training_ml": np.round(post_ml),
+        "sodium_mg": np.round(sweat_loss_ml / 1000 * SWEAT_SODIUM_MG_PER_L),
+    }
+
+
+def population_targets(athletes, formula="mifflin"):
+    """Return ``athletes`` with every target column appended.
+
+    Missing input columns are filled with the widget defaults. Unlike the
+    Hydration tab, each athlete's own weight is used for the fluid targets.
+    Rows whose diet, activity, goal, climate or sweat-rate labels are not
+    recognised get NaN targets; any gender other than "Male" uses the
+    female equations, as the Nutrition tab does.
+    """
+    df = athletes.copy()
+    for column, default in POPULATION_COLUMNS.items():
+        if column not in df.columns:
+            df[column] = default
+
+    age = df["age"].to_numpy(dtype=float)
+    weight = df["weight"].to_numpy(dtype=float)
+    height = df["height"].to_numpy(dtype=float)
+    is_male = (df["gender"] == "Male").to_numpy()
+    carbs_share, protein_share, fat_share = _lookup(df["diet_type"], MACRO_SPLITS)
+
+    targets = nutrition_arrays(
+        age, weight, height, is_male,
+        _lookup(df["activity_level_nutrition"], ACTIVITY_FACTORS),
+        _lookup(df["calorie_goal"], CALORIE_GOAL_FACTORS),
+        carbs_share, protein_share, fat_share,
+        formula=formula,
+    )
+    targets.update(hydration_arrays(
+        df["training_duration"].to_numpy(dtype=float),
+        _lookup(df["sweat_rate"], SWEAT_RATE_L_PER_HOUR),
+        _lookup(df["climate"], CLIMATE_FACTORS),
+        weight,
+    ))
+    for column in TARGET_COLUMNS:
+        df[column] = targets[column]
+    return df
+
+
+def population_summary(targets):
+    """League-level mean/median/min/max of each target, for the Dashboard."""
+    return targets[TARGET_COLUMNS].describe().loc[["mean", "50%", "min", "max"]].T.rename(
+        columns={"50%": "median"}
+    )
@@ -0,0 +1,730 @@
+"""Single source of truth for the ten coaching modules.
+
+Each module declares its input widgets, prompt template and generation
+parameters once. The tabs, the Dashboard feature table, the Full Pack and
+the Squad Batch all read from ``COACHING_MODULES``. Templates are parsed
+and checked against the declared inputs when this module is imported, so
+a typo in a placeholder fails at startup rather than on a button press.
+
+Templates are compacted as they are compiled and free-text answers are
+sanitized and capped before they are substituted, so every request ships
+only the characters the model actually needs.
+"""
+import re
+import string
+from dataclasses import dataclass, field
+
+from calculators import hydration_summary, nutrition_summary
+from exercise_catalogue import drill_shortlist, mobility_shortlist, warmup_shortlist, workout_shortlist
+from structured_plans import JSON_INSTRUCTION, NUTRITION_FORMAT, WORKOUT_FORMAT, is_structured
+
+
+SPORTS_ALL = (
+    "Football", "Cricket", "Basketball", "Tennis",
+    "Athletics", "Swimming", "Volleyball", "Hockey", "Rugby", "Other",
+)
+SPORTS_CORE = ("Football", "Cricket", "Basketball", "Tennis", "Athletics", "Swimming")
+SPORTS_TEAM = ("Football", "Cricket", "Basketball", "Tennis", "Volleyball", "Hockey")
+FITNESS_LEVELS = ("Beginner", "Intermediate", "Advanced")
+POSITIONS_ALL = (
+    "Striker/Forward", "Midfielder", "Defender", "Goalkeeper",
+    "Bowler", "Batsman", "Wicket Keeper", "All-rounder",
+    "Point Guard", "Shooting Guard", "Center", "Power Forward", "Small Forward",
+    "Sprinter", "Distance Runner", "Jumper", "Thrower",
+    "General Athlete",
+)
+CLIMATES = (
+    "Cool (Under 15°C)", "Moderate (15-25°C)",
+    "Warm (25-30°C)", "Hot (30°C+)", "Humid",
+)
+SWEAT_RATES = ("Low", "Moderate", "High", "Very High")
+DIET_TYPES = ("Non-Vegetarian", "Vegetarian", "Vegan", "Eggetarian")
+ACTIVITY_LEVELS = (
+    "Light (1-2 training sessions)", "Moderate (3-4 sessions)",
+    "Heavy (5-6 sessions)", "Very Heavy (Daily + Competition)",
+)
+
+MAX_FREE_TEXT_CHARS = 300
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
+
+
+def compact_template(template):
+    """Strip trailing spaces and outer blank lines, and collapse runs of blank lines."""
+    lines = [line.rstrip() for line in template.strip().splitlines()]
+    compacted = []
+    for line in lines:
+        if line or (compacted and compacted[-1]):
+            compacted.append(line)
+    return "\n".join(compacted)
+
+
+def sanitize_free_text(value, max_chars=MAX_FREE_TEXT_CHARS):
+    """Flatten whitespace, drop control characters and cap the length of user text."""
+    value = " ".join(_CONTROL_CHARS.sub(" ", value).split())
+    if len(value) > max_chars:
+        value = value[:max_chars].rsplit(" ", 1)[0] + "..."
+    return value
+
+
+@dataclass(frozen=True)
+class Input:
+    name: str
+    widget: str
+    label: str
+    key: str
+    column: int = None  # None renders full width below the columns
+    options: tuple = ()
+    min_value: int = None
+    max_value: int = None
+    default: object = None
+    placeholder: str = ""
+    blank: str = ""  # Used in the prompt when a text or multiselect input is left empty
+
+    def prompt_value(self, value):
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(value)
+        if self.widget == "text_area":
+            value = sanitize_free_text(value or "")
+        if value == "" and self.blank:
+            return self.blank
+        return value
+
+
+@dataclass(frozen=True)
+class CoachingModule:
+    tab: str
+    label: str
+    sub_header: str
+    feature: str
+    best_for: str
+    temperature: float
+    temperature_note: str
+    box_class: str
+    heading: str
+    button: str
+    spinner_text: str
+    error_label: str
+    inputs: tuple
+    template: str
+    top_p: float = 0.9
+    top_k: int = 40
+    calculator: object = None  # inputs -> {label: value} computed locally and injected into the prompt
+    structured: object = None  # StructuredFormat for an optional JSON answer
+    shortlist: object = None  # inputs -> [exercise line] picked from the local catalogue
+    _parts: tuple = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        parts = tuple(
+            (literal, name)
+            for literal, name, _, _ in string.Formatter().parse(compact_template(self.template))
+        )
+        placeholders = {name for _, name in parts if name is not None}
+        declared = {spec.name for spec in self.inputs}
+        if placeholders != declared:
+            raise ValueError(
+                f"{self.tab} template placeholders {sorted(placeholders)} "
+                f"do not match declared inputs {sorted(declared)}"
+            )
+        object.__setattr__(self, "_parts", parts)
+
+    @property
+    def free_text_fields(self):
+        return tuple(spec.name for spec in self.inputs if spec.widget == "text_area")
+
+    @property
+    def column_count(self):
+        return max((spec.column + 1 for spec in self.inputs if spec.column is not None), default=0)
+
+    def defaults(self):
+        return {spec.name: spec.default for spec in self.inputs}
+
+    def calculate(self, values):
+        return self.calculator(values) if self.calculator is not None else {}
+
+    def render(self, values):
+        specs = {spec.name: spec for spec in self.inputs}
+        chunks = []
+        for literal, name in self._parts:
+            chunks.append(literal)
+            if name is not None:
+                chunks.append(str(specs[name].prompt_value(values[name])))
+        figures = self.calculate(values)
+        if figures:
+            chunks.append("\n\nPre-calculated targets (use these exact numbers, do not recalculate):")
+            chunks.extend(f"\n- {label}: {value}" for label, value in figures.items())
+        shortlist = self.shortlist(values) if self.shortlist is not None else []
+        if shortlist:
+            chunks.append("\n\nShortlist from the exercise catalogue, matched to the details above and "
+                          "screened for any injuries (build the plan from these by name; add others only if essential):")
+            chunks.extend(f"\n- {line}" for line in shortlist)
+        if self.structured is not None and is_structured(values):
+            chunks.append(JSON_INSTRUCTION)
+        return "".join(chunks)
+
+    def response_schema(self, values):
+        """The JSON schema to request for these inputs, or None for markdown."""
+        return self.structured.schema if self.structured is not None and is_structured(values) else None
+
+
+def _select(name, label, key, options, column=0):
+    return Input(name, "selectbox", label, key, column, options=options, default=options[0])
+
+
+def _slider(name, label, key, min_value, max_value, default, column=0):
+    return Input(name, "slider", label, key, column,
+                 min_value=min_value, max_value=max_value, default=default)
+
+
+def _number(name, label, key, min_value, max_value, default, column=0):
+    return Input(name, "number_input", label, key, column,
+                 min_value=min_value, max_value=max_value, default=default)
+
+
+def _text(name, label, key, placeholder, blank, column=None):
+    return Input(name, "text_area", label, key, column, default="",
+                 placeholder=placeholder, blank=blank)
+
+
+def _multi(name, label, key, options, blank, column=None):
+    return Input(name, "multiselect", label, key, column, options=options, default=[], blank=blank)
+
+
+_MODULE_LIST = [
+    CoachingModule(
+        tab="tab1",
+        label="🏋️ Workout Plan",
+        sub_header="🏋️ Full-Body Workout Plan Generator",
+        feature="Full-Body Workout Plans",
+        best_for="Strength & Conditioning",
+        temperature=0.7,
+        temperature_note="Fixed",
+        box_class="success-box",
+        heading="### 📋 Your Personalized Workout Plan",
+        button="Generate Workout Plan",
+        spinner_text="Creating your personalized workout plan...",
+        error_label="workout plan",
+        structured=WORKOUT_FORMAT,
+        shortlist=workout_shortlist,
+        inputs=(
+            _select("sport", "Select Sport", "tab1_sport", SPORTS_ALL),
+            _select("position", "Player Position", "tab1_position", POSITIONS_ALL),
+            _select("fitness_level", "Fitness Level", "tab1_fitness", FITNESS_LEVELS, column=1),
+            _slider("training_days", "Training Days per Week", "tab1_days", 3, 7, 4, column=1),
+            _slider("session_duration", "Session Duration (minutes)", "tab1_duration", 30, 120, 60, column=1),
+            _text("injuries", "Current Injuries or Problem Areas (leave blank if none)", "tab1_injuries",
+                  "e.g., ankle sprain, shoulder strain, knee pain...", "None - fully healthy"),
+        ),
+        template="""
+Act as an expert sports coach and create a comprehensive full-body workout plan for a {position} in {sport}.
+
+Athlete Profile:
+- Fitness Level: {fitness_level}
+- Training Days: {training_days} days/week
+- Session Duration: {session_duration} minutes
+- Injuries/Concerns: {injuries}
+
+Requirements:
+1. Create a structured weekly plan with specific exercises for each training day
+2. Include sets, reps, and rest periods
+3. Focus on position-specific skills and conditioning
+4. Modify exercises to accommodate any injuries
+5. Include progressive overload principles
+6. Provide clear instructions for each exercise
+7. Add intensity scales (RPE) for each session
+8. Response should be around 250-300 words
+9.Table is must in the workout plan
+
+
+Format the output in a clear, organized structure with weekly overview and daily breakdowns.
+Include safety warnings where applicable.
+""",
+    ),
+    CoachingModule(
+        tab="tab2",
+        label="🏥 Recovery",
+        sub_header="🏥 Safe Recovery Training Schedule",
+        feature="Recovery Training Schedules",
+        best_for="Injury Rehabilitation",
+        temperature=0.5,
+        temperature_note="Safety",
+        box_class="warning-box",
+        heading="### 🩺 Your Recovery Training Schedule",
+        button="Generate Recovery Plan",
+        spinner_text="Designing your safe recovery program...",
+        error_label="recovery plan",
+        inputs=(
+            _select("injury_type", "Type of Injury", "tab2_injury", (
+                "None - General Recovery", "Knee Injury", "Ankle Sprain", "Shoulder Injury",
+                "Hamstring Strain", "Lower Back Pain", "Wrist/Elbow Injury", "Concussion Recovery",
+                "Muscle Strain", "Joint Pain", "Post-Surgery Recovery",
+            )),
+            _select("recovery_phase", "Recovery Phase", "tab2_phase", (
+                "Acute Phase (0-72 hours)", "Sub-Acute Phase (3-14 days)",
+                "Remodeling Phase (2-6 weeks)", "Return to Sport Phase",
+            )),
+            _select("sport_focus", "Sport Focus", "tab2_sport", SPORTS_CORE + ("Other",), column=1),
+            _select("recovery_goal", "Primary Goal", "tab2_goal", (
+                "Maintain Fitness", "Regain Mobility", "Strengthen Weak Areas",
+                "Return to Play Prep", "Prevent Re-injury",
+            ), column=1),
+            _text("activity_level", "Current Activity Level", "tab2_activity",
+                  "e.g., can walk 20 mins, light jogging possible...", "Standard for this phase"),
+        ),
+        template="""
+Act as a sports physical therapist and create a safe, progressive recovery training schedule.
+
+Athlete Profile:
+- Injury: {injury_type}
+- Recovery Phase: {recovery_phase}
+- Sport: {sport_focus}
+- Recovery Goal: {recovery_goal}
+- Current Activity: {activity_level}
+
+Requirements:
+1. Create a phased recovery plan with clear progression criteria
+2. Include mobility, strengthening, and conditioning exercises
+3. Specify exercises to AVOID at this stage
+4. Provide RPE (Rate of Perceived Exertion) guidelines
+5. Include daily pain monitoring recommendations
+6. Add signs to watch for that require medical attention
+7. Suggest cross-training activities that are safe
+8. Include timeline for progression to next phase
+9. Response should be around 200-250 words
+
+Prioritize safety and gradual progression. Include specific exercises with modifications.
+""",
+    ),
+    CoachingModule(
+        tab="tab3",
+        label="🎯 Tactical Tips",
+        sub_header="🎯 Tactical Coaching Tips",
+        feature="Tactical Coaching Tips",
+        best_for="Game Intelligence",
+        temperature=0.7,
+        temperature_note="Fixed",
+        box_class="info-box",
+        heading="### 🧠 Your Tactical Coaching Tips",
+        button="Generate Tactical Tips",
+        spinner_text="Analyzing tactical strategies...",
+        error_label="tactical tips",
+        inputs=(
+            _select("sport_tactical", "Sport for Tactical Advice", "tab3_sport", SPORTS_TEAM),
+            _select("position_tactical", "Position", "tab3_position", POSITIONS_ALL[:13] + ("General Player",)),
+            _select("skill_focus", "Skill to Improve", "tab3_skill", (
+                "Decision Making", "Positioning", "Game Awareness", "Communication",
+                "Defensive Tactics", "Attacking Strategy", "Team Play", "Set Pieces",
+                "Mental Game", "Pressure Situations",
+            ), column=1),
+            _select("experience_level", "Experience Level", "tab3_experience",
+                    ("Youth (Under 14)", "Junior (14-18)", "College", "Semi-Pro"), column=1),
+            _text("match_situation", "Specific Match Situations", "tab3_situation",
+                  "e.g., defending a lead, playing against stronger opponents...", "General gameplay"),
+        ),
+        template="""
+Act as an expert tactical coach and provide advanced tactical coaching tips.
+
+Athlete Profile:
+- Sport: {sport_tactical}
+- Position: {position_tactical}
+- Skill Focus: {skill_focus}
+- Experience Level: {experience_level}
+- Specific Situations: {match_situation}
+
+Requirements:
+1. Provide 5-7 specific tactical tips for the chosen skill
+2. Include game scenarios where these apply
+3. Suggest drills to practice each tactical element
+4. Explain the 'why' behind each tactic (tactical reasoning)
+5. Include communication cues for teammates
+6. Add common mistakes to avoid
+7. Provide progression from practice to match application
+8. Response should be around 200-250 words
+Make the tips practical, actionable, and appropriate for the experience level.
+Use coaching language that motivates and educates.
+""",
+    ),
+    CoachingModule(
+        tab="tab4",
+        label="🥗 Nutrition Guide",
+        sub_header="🥗 Personalized Nutrition Guide",
+        feature="Personalized Nutrition Guides",
+        best_for="Performance Nutrition",
+        temperature=0.7,
+        temperature_note="Fixed",
+        box_class="success-box",
+        heading="### 🍽️ Your Personalized Nutrition Guide",
+        button="Generate Nutrition Plan",
+        spinner_text="Creating your personalized nutrition guide...",
+        error_label="nutrition plan",
+        calculator=nutrition_summary,
+        structured=NUTRITION_FORMAT,
+        inputs=(
+            _number("age", "Age", "tab4_age", 10, 25, 15),
+            _select("gender", "Gender", "tab4_gender", ("Male", "Female")),
+            _number("weight", "Weight (kg)", "tab4_weight", 30, 120, 60),
+            _number("height", "Height (cm)", "tab4_height", 120, 210, 170, column=1),
+            _select("diet_type", "Diet Type", "tab4_diet", DIET_TYPES, column=1),
+            _select("activity_level_nutrition", "Daily Activity Level", "tab4_activity", ACTIVITY_LEVELS, column=1),
+            _select("calorie_goal", "Calorie Goal", "tab4_calorie", (
+                "Maintain Weight", "Build Muscle", "Lose Fat", "Performance Optimization",
+            ), column=2),
+            _text("allergies", "Food Allergies/Restrictions", "tab4_allergies",
+                  "e.g., lactose intolerance, nut allergy...", "None", column=2),
+            _select("sport_nutrition", "Primary Sport", "tab4_sport", (
+                "Football", "Cricket", "Basketball", "Athletics", "Swimming", "Tennis", "Other",
+            ), column=2),
+        ),
+        template="""
+Act as a sports nutritionist and create a comprehensive week-long nutrition guide.
+
+Athlete Profile:
+- Age: {age}, Gender: {gender}
+- Weight: {weight}kg, Height: {height}cm
+- Diet Type: {diet_type}
+- Activity Level: {activity_level_nutrition}
+- Calorie Goal: {calorie_goal}
+- Primary Sport: {sport_nutrition}
+- Allergies/Restrictions: {allergies}
+
+Requirements:
+1. Display the pre-calculated daily calorie and macronutrient targets
+2. Create a detailed 7-day meal plan (breakfast, lunch, dinner, snacks)
+3. Include pre-training and post-training nutrition recommendations
+4. Suggest meal timing strategies around training sessions
+5. Provide hydration guidelines
+6. Include recovery nutrition tips
+7. Suggest healthy snack options
+8. Add supplement recommendations (if appropriate for age)
+9. Include portion sizes and preparation tips
+10. Response should be around 200-250 words
+
+All recommendations must be age-appropriate and safe for youth athletes.
+Focus on whole foods and balanced nutrition.
+""",
+    ),
+    CoachingModule(
+        tab="tab5",
+        label="🔥 Warm-up/Cool-down",
+        sub_header="🔥 Warm-up & Cool-down Routines",
+        feature="Warm-up/Cool-down Routines",
+        best_for="Injury Prevention",
+        temperature=0.6,
+        temperature_note="Balanced",
+        box_class="info-box",
+        heading="### 🏃 Your Warm-up/Cool-down Routine",
+        button="Generate Routines",
+        spinner_text="Creating your warm-up/cool-down routine...",
+        error_label="routine",
+        shortlist=warmup_shortlist,
+        inputs=(
+            _select("sport_warmup", "Sport", "tab5_sport", SPORTS_CORE + ("Volleyball",)),
+            _select("routine_type", "Routine Type", "tab5_routine", (
+                "Pre-Training Warm-up", "Pre-Match Warm-up", "Post-Training Cool-down",
+                "Post-Match Cool-down", "Rest Day Active Recovery",
+            )),
+            _select("position_warmup", "Position", "tab5_position", (
+                "Striker/Forward", "Midfielder", "Defender", "Goalkeeper",
+                "Bowler", "Batsman", "All-rounder", "General Player",
+            ), column=1),
+            _slider("available_time", "Available Time (minutes)", "tab5_time", 5, 30, 10, column=1),
+            _multi("focus_areas", "Focus Areas", "tab5_focus", (
+                "Dynamic Stretching", "Mobility", "Injury Prevention",
+                "Activation", "Flexibility", "Relaxation", "Breathing",
+            ), "Comprehensive"),
+        ),
+        template="""
+Act as a sports performance coach and create personalized warm-up/cool-down routines.
+
+Session Details:
+- Sport: {sport_warmup}
+- Position: {position_warmup}
+- Routine Type: {routine_type}
+- Available Time: {available_time} minutes
+- Focus Areas: {focus_areas}
+
+Requirements:
+1. Create a structured routine fitting within the time limit
+2. Include specific exercises with clear instructions
+3. Specify duration for each exercise
+4. Include variations for different fitness levels
+5. Explain the purpose of each exercise
+6. Add safety cues and common mistakes to avoid
+7. Include breathing techniques where applicable
+8. Provide modifications for any sensitive areas
+9. Response should be around 200-250 words
+Make the routine practical and easy to follow. Use bullet points and clear numbering.
+""",
+    ),
+    CoachingModule(
+        tab="tab6",
+        label="🧠 Mental Training",
+        sub_header="🧠 Mental Training & Focus Routines",
+        feature="Mental Training Programs",
+        best_for="Mental Toughness",
+        temperature=0.7,
+        temperature_note="Fixed",
+        box_class="info-box",
+        heading="### 🧘 Your Mental Training Program",
+        button="Generate Mental Training Program",
+        spinner_text="Designing your mental training program...",
+        error_label="mental training",
+        inputs=(
+            _select("mental_goal", "Mental Training Goal", "tab6_goal", (
+                "Tournament Preparation", "Match Day Focus", "Overcoming Anxiety",
+                "Building Confidence", "Handling Pressure", "Staying Motivated",
+                "Recovery from Poor Performance", "Concentration Improvement",
+            )),
+            _select("sport_mental", "Sport", "tab6_sport", SPORTS_CORE),
+            _select("upcoming_event", "Upcoming Event Type", "tab6_event", (
+                "Tournament", "Important Match", "Championship",
+                "Regular Season Game", "Training Camp", "No Specific Event",
+            ), column=1),
+            _select("time_to_event", "Time to Event", "tab6_time", (
+                "Today (Game Day)", "1-3 Days", "1 Week", "2-4 Weeks", "Off-Season",
+            ), column=1),
+            _text("current_challenges", "Current Mental Challenges", "tab6_challenges",
+                  "e.g., nervousness before games, losing focus during matches...", "None specified"),
+        ),
+        template="""
+Act as a sports psychologist and create a comprehensive mental training program.
+
+Athlete Profile:
+- Mental Goal: {mental_goal}
+- Sport: {sport_mental}
+- Upcoming Event: {upcoming_event}
+- Time to Event: {time_to_event}
+- Current Challenges: {current_challenges}
+
+Requirements:
+1. Provide daily mental training exercises
+2. Include visualization techniques specific to the sport
+3. Suggest breathing and relaxation methods
+4. Create pre-performance routines
+5. Provide positive self-talk affirmations
+6. Include goal-setting strategies
+7. Add techniques for managing pressure and anxiety
+8. Provide recovery mental practices
+9. Include progress tracking methods
+10. Response should be around 200-250 words
+Make the program practical and age-appropriate for young athletes.
+Include specific examples and scenarios.
+""",
+    ),
+    CoachingModule(
+        tab="tab7",
+        label="💧 Hydration",
+        sub_header="💧 Hydration & Electrolyte Strategy",
+        feature="Hydration Strategies",
+        best_for="Optimal Hydration",
+        temperature=0.6,
+        temperature_note="Scientific",
+        box_class="success-box",
+        heading="### 💧 Your Hydration Strategy",
+        button="Generate Hydration Plan",
+        spinner_text="Creating your hydration strategy...",
+        error_label="hydration plan",
+        calculator=hydration_summary,
+        inputs=(
+            _select("sport_hydration", "Primary Sport", "tab7_sport", SPORTS_CORE),
+            _slider("training_duration", "Typical Training Duration (minutes)", "tab7_duration", 30, 180, 90),
+            _select("climate", "Training Climate", "tab7_climate", CLIMATES, column=1),
+            _select("sweat_rate", "Sweat Rate", "tab7_sweat", SWEAT_RATES, column=1),
+        ),
+        template="""
+Act as a sports nutritionist specializing in hydration and electrolyte management.
+
+Athlete Profile:
+- Sport: {sport_hydration}
+- Training Duration: {training_duration} minutes
+- Climate: {climate}
+- Sweat Rate: {sweat_rate}
+
+Requirements:
+1. State the pre-calculated daily hydration needs (in liters)
+2. Create a pre-training hydration protocol
+3. Design during-training hydration schedule
+4. Provide post-training rehydration guidelines
+5. Explain electrolyte replacement needs
+6. Suggest natural electrolyte sources
+7. Include signs of dehydration to watch for
+8. Provide hydration for different weather conditions
+9. Create a daily hydration timeline
+10. Add tips for carrying and consuming fluids during matches
+11. Response should be around 200-250 words
+Make recommendations practical for young athletes. Include timing and quantities.
+""",
+    ),
+    CoachingModule(
+        tab="tab8",
+        label="👁️ Visualization",
+        sub_header="👁️ Pre-Match Visualization Techniques",
+        feature="Pre-Match Visualization",
+        best_for="Confidence Building",
+        temperature=0.7,
+        temperature_note="Fixed",
+        box_class="info-box",
+        heading="### 🎯 Your Visualization Guide",
+        button="Generate Visualization Guide",
+        spinner_text="Creating your visualization program...",
+        error_label="visualization guide",
+        inputs=(
+            _select("sport_viz", "Sport", "tab8_sport", SPORTS_CORE),
+            _select("position_viz", "Position", "tab8_position", POSITIONS_ALL[:8] + ("General Player",)),
+            _select("match_importance", "Match Importance", "tab8_importance", (
+                "Regular Season", "Tournament Game", "Championship Final",
+                "Qualifying Match", "Friendly",
+            ), column=1),
+            _select("viz_preference", "Visualization Focus", "tab8_preference", (
+                "Performance Skills", "Confidence Building", "Handling Pressure",
+                "Specific Scenarios", "Complete Match Day Experience",
+            ), column=1),
+            _text("specific_scenarios", "Specific Scenarios to Visualize", "tab8_scenarios",
+                  "e.g., taking penalty kick, facing fast bowling, last minute defense...",
+                  "General match situations"),
+        ),
+        template="""
+Act as a sports psychology expert specializing in visualization and imagery.
+
+Athlete Profile:
+- Sport: {sport_viz}
+- Position: {position_viz}
+- Match Importance: {match_importance}
+- Visualization Focus: {viz_preference}
+- Specific Scenarios: {specific_scenarios}
+
+Requirements:
+1. Create a 10-15 minute pre-match visualization script
+2. Include guided imagery for key game moments
+3. Incorporate all senses (sight, sound, touch, feeling)
+4. Provide visualization for success scenarios
+5. Include techniques for managing unexpected situations
+6. Add breathing and relaxation components
+7. Create a match-day visualization timeline
+8. Include quick 2-3 minute visualization options
+9. Provide tips for effective visualization practice
+10. Add confidence-building visualization exercises
+12. Response should be around 200-250 words
+Write the visualization script in first person, guiding the athlete through each step.
+Make it engaging and emotionally positive.
+""",
+    ),
+    CoachingModule(
+        tab="tab9",
+        label="📍 Position Drills",
+        sub_header="📍 Position-Specific Decision Drills",
+        feature="Position-Specific Drills",
+        best_for="Decision Making",
+        temperature=0.7,
+        temperature_note="Fixed",
+        box_class="info-box",
+        heading="### 🏟️ Your Position-Specific Drills",
+        button="Generate Decision Drills",
+        spinner_text="Creating position-specific drills...",
+        error_label="drills",
+        shortlist=drill_shortlist,
+        inputs=(
+            _select("sport_drill", "Sport", "tab9_sport", SPORTS_TEAM),
+            _select("position_drill", "Position", "tab9_position", POSITIONS_ALL[:13]),
+            _select("decision_area", "Decision Area", "tab9_area", (
+                "Game Situations", "Positioning", "Timing", "Communication",
+                "Under Pressure", "Transitional Play", "Set Pieces", "Team Tactics",
+            ), column=1),
+            _select("skill_level_drill", "Skill Level", "tab9_level", FITNESS_LEVELS, column=1),
+        ),
+        template="""
+Act as an expert tactical coach and design position-specific decision-making drills.
+
+Athlete Profile:
+- Sport: {sport_drill}
+- Position: {position_drill}
+- Decision Area: {decision_area}
+- Skill Level: {skill_level_drill}
+
+Requirements:
+1. Create 5-7 progressive decision-making drills
+2. Each drill should include:
+   - Clear setup and equipment needed
+   - Specific objectives
+   - Step-by-step instructions
+   - Decision points to focus on
+   - Progressions and variations
+   - Coaching cues and feedback points
+3. Include individual and team drill options
+4. Add time requirements and space needs
+5. Include scoring or measurement methods
+6. Provide common mistakes and corrections
+7. Add competitive elements where appropriate
+8. Response should be around 200-250 words
+Focus on developing quick, smart decisions in game-like situations.
+Make drills engaging and challenging for the skill level.
+""",
+    ),
+    CoachingModule(
+        tab="tab10",
+        label="🧘 Mobility",
+        sub_header="🧘 Mobility & Recovery Workouts",
+        feature="Mobility & Recovery Workouts",
+        best_for="Flexibility & Recovery",
+        temperature=0.5,
+        temperature_note="Safety",
+        box_class="success-box",
+        heading="### 🧘 Your Mobility Program",
+        button="Generate Mobility Program",
+        spinner_text="Creating your mobility program...",
+        error_label="mobility program",
+        shortlist=mobility_shortlist,
+        inputs=(
+            _select("mobility_focus", "Mobility Focus", "tab10_focus", (
+                "Full Body", "Lower Body", "Upper Body", "Spine & Core",
+                "Hip Mobility", "Shoulder Mobility", "Ankle & Foot", "Post-Injury Recovery",
+            )),
+            _select("mobility_goal", "Primary Goal", "tab10_goal", (
+                "Improve Flexibility", "Reduce Muscle Tension", "Enhance Range of Motion",
+                "Injury Prevention", "Recovery After Training", "Joint Health",
+            )),
+            _slider("time_available", "Time Available (minutes)", "tab10_time", 10, 60, 20, column=1),
+            _multi("equipment", "Available Equipment", "tab10_equipment", (
+                "None (Bodyweight only)", "Resistance Bands", "Foam Roller",
+                "Yoga Mat", "Medicine Ball", "Pilates Ball",
+            ), "Bodyweight only", column=1),
+            _text("injury_history_mobility", "Relevant Injury History", "tab10_injury",
+                  "e.g., past ankle injury, tight hamstrings, shoulder issues...", "None"),
+        ),
+        template="""
+Act as a sports physiotherapist and create a comprehensive mobility and recovery workout.
+
+Session Details:
+- Focus Area: {mobility_focus}
+- Primary Goal: {mobility_goal}
+- Time Available: {time_available} minutes
+- Equipment: {equipment}
+- Injury History: {injury_history_mobility}
+
+Requirements:
+1. Create a structured mobility session fitting the time limit
+2. Include dynamic and static mobility exercises
+3. Specify duration and repetitions for each exercise
+4. Provide clear instructions and technique cues
+5. Include breathing techniques for each movement
+6. Add progression and regression options
+7. Include foam rolling or myofascial release if equipment allows
+8. Provide modifications for any injury history
+9. Add stretches for tight muscle groups
+10. Include functional mobility movements relevant to sports
+11. Response should be around 200-250 words
+Prioritize safe, effective movements. Explain the 'why' behind each exercise.
+""",
+    ),
+]
+
+COACHING_MODULES = {module.tab: module for module in _MODULE_LIST}
+
+
+def features_table():
+    """Rows for the Dashboard feature table, straight from the registry."""
+    return {
+        "Feature": [m.feature for m in COACHING_MODULES.values()],
+        "Best For": [m.best_for for m in COACHING_MODULES.values()],
+        "Temperature": [f"{m.temperature} ({m.temperature_note})" for m in COACHING_MODULES.values()],
+    }
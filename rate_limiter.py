@@ -0,0 +1,162 @@
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PACK = 1
+PRIORITY_BATCH = 2
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Gemini answers for these prompts run to roughly 300 words.
+EXPECTED_OUTPUT_TOKENS = 600
+
+
+def is_retryable(error):
+    try:
+        code = int(getattr(error, "code", 0) or 0)
+    except (TypeError, ValueError):
+        code = 0
+    if code in RETRYABLE_STATUS_CODES:
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "rate limit" in message
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=30.0):
+    """Full-jitter exponential backoff for the given (1-based) failed attempt."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        # A request bigger than the whole bucket only has to wait for a full bucket.
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= amount
+
+
+class RateLimiter:
+    """Process-wide admission control for model calls.
+
+    Calls wait in a priority queue until both the requests-per-minute and
+    tokens-per-minute buckets can cover them. Within a priority, sessions
+    that have had fewer calls admitted recently go first, so one user
+    hammering a button cannot starve everyone else. Rate-limit and server
+    errors are retried with jittered exponential backoff, and every retry
+    queues again.
+    """
+
+    def __init__(self, requests_per_minute=60, tokens_per_minute=250_000, max_attempts=5,
+                 base_delay=1.0, max_delay=30.0, fairness_window_seconds=60):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.fairness_window_seconds = fairness_window_seconds
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._recent = {}
+        self._queued = Counter()
+        self.admitted = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _fair_rank(self, session_id, now):
+        recent = self._recent.setdefault(session_id, deque())
+        while recent and now - recent[0] > self.fairness_window_seconds:
+            recent.popleft()
+        return len(recent) + self._queued[session_id]
+
+    def acquire(self, session_id, tokens, priority=PRIORITY_INTERACTIVE):
+        """Block until the call may go out; returns the seconds spent waiting."""
+        with self._cond:
+            started = time.monotonic()
+            entry = (priority, self._fair_rank(session_id, started), next(self._seq))
+            heapq.heappush(self._queue, entry)
+            self._queued[session_id] += 1
+            while True:
+                now = time.monotonic()
+                if self._queue[0] is entry:
+                    self.requests.refill(now)
+                    self.tokens.refill(now)
+                    wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if wait <= 0:
+                        heapq.heappop(self._queue)
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        self._queued[session_id] -= 1
+                        self._recent[session_id].append(now)
+                        waited = now - started
+                        self.admitted += 1
+                        self.total_wait += waited
+                        self.max_wait = max(self.max_wait, waited)
+                        self._cond.notify_all()
+                        return waited
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Charge (or refund) the difference once the real token count is known."""
+        with self._cond:
+            self.tokens.take(actual_tokens - estimated_tokens)
+
+    def call(self, fn, session_id, tokens, priority=PRIORITY_INTERACTIVE):
+        """Call fn() once admitted, retrying rate-limit and server errors.
+
+        Returns (result, attempts); the final exception carries ``attempts`` too.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.acquire(session_id, tokens, priority)
+            try:
+                return fn(), attempt
+            except Exception as e:
+                if attempt == self.max_attempts or not is_retryable(e):
+                    e.attempts = attempt
+                    with self._cond:
+                        self.failures += 1
+                    raise
+                with self._cond:
+                    self.retries += 1
+                time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "admitted": self.admitted,
+                "retries": self.retries,
+                "failures": self.failures,
+                "avg_wait_s": self.total_wait / self.admitted if self.admitted else 0.0,
+                "max_wait_s": self.max_wait,
+                "sessions": sum(1 for recent in self._recent.values() if recent),
+            }
+
+
+def limiter_from_env():
+    return RateLimiter(
+        requests_per_minute=float(os.environ.get("COACHBOT_RPM", 60)),
+        tokens_per_minute=float(os.environ.get("COACHBOT_TPM", 250_000)),
+    )
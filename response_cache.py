@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_ENTRIES = 500
+
+
+def normalize_value(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, (list, tuple, set)):
+        return sorted(normalize_value(v) for v in value)
+    return value
+
+
+def make_cache_key(tab, inputs, temperature, top_p, top_k, model_name):
+    normalized = {name: normalize_value(value) for name, value in inputs.items()}
+    payload = json.dumps(
+        [tab, normalized, temperature, top_p, top_k, model_name],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryBackend:
+    """In-process LRU store of (expires_at, text) entries."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, expires_at, text):
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """On-disk LRU store so cached responses survive restarts."""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires_at REAL, last_used REAL, text TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        row = self._conn.execute(
+            "SELECT expires_at, text FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return row
+
+    def set(self, key, expires_at, text):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, expires_at, last_used, text) "
+            "VALUES (?, ?, ?, ?)",
+            (key, expires_at, time.time(), text),
+        )
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+        self._conn.commit()
+        return max(overflow, 0)
+
+    def delete(self, key):
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache of generated response text."""
+
+    def __init__(self, backend=None, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] < time.time():
+            self.backend.delete(key)
+            self.evictions += 1
+            entry = None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key):
+        """Like get, but not counted in the hit and miss statistics."""
+        with self._lock:
+            entry = self._live(key)
+            return None if entry is None else entry[1]
+
+    def set(self, key, text):
+        with self._lock:
+            self.evictions += self.backend.set(key, time.time() + self.ttl_seconds, text)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.backend),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def cache_from_env():
+    ttl = float(os.environ.get("COACHBOT_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    max_entries = int(os.environ.get("COACHBOT_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+    path = os.environ.get("COACHBOT_CACHE_PATH")
+    if path:
+        backend = SQLiteBackend(path, max_entries=max_entries)
+    else:
+        backend = MemoryBackend(max_entries=max_entries)
+    return ResponseCache(backend, ttl_seconds=ttl)
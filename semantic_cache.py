@@ -0,0 +1,224 @@
+"""Near-duplicate lookup for requests that differ only in free-text wording.
+
+"ankle sprain" and "sprained ankle" produce different exact cache keys.
+Here each free-text field is embedded as a hashed bag of character
+trigrams (no model download, microseconds on CPU), and a request reuses
+an earlier response when every structured selection is identical and
+every free-text field is at least ``threshold`` cosine-similar.
+Trigram overlap cannot tell a left knee from a right one, so the body
+regions, sides and (for allergies) the foods named must also match
+exactly before the similarity is even considered.
+
+Hits are sampled into an audit log so someone can mark false matches;
+the false-hit rate is reported next to the hit rate.
+"""
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+
+from exercise_catalogue import injured_regions
+from response_cache import make_cache_key, normalize_value
+
+
+DIMENSIONS = 1024
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_MAX_ENTRIES = 2000
+# "nut allergy" and "no nut allergy" share every trigram but mean opposite things.
+NEGATIONS = frozenset({"no", "not", "none", "never", "without", "non", "nil"})
+SIDES = frozenset({"left", "right", "both", "bilateral"})
+# Fields where every food named matters: "peanut allergy" is not "tree nut allergy".
+EXACT_WORD_FIELDS = frozenset({"allergies"})
+FILLER_WORDS = frozenset({
+    "a", "an", "and", "the", "to", "of", "or", "with", "allergy", "allergies", "allergic",
+    "intolerance", "intolerances", "intolerant", "sensitivity", "sensitive", "free",
+})
+
+
+def words(text):
+    return re.findall(r"\w+", normalize_value(text))
+
+
+def negated(text):
+    return bool(NEGATIONS.intersection(words(text)))
+
+
+def embed(text, dimensions=DIMENSIONS):
+    """L2-normalised hashed character-trigram vector of ``text``.
+
+    Trigrams are taken per word (padded with spaces), so word order does
+    not matter and shared stems ("sprain"/"sprained") overlap.
+    """
+    # The cache is off by default, so numpy is only imported once it is used.
+    import numpy as np
+
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in words(text):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % dimensions] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def signature(name, text):
+    """What two texts must share exactly before their similarity counts."""
+    found = set(words(text))
+    exact = frozenset(found - FILLER_WORDS) if name in EXACT_WORD_FIELDS else None
+    return injured_regions(text), frozenset(found & SIDES), exact
+
+
+def similarity(a, b):
+    """Cosine similarity of two (text, vector) pairs."""
+    (text_a, vector_a), (text_b, vector_b) = a, b
+    # Two empty fields match exactly; an empty field never matches a filled one.
+    if not vector_a.any() and not vector_b.any():
+        return 1.0
+    if negated(text_a) != negated(text_b):
+        return 0.0
+    return float(vector_a @ vector_b)
+
+
+class SemanticCache:
+    """In-memory vector index from free-text fields to exact cache keys.
+
+    Entries are grouped by everything except the free text (tab,
+    selections, sampling settings, model), so a neighbour search only
+    ever compares requests that would otherwise be identical. The text
+    itself stays in the ResponseCache; a stale pointer is dropped on use.
+    """
+
+    def __init__(self, free_text_fields, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES,
+                 audit_rate=1.0, audit_size=200):
+        self.free_text_fields = free_text_fields
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.audit_rate = audit_rate
+        self._groups = OrderedDict()
+        self._size = 0
+        self._audit = deque(maxlen=audit_size)
+        self._rejected = set()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.audited = 0
+        self.false_hits = 0
+
+    def _split(self, tab, inputs, temperature, top_p, top_k, model_name):
+        fields = self.free_text_fields.get(tab, ())
+        structured = {name: value for name, value in inputs.items() if name not in fields}
+        group = make_cache_key(tab, structured, temperature, top_p, top_k, model_name)
+        texts = {name: inputs.get(name) or "" for name in fields}
+        return group, texts
+
+    def lookup(self, cache, tab, inputs, temperature, top_p, top_k, model_name):
+        """Return cached text for a near-duplicate request, or None."""
+        group, texts = self._split(tab, inputs, temperature, top_p, top_k, model_name)
+        if not texts:
+            return None
+        vectors = {name: (text, embed(text)) for name, text in texts.items()}
+        signatures = {name: signature(name, text) for name, text in texts.items()}
+        with self._lock:
+            self.lookups += 1
+            entries = self._groups.get(group)
+            if not entries:
+                return None
+            best, best_score = None, self.threshold
+            for key, entry in entries.items():
+                if entry["signatures"] != signatures:
+                    continue
+                score = min(similarity(vectors[name], entry["vectors"][name]) for name in texts)
+                if score >= best_score and (key, tuple(texts.values())) not in self._rejected:
+                    best, best_score = key, score
+            if best is None:
+                return None
+            matched = entries[best]
+        # Not counted in the exact cache's statistics: this request already counted there as a miss.
+        text = cache.peek(best)
+        with self._lock:
+            if text is None:
+                # The response expired from the exact cache; forget the pointer too.
+                if self._groups.get(group, {}).pop(best, None) is not None:
+                    self._size -= 1
+                return None
+            self.hits += 1
+            self._groups.move_to_end(group)
+            if self.audit_rate >= 1.0 or random.random() < self.audit_rate:
+                self.audited += 1
+                self._audit.append({
+                    "id": self.audited,
+                    "ts": time.time(),
+                    "tab": tab,
+                    "key": best,
+                    "query": dict(texts),
+                    "matched": dict(matched["texts"]),
+                    "similarity": round(best_score, 3),
+                    "false_hit": False,
+                })
+        return text
+
+    def add(self, tab, inputs, temperature, top_p, top_k, model_name, key):
+        group, texts = self._split(tab, inputs, temperature, top_p, top_k, model_name)
+        if not texts:
+            return
+        entry = {
+            "texts": texts,
+            "vectors": {name: (text, embed(text)) for name, text in texts.items()},
+            "signatures": {name: signature(name, text) for name, text in texts.items()},
+        }
+        with self._lock:
+            entries = self._groups.setdefault(group, OrderedDict())
+            if key not in entries:
+                self._size += 1
+            entries[key] = entry
+            self._groups.move_to_end(group)
+            while self._size > self.max_entries:
+                oldest = next(iter(self._groups.values()))
+                oldest.popitem(last=False)
+                self._size -= 1
+                if not oldest:
+                    self._groups.popitem(last=False)
+
+    def audit_log(self):
+        with self._lock:
+            return [dict(record) for record in reversed(self._audit)]
+
+    def mark_false_hit(self, audit_id, false_hit=True):
+        """Record a reviewer's verdict; a false match is never served for that text again."""
+        with self._lock:
+            for record in self._audit:
+                if record["id"] == audit_id and record["false_hit"] != false_hit:
+                    record["false_hit"] = false_hit
+                    pair = (record["key"], tuple(record["query"].values()))
+                    if false_hit:
+                        self.false_hits += 1
+                        self._rejected.add(pair)
+                    else:
+                        self.false_hits -= 1
+                        self._rejected.discard(pair)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "audited": self.audited,
+                "false_hits": self.false_hits,
+                "false_hit_rate": self.false_hits / self.audited if self.audited else 0.0,
+                "entries": self._size,
+            }
+
+
+def semantic_cache_from_env(free_text_fields):
+    """A SemanticCache when COACHBOT_SEMANTIC_CACHE is set, otherwise None."""
+    if os.environ.get("COACHBOT_SEMANTIC_CACHE", "").lower() not in ("1", "true", "yes", "on"):
+        return None
+    return SemanticCache(
+        free_text_fields,
+        threshold=float(os.environ.get("COACHBOT_SEMANTIC_THRESHOLD", DEFAULT_THRESHOLD)),
+        audit_rate=float(os.environ.get("COACHBOT_SEMANTIC_AUDIT_RATE", 1.0)),
+    )
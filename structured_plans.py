@@ -0,0 +1,269 @@
+"""Typed JSON answers for the Workout and Nutrition modules.
+
+With structured output switched on, the request carries a response
+schema and ``response_mime_type="application/json"``, so Gemini returns
+data instead of markdown. The JSON is stored compacted (it is what the
+cache, the plan history and any downstream logging see) and parsed into
+the dataclasses below, which App.py lays out as tables and a chart.
+
+The choice travels with the inputs as ``output_format``, so markdown and
+JSON answers for the same selections never share a cache or history row.
+"""
+import json
+from dataclasses import dataclass, field
+
+
+OUTPUT_FORMAT = "output_format"
+JSON_FORMAT = "json"
+
+JSON_INSTRUCTION = (
+    "\n\nReturn the plan as JSON matching the response schema. "
+    "Put explanations in the overview and notes fields, not around the JSON."
+)
+
+
+def is_structured(inputs):
+    return (inputs or {}).get(OUTPUT_FORMAT) == JSON_FORMAT
+
+
+def _int(value, default=0):
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _float(value, default=None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _texts(values):
+    return [_text(value) for value in values or () if _text(value)]
+
+
+@dataclass
+class Exercise:
+    name: str
+    sets: int
+    reps: str
+    rest_seconds: int
+    rpe: float = None
+    notes: str = ""
+
+
+@dataclass
+class Session:
+    day: str
+    focus: str
+    duration_minutes: int
+    rpe: float = None
+    exercises: list = field(default_factory=list)
+
+
+@dataclass
+class WorkoutPlan:
+    overview: str
+    sessions: list
+    safety_notes: list = field(default_factory=list)
+
+
+@dataclass
+class Meal:
+    day: str
+    meal: str
+    foods: str
+    calories: int
+    protein_g: int
+    carbs_g: int
+    fat_g: int
+    notes: str = ""
+
+
+@dataclass
+class NutritionPlan:
+    overview: str
+    daily_calories: int
+    meals: list
+    tips: list = field(default_factory=list)
+
+
+def _string():
+    return {"type": "string"}
+
+
+def _object(properties, required):
+    return {"type": "object", "properties": properties, "required": list(required)}
+
+
+WORKOUT_SCHEMA = _object({
+    "overview": _string(),
+    "sessions": {"type": "array", "items": _object({
+        "day": _string(),
+        "focus": _string(),
+        "duration_minutes": {"type": "integer"},
+        "rpe": {"type": "number"},
+        "exercises": {"type": "array", "items": _object({
+            "name": _string(),
+            "sets": {"type": "integer"},
+            "reps": _string(),
+            "rest_seconds": {"type": "integer"},
+            "rpe": {"type": "number"},
+            "notes": _string(),
+        }, ("name", "sets", "reps", "rest_seconds"))},
+    }, ("day", "focus", "duration_minutes", "exercises"))},
+    "safety_notes": {"type": "array", "items": _string()},
+}, ("overview", "sessions"))
+
+NUTRITION_SCHEMA = _object({
+    "overview": _string(),
+    "daily_calories": {"type": "integer"},
+    "meals": {"type": "array", "items": _object({
+        "day": _string(),
+        "meal": _string(),
+        "foods": _string(),
+        "calories": {"type": "integer"},
+        "protein_g": {"type": "integer"},
+        "carbs_g": {"type": "integer"},
+        "fat_g": {"type": "integer"},
+        "notes": _string(),
+    }, ("day", "meal", "foods", "calories", "protein_g", "carbs_g", "fat_g"))},
+    "tips": {"type": "array", "items": _string()},
+}, ("overview", "daily_calories", "meals"))
+
+
+def parse_workout(data):
+    return WorkoutPlan(
+        overview=_text(data.get("overview")),
+        sessions=[
+            Session(
+                day=_text(session.get("day")),
+                focus=_text(session.get("focus")),
+                duration_minutes=_int(session.get("duration_minutes")),
+                rpe=_float(session.get("rpe")),
+                exercises=[
+                    Exercise(
+                        name=_text(exercise.get("name")),
+                        sets=_int(exercise.get("sets")),
+                        reps=_text(exercise.get("reps")),
+                        rest_seconds=_int(exercise.get("rest_seconds")),
+                        rpe=_float(exercise.get("rpe")),
+                        notes=_text(exercise.get("notes")),
+                    )
+                    for exercise in session.get("exercises") or ()
+                ],
+            )
+            for session in data.get("sessions") or ()
+        ],
+        safety_notes=_texts(data.get("safety_notes")),
+    )
+
+
+def parse_nutrition(data):
+    return NutritionPlan(
+        overview=_text(data.get("overview")),
+        daily_calories=_int(data.get("daily_calories")),
+        meals=[
+            Meal(
+                day=_text(meal.get("day")),
+                meal=_text(meal.get("meal")),
+                foods=_text(meal.get("foods")),
+                calories=_int(meal.get("calories")),
+                protein_g=_int(meal.get("protein_g")),
+                carbs_g=_int(meal.get("carbs_g")),
+                fat_g=_int(meal.get("fat_g")),
+                notes=_text(meal.get("notes")),
+            )
+            for meal in data.get("meals") or ()
+        ],
+        tips=_texts(data.get("tips")),
+    )
+
+
+def workout_tables(plan):
+    return {
+        "Weekly Overview": [
+            {"Day": s.day, "Focus": s.focus, "Minutes": s.duration_minutes, "RPE": s.rpe,
+             "Exercises": len(s.exercises)}
+            for s in plan.sessions
+        ],
+        "Exercises": [
+            {"Day": s.day, "Exercise": e.name, "Sets": e.sets, "Reps": e.reps,
+             "Rest (s)": e.rest_seconds, "RPE": e.rpe, "Notes": e.notes}
+            for s in plan.sessions for e in s.exercises
+        ],
+    }
+
+
+def workout_chart(plan):
+    # Weekly volume at a glance: total sets per training day.
+    return "Sets per Day", {s.day: {"Sets": sum(e.sets for e in s.exercises)} for s in plan.sessions}
+
+
+def workout_notes(plan):
+    return plan.safety_notes
+
+
+def nutrition_tables(plan):
+    return {
+        "Meal Plan": [
+            {"Day": m.day, "Meal": m.meal, "Foods": m.foods, "kcal": m.calories,
+             "Protein (g)": m.protein_g, "Carbs (g)": m.carbs_g, "Fat (g)": m.fat_g, "Notes": m.notes}
+            for m in plan.meals
+        ],
+    }
+
+
+def nutrition_chart(plan):
+    days = {}
+    for meal in plan.meals:
+        totals = days.setdefault(meal.day, {"Protein (g)": 0, "Carbs (g)": 0, "Fat (g)": 0})
+        totals["Protein (g)"] += meal.protein_g
+        totals["Carbs (g)"] += meal.carbs_g
+        totals["Fat (g)"] += meal.fat_g
+    return "Macros per Day", days
+
+
+def nutrition_notes(plan):
+    return [f"Daily target: {plan.daily_calories:,} kcal"] + plan.tips
+
+
+@dataclass(frozen=True)
+class StructuredFormat:
+    schema: dict
+    parse: object   # decoded JSON -> plan dataclass
+    tables: object  # plan -> {title: rows}
+    chart: object   # plan -> (title, {x: {series: value}})
+    notes: object   # plan -> [bullet]
+
+    def load(self, text):
+        """The plan in ``text``, or None when it is not valid JSON for this format."""
+        try:
+            data = json.loads(text)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        try:
+            return self.parse(data)
+        except (AttributeError, TypeError):
+            return None
+
+
+WORKOUT_FORMAT = StructuredFormat(WORKOUT_SCHEMA, parse_workout, workout_tables, workout_chart, workout_notes)
+NUTRITION_FORMAT = StructuredFormat(NUTRITION_SCHEMA, parse_nutrition, nutrition_tables, nutrition_chart,
+                                    nutrition_notes)
+
+
+def compact_json(text):
+    """Re-serialise a JSON answer without whitespace; anything else comes back unchanged."""
+    try:
+        return json.dumps(json.loads(text), separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return text
@@ -0,0 +1,30 @@
+import pytest
+
+from batch_roster import parse_roster, roster_template_csv
+
+
+def test_template_parses_to_defaults():
+    (athlete,) = parse_roster(roster_template_csv())
+    assert athlete["athlete"] == "Player 1"
+    assert athlete["sport_nutrition"] == "Football"
+
+
+def test_options_match_case_insensitively():
+    (athlete,) = parse_roster("athlete,diet_type,fitness_level\nSam,vegan,advanced\n")
+    assert (athlete["diet_type"], athlete["fitness_level"]) == ("Vegan", "Advanced")
+
+
+def test_sport_without_a_nutrition_option_becomes_other():
+    (athlete,) = parse_roster("athlete,sport\nSam,Volleyball\n")
+    assert (athlete["sport"], athlete["sport_nutrition"]) == ("Volleyball", "Other")
+
+
+def test_every_bad_row_is_reported():
+    text = "athlete,age,fitness_level,training_days\nSam,40,expert,4\nJo,15,Beginner,x\nAl,15,Beginner,5\n"
+    with pytest.raises(ValueError) as raised:
+        parse_roster(text)
+    assert str(raised.value).splitlines() == [
+        "Row 1 (Sam): fitness_level 'expert' is not one of: Beginner, Intermediate, Advanced",
+        "Row 1 (Sam): age 40 is outside 10-25",
+        "Row 2 (Jo): training_days 'x' is not a number",
+    ]
@@ -0,0 +1,26 @@
+from call_metrics import CallMetrics, percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, q) for q in (0.5, 0.95, 0.99)] == [50, 95, 99]
+    assert percentile([], 0.5) is None
+
+
+def test_cache_hits_are_kept_out_of_model_latency():
+    metrics = CallMetrics()
+    for _ in range(9):
+        metrics.record("tab1", "m", 0.1, cache_hit=True)
+    metrics.record("tab1", "m", 2000.0)
+    entry = metrics.summary()[("tab1", "m")]
+    assert (entry["calls"], entry["cache_hits"]) == (10, 9)
+    assert entry["latency_ms"][0.5] == 2000.0
+    assert entry["cache_hit_latency_ms"][0.95] == 0.1
+
+
+def test_only_cache_hits_leave_model_latency_empty():
+    metrics = CallMetrics()
+    metrics.record("tab1", "m", 0.1, cache_hit=True)
+    assert metrics.summary()[("tab1", "m")]["latency_ms"][0.5] is None
+    assert 'coachbot_cache_hit_latency_ms{tab="tab1",model="m",quantile="0.5"} 0.100' in metrics.prometheus_text()
+    assert "coachbot_call_latency_ms{" not in metrics.prometheus_text()
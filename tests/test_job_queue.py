@@ -0,0 +1,74 @@
+import threading
+import time
+
+from job_queue import DONE, FAILED, RUNNING, JobQueue
+from rate_limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def blocked(release, started=None, name=None):
+    def fn(job):
+        if started is not None:
+            started.append(name)
+        release.wait(2)
+        return name
+    return fn
+
+
+def test_result_and_error_are_kept():
+    queue = JobQueue(max_workers=2)
+
+    def fail(job):
+        raise ValueError("boom")
+
+    done, failed = queue.submit(lambda job: "text", "a"), queue.submit(fail, "a")
+    wait_until(lambda: queue.get(done).finished and queue.get(failed).finished)
+    assert (queue.get(done).status, queue.get(done).result) == (DONE, "text")
+    assert queue.get(failed).status == FAILED
+    assert str(queue.get(failed).error) == "boom"
+
+
+def test_one_owner_cannot_take_every_worker():
+    queue = JobQueue(max_workers=4, max_per_owner=2)
+    release = threading.Event()
+    busy = [queue.submit(blocked(release), "pack") for _ in range(20)]
+    other = queue.submit(lambda job: "quick", "other")
+    wait_until(lambda: queue.get(other).finished)
+    assert sum(queue.get(job_id).status == RUNNING for job_id in busy) == 2
+    release.set()
+    wait_until(lambda: all(queue.get(job_id).finished for job_id in busy))
+
+
+def test_higher_priority_starts_first():
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+    started = []
+    queue.submit(blocked(release), "a")
+    wait_until(lambda: queue.stats()["running"] == 1)
+    queue.submit(blocked(release, started, "batch"), "b", priority=PRIORITY_BATCH)
+    queue.submit(blocked(release, started, "interactive"), "c", priority=PRIORITY_INTERACTIVE)
+    release.set()
+    wait_until(lambda: len(started) == 2)
+    assert started == ["interactive", "batch"]
+
+
+def test_owner_with_fewer_running_goes_first():
+    queue = JobQueue(max_workers=2, max_per_owner=2)
+    release, first = threading.Event(), threading.Event()
+    started = []
+    queue.submit(blocked(release), "a")
+    queue.submit(blocked(first), "b")
+    wait_until(lambda: queue.stats()["running"] == 2)
+    queue.submit(blocked(release, started, "a"), "a")
+    queue.submit(blocked(release, started, "c"), "c")
+    # One worker frees up while "a" still has a job running, so "c" gets it.
+    first.set()
+    wait_until(lambda: started)
+    assert started == ["c"]
+    release.set()
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+import model_router
+from model_router import ModelRouter
+
+
+class FakeModel:
+    """Answers with its own name; ``fail`` and ``delay`` are changed by the tests."""
+
+    def __init__(self, model_name):
+        self.model_name = "models/" + model_name
+        self.fail = False
+        self.delay = 0.0
+
+    def answer(self):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.model_name} is down")
+        return self.model_name
+
+
+@pytest.fixture
+def models(monkeypatch):
+    created = {}
+
+    def make(name):
+        created[name] = created.get(name) or FakeModel(name)
+        return created[name]
+
+    monkeypatch.setattr(model_router.genai, "GenerativeModel", make)
+    return make
+
+
+def send(model):
+    return model.answer()
+
+
+def test_route_ends_with_the_default_model(models):
+    router = ModelRouter(models("main"), routes={"tab5": ["lite"]})
+    assert router.route("tab5") == ("lite", "main")
+    assert router.route("tab1") == ("main",)
+
+
+def test_failover_to_the_next_model(models):
+    router = ModelRouter(models("main"), routes={"tab5": ["lite"]})
+    models("lite").fail = True
+    assert router.call("tab5", send) == ("models/main", "main")
+    (lite,) = [row for row in router.stats() if row["model"] == "lite"]
+    assert (lite["error_rate"], lite["failovers"]) == (1.0, 1)
+
+
+def test_every_model_failing_raises_the_last_error(models):
+    router = ModelRouter(models("main"), routes={"tab5": ["lite"]})
+    models("lite").fail = models("main").fail = True
+    with pytest.raises(RuntimeError, match="main is down"):
+        router.call("tab5", send)
+
+
+def test_failing_model_is_demoted_then_forgiven(models):
+    router = ModelRouter(models("main"), routes={"tab5": ["lite"]}, health_window_seconds=0.2)
+    models("lite").fail = True
+    for _ in range(5):
+        router.call("tab5", send)
+    assert router.candidates("tab5") == ["main", "lite"]
+    assert router.call("tab5", send) == ("models/main", "main")
+    models("lite").fail = False
+    time.sleep(0.25)
+    assert router.candidates("tab5") == ["lite", "main"]
+    assert router.call("tab5", send) == ("models/lite", "lite")
+
+
+def test_slow_request_is_hedged_to_the_faster_model(models):
+    router = ModelRouter(models("main"), routes={"tab1": ["slow", "main"]}, hedge=True, hedge_min_samples=3)
+    for _ in range(3):
+        router.call("tab1", send)
+        router.call("tab2", send)
+    models("slow").delay = 0.5
+    assert router.call("tab1", send) == ("models/main", "main")
+    (slow,) = [row for row in router.stats() if row["model"] == "slow"]
+    assert (slow["hedges"], slow["hedge_wins"]) == (1, 1)
+
+
+def test_no_hedging_without_enough_samples(models):
+    router = ModelRouter(models("main"), routes={"tab1": ["slow", "main"]}, hedge=True, hedge_min_samples=3)
+    router.call("tab2", send)
+    models("slow").delay = 0.1
+    assert router.call("tab1", send) == ("models/slow", "slow")
@@ -0,0 +1,122 @@
+import pytest
+
+from athlete_pack import pack_inputs
+from exercise_catalogue import get_catalogue
+from offline_plans import OFFLINE_LABEL, is_offline_text, offline_text
+from periodization import build_program
+from prompt_registry import COACHING_MODULES
+
+
+PROFILE = {
+    "sport": "Football",
+    "position": "Midfielder",
+    "fitness_level": "Intermediate",
+    "training_days": 4,
+    "session_duration": 60,
+    "age": 16,
+    "gender": "Female",
+    "weight": 55,
+    "height": 165,
+    "diet_type": "Vegetarian",
+    "climate": "Hot (30°C+)",
+    "sweat_rate": "High",
+    "injuries": "",
+    "allergies": "",
+}
+
+
+def avoided(region):
+    return {exercise.name for exercise in get_catalogue().exercises if region in exercise.avoid}
+
+
+def prescribed(text, names):
+    return sorted(name for name in names if f"- {name} (" in text or f". {name} (" in text)
+
+
+@pytest.mark.parametrize("tab", list(COACHING_MODULES))
+def test_every_module_has_a_labelled_plan(tab):
+    module = COACHING_MODULES[tab]
+    text = offline_text(module, module.defaults())
+    assert text.startswith(OFFLINE_LABEL)
+    assert is_offline_text(text)
+    assert len(text) > len(OFFLINE_LABEL) + 100
+
+
+@pytest.mark.parametrize("tab", list(COACHING_MODULES))
+def test_every_module_handles_full_pack_inputs(tab):
+    inputs = pack_inputs(dict(PROFILE, injuries="knee pain", allergies="peanuts"))[tab]
+    assert is_offline_text(offline_text(COACHING_MODULES[tab], inputs))
+
+
+@pytest.mark.parametrize("phase", ["Remodeling Phase (2-6 weeks)", "Return to Sport Phase"])
+def test_recovery_screens_a_free_text_injury(phase):
+    module = COACHING_MODULES["tab2"]
+    inputs = dict(module.defaults(), injury_type="knee pain", recovery_phase=phase)
+    assert prescribed(offline_text(module, inputs), avoided("knee")) == []
+
+
+def test_recovery_screens_the_selected_injury():
+    module = COACHING_MODULES["tab2"]
+    inputs = dict(module.defaults(), injury_type="Ankle Sprain", recovery_phase="Return to Sport Phase")
+    assert prescribed(offline_text(module, inputs), avoided("ankle")) == []
+
+
+def test_recovery_screens_full_pack_injuries():
+    inputs = pack_inputs(dict(PROFILE, injuries="knee pain"))["tab2"]
+    assert prescribed(offline_text(COACHING_MODULES["tab2"], inputs), avoided("knee")) == []
+
+
+def test_full_pack_injuries_map_onto_recovery_options():
+    module = COACHING_MODULES["tab2"]
+    options = next(i.options for i in module.inputs if i.name == "injury_type")
+    for injuries, expected in (
+        ("", "None - General Recovery"),
+        ("pain in left knee", "Knee Injury"),
+        ("tight hamstrings", "Hamstring Strain"),
+        ("ACL reconstruction", "Post-Surgery Recovery"),
+        ("tired legs", "Muscle Strain"),
+    ):
+        inputs = pack_inputs(dict(PROFILE, injuries=injuries))["tab2"]
+        assert inputs["injury_type"] == expected
+        assert expected in options
+        assert injuries in inputs["activity_level"]
+
+
+def test_workout_screens_injuries():
+    module = COACHING_MODULES["tab1"]
+    healthy = offline_text(module, module.defaults())
+    injured = offline_text(module, dict(module.defaults(), injuries="sore knee"))
+    assert prescribed(healthy, avoided("knee"))
+    assert prescribed(injured, avoided("knee")) == []
+    assert "knee were left out" in injured
+
+
+def test_mobility_screens_injuries():
+    module = COACHING_MODULES["tab10"]
+    text = offline_text(module, dict(module.defaults(), injury_history_mobility="old shoulder injury"))
+    assert prescribed(text, avoided("shoulder")) == []
+
+
+def test_program_week_follows_its_targets():
+    module = COACHING_MODULES["tab1"]
+    inputs = module.defaults()
+    week = build_program(inputs["fitness_level"], inputs["training_days"], inputs["session_duration"], 8)[3]
+    text = offline_text(module, dict(inputs, program_weeks=8, week=4))
+    assert f"RPE {week.rpe}, {week.sets} working sets of {week.reps} reps" in text
+
+
+def test_nutrition_meals_add_up_to_the_target():
+    module = COACHING_MODULES["tab4"]
+    text = offline_text(module, module.defaults())
+    calories = [int(line.split("|")[2]) for line in text.splitlines()
+                if line.startswith("| ") and line.split("|")[2].strip().isdigit()]
+    target = int(text.split("Daily plan: ")[1].split(" kcal")[0].replace(",", ""))
+    assert abs(sum(calories) - target) <= len(calories)
+
+
+def test_hydration_adds_electrolytes_for_long_hot_sessions():
+    module = COACHING_MODULES["tab7"]
+    inputs = dict(module.defaults(), training_duration=120, climate="Hot (30°C+)", sweat_rate="Very High")
+    text = offline_text(module, inputs)
+    assert "sodium" in text
+    assert "shade" in text
@@ -0,0 +1,183 @@
+import threading
+import time
+
+import pytest
+
+from rate_limiter import (
+    PRIORITY_BATCH, PRIORITY_INTERACTIVE, RateLimiter, TokenBucket, backoff_delay, is_retryable,
+)
+
+
+class ApiError(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def stall(limiter):
+    """Empty the request bucket and stop it refilling, so every acquire queues."""
+    with limiter._cond:
+        limiter.requests.level = 0
+        limiter.requests.rate = 1e-9
+        limiter.requests.updated = time.monotonic()
+
+
+def release(limiter, per_second=10):
+    """Let exactly one queued call through now and the next one 1/per_second later."""
+    with limiter._cond:
+        limiter.requests.level = 1
+        limiter.requests.rate = per_second
+        limiter.requests.updated = time.monotonic()
+        limiter._cond.notify_all()
+
+
+def queue_calls(limiter, calls):
+    """Queue (session_id, priority) acquires in order; returns the threads and the admission order."""
+    admitted = []
+    threads = []
+
+    def acquire(session_id, priority):
+        limiter.acquire(session_id, 1, priority)
+        admitted.append(session_id)
+
+    for session_id, priority in calls:
+        thread = threading.Thread(target=acquire, args=(session_id, priority))
+        thread.start()
+        threads.append(thread)
+        depth = len(threads)
+        wait_until(lambda: limiter.stats()["queue_depth"] == depth)
+    return threads, admitted
+
+
+def test_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(60)
+    bucket.take(60)
+    bucket.refill(bucket.updated + 10)
+    assert bucket.level == pytest.approx(10)
+    bucket.refill(bucket.updated + 600)
+    assert bucket.level == 60
+
+
+def test_bucket_wait_time():
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0.0
+    bucket.take(60)
+    assert bucket.wait_time(6) == pytest.approx(6)
+    # Bigger than the bucket: only wait for a full bucket.
+    assert bucket.wait_time(600) == pytest.approx(60)
+
+
+def test_settle_charges_and_refunds_the_difference():
+    limiter = RateLimiter(tokens_per_minute=10_000)
+    limiter.acquire("s", 1_000)
+    level = limiter.tokens.level
+    limiter.settle(1_000, 1_500)
+    assert limiter.tokens.level == pytest.approx(level - 500)
+    limiter.settle(1_000, 400)
+    assert limiter.tokens.level == pytest.approx(level + 100)
+
+
+def test_token_budget_delays_admission():
+    limiter = RateLimiter(tokens_per_minute=6_000)
+    limiter.acquire("s", 6_000)
+    # 100 tokens/s refill: the next 50 tokens need about half a second.
+    assert limiter.acquire("s", 50) == pytest.approx(0.5, abs=0.15)
+
+
+def test_higher_priority_goes_first():
+    limiter = RateLimiter(requests_per_minute=600)
+    stall(limiter)
+    threads, admitted = queue_calls(limiter, [("batch", PRIORITY_BATCH), ("interactive", PRIORITY_INTERACTIVE)])
+    release(limiter)
+    for thread in threads:
+        thread.join(2)
+    assert admitted == ["interactive", "batch"]
+
+
+def test_quiet_session_goes_before_busy_one_at_same_priority():
+    limiter = RateLimiter(requests_per_minute=600)
+    for _ in range(3):
+        limiter.acquire("busy", 1)
+    stall(limiter)
+    threads, admitted = queue_calls(limiter, [("busy", PRIORITY_INTERACTIVE), ("quiet", PRIORITY_INTERACTIVE)])
+    release(limiter)
+    for thread in threads:
+        thread.join(2)
+    assert admitted == ["quiet", "busy"]
+
+
+def test_same_session_same_priority_is_first_come_first_served():
+    limiter = RateLimiter(requests_per_minute=600)
+    stall(limiter)
+    threads, admitted = queue_calls(limiter, [("a", PRIORITY_BATCH), ("b", PRIORITY_BATCH)])
+    release(limiter)
+    for thread in threads:
+        thread.join(2)
+    assert admitted == ["a", "b"]
+    assert limiter.stats()["admitted"] == 2
+
+
+def test_retries_retryable_errors_and_counts_attempts():
+    limiter = RateLimiter(base_delay=0.001, max_delay=0.001)
+    errors = [ApiError("slow down", code=429), ApiError("unavailable", code=503)]
+
+    def fn():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert limiter.call(fn, "s", 10) == ("ok", 3)
+    stats = limiter.stats()
+    assert stats["retries"] == 2
+    assert stats["failures"] == 0
+    assert stats["admitted"] == 3
+
+
+def test_non_retryable_error_is_raised_at_once():
+    limiter = RateLimiter(base_delay=0.001, max_delay=0.001)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise ApiError("API key not valid", code=400)
+
+    with pytest.raises(ApiError) as raised:
+        limiter.call(fn, "s", 10)
+    assert raised.value.attempts == 1
+    assert len(calls) == 1
+    assert limiter.stats()["failures"] == 1
+
+
+def test_gives_up_after_max_attempts():
+    limiter = RateLimiter(max_attempts=3, base_delay=0.001, max_delay=0.001)
+
+    def fn():
+        raise ApiError("server error", code=500)
+
+    with pytest.raises(ApiError) as raised:
+        limiter.call(fn, "s", 10)
+    assert raised.value.attempts == 3
+    stats = limiter.stats()
+    assert stats["retries"] == 2
+    assert stats["failures"] == 1
+
+
+def test_is_retryable():
+    assert is_retryable(ApiError("x", code=429))
+    assert is_retryable(ApiError("x", code="503"))
+    assert is_retryable(ApiError("Resource has been exhausted (e.g. check quota)."))
+    assert is_retryable(ValueError("429 Too Many Requests"))
+    assert not is_retryable(ApiError("bad request", code=400))
+    assert not is_retryable(ValueError("API key not valid"))
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(1, 10):
+        assert 0 <= backoff_delay(attempt, base_delay=1.0, max_delay=4.0) <= min(4.0, 2 ** (attempt - 1))
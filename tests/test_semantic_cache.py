@@ -0,0 +1,51 @@
+import pytest
+
+from response_cache import ResponseCache, make_cache_key
+from semantic_cache import SemanticCache
+
+FIELDS = {"tab1": ("injuries",), "tab4": ("allergies",)}
+SETTINGS = (0.7, 0.9, 40, None)
+
+
+def cached(tab, field, stored, asked):
+    """What a lookup for ``asked`` returns after ``stored`` was answered."""
+    cache = ResponseCache()
+    semantic = SemanticCache(FIELDS)
+    inputs = {"sport": "Football", field: stored}
+    key = make_cache_key(tab, inputs, *SETTINGS)
+    cache.set(key, "plan for " + stored)
+    semantic.add(tab, inputs, *SETTINGS, key)
+    return semantic.lookup(cache, tab, {"sport": "Football", field: asked}, *SETTINGS)
+
+
+def test_rewording_hits():
+    assert cached("tab1", "injuries", "sprained ankle", "ankle sprain") == "plan for sprained ankle"
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("hamstring strain", "hamstring strain and knee pain"),
+    ("pain in left knee", "pain in right knee"),
+    ("nut allergy", "no nut allergy"),
+])
+def test_different_injuries_miss(stored, asked):
+    assert cached("tab1", "injuries", stored, asked) is None
+
+
+def test_different_allergies_miss():
+    assert cached("tab4", "allergies", "lactose intolerance, peanut allergy",
+                  "lactose intolerance, tree nut allergy") is None
+
+
+def test_reordered_allergies_hit():
+    assert cached("tab4", "allergies", "peanut allergy, lactose intolerance",
+                  "lactose intolerant and peanut allergic") is not None
+
+
+def test_structured_inputs_must_match():
+    cache = ResponseCache()
+    semantic = SemanticCache(FIELDS)
+    inputs = {"sport": "Football", "injuries": "sore knee"}
+    key = make_cache_key("tab1", inputs, *SETTINGS)
+    cache.set(key, "plan")
+    semantic.add("tab1", inputs, *SETTINGS, key)
+    assert semantic.lookup(cache, "tab1", dict(inputs, sport="Cricket"), *SETTINGS) is None
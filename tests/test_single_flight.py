@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def start_leader(flight, key, fn):
+    """Run flight.do in a thread; returns (thread, outcome) where outcome gets "result" or "error"."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = flight.do(key, fn)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    wait_until(lambda: flight.in_flight(key))
+    return thread, outcome
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return "text"
+
+    leader, leader_outcome = start_leader(flight, "k", fn)
+    follower, follower_outcome = start_leader(flight, "k", fn)
+    wait_until(lambda: flight.stats()["coalesced"] == 1)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+    assert leader_outcome == follower_outcome == {"result": "text"}
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader, _ = start_leader(flight, "slow", lambda: release.wait(2))
+    assert flight.do("fast", lambda: "fast") == "fast"
+    release.set()
+    leader.join(2)
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = ValueError("API key not valid")
+
+    def fn():
+        release.wait(2)
+        raise error
+
+    leader, leader_outcome = start_leader(flight, "k", fn)
+    follower, follower_outcome = start_leader(flight, "k", fn)
+    wait_until(lambda: flight.stats()["coalesced"] == 1)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+    assert leader_outcome["error"] is error
+    assert follower_outcome["error"] is error
+    assert flight.stats()["errors"] == 1
+    assert not flight.in_flight("k")
+
+
+def test_key_is_free_again_after_a_call():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    # Neither results nor errors are remembered once the call has finished.
+    assert flight.do("k", lambda: "second") == "second"
+    assert flight.stats()["leaders"] == 2
+
+
+def test_waiter_times_out_but_leader_finishes():
+    flight = SingleFlight(timeout_seconds=0.05)
+    release = threading.Event()
+
+    def fn():
+        release.wait(2)
+        return "text"
+
+    leader, leader_outcome = start_leader(flight, "k", fn)
+    with pytest.raises(TimeoutError):
+        flight.do("k", fn)
+    assert flight.stats()["timeouts"] == 1
+    release.set()
+    leader.join(2)
+    assert leader_outcome == {"result": "text"}
+    assert not flight.in_flight("k")
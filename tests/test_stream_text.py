@@ -0,0 +1,78 @@
+import pytest
+
+from generation import stream_text
+from rate_limiter import RateLimiter
+
+
+class ApiError(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class Response:
+    def __init__(self, text, broken=False):
+        self.text = text
+        self.broken = broken
+
+    def __iter__(self):
+        for word in self.text.split():
+            yield Chunk(word + " ")
+            if self.broken:
+                raise ConnectionError("stream reset")
+
+
+def limited_send(outcomes):
+    """send(stream) through a real limiter; ``outcomes`` gives each attempt's response or error."""
+    limiter = RateLimiter(requests_per_minute=10_000, base_delay=0, max_delay=0)
+    calls = []
+
+    def request(stream):
+        calls.append(stream)
+        outcome = outcomes(stream)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return (lambda stream: limiter.call(lambda: request(stream), "s", 1)), calls
+
+
+def test_streams_text():
+    send, calls = limited_send(lambda stream: Response("a b c"))
+    seen = []
+    text, _, attempts, ttft_ms = stream_text(send, seen.append)
+    assert (text, attempts, calls) == ("a b c ", 1, [True])
+    assert seen[-1] == "a b c " and ttft_ms is not None
+
+
+def test_broken_stream_falls_back_to_one_blocking_call():
+    send, calls = limited_send(lambda stream: Response("a b c", broken=stream))
+    text, _, attempts, ttft_ms = stream_text(send, lambda text: None)
+    assert (text, attempts, ttft_ms, calls) == ("a b c", 2, None, [True, False])
+
+
+def test_unsupported_stream_falls_back():
+    send, calls = limited_send(lambda stream: ApiError("streaming unsupported", 400) if stream else Response("x"))
+    assert stream_text(send, lambda text: None)[2] == 2
+    assert calls == [True, False]
+
+
+def test_exhausted_retries_are_not_repeated_without_streaming():
+    send, calls = limited_send(lambda stream: ApiError("429 quota exceeded", 429))
+    with pytest.raises(ApiError) as raised:
+        stream_text(send, lambda text: None)
+    assert calls == [True] * 5
+    assert raised.value.attempts == 5
+
+
+def test_failed_fallback_counts_both_attempts():
+    send, calls = limited_send(lambda stream: ApiError("bad request", 400))
+    with pytest.raises(ApiError) as raised:
+        stream_text(send, lambda text: None)
+    assert calls == [True, False]
+    assert raised.value.attempts == 2
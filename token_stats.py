@@ -0,0 +1,62 @@
+import math
+import threading
+
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Cheap local estimate used when the API does not report usage."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_prompt_tokens(model, prompt):
+    try:
+        return model.count_tokens(prompt).total_tokens
+    except Exception:
+        return estimate_tokens(prompt)
+
+
+def response_usage(model, prompt, response, text):
+    """(input_tokens, output_tokens) for a finished response.
+
+    Gemini reports exact counts in usage_metadata; count_tokens is only
+    called when that is missing so the common path adds no round trip.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    input_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    if not input_tokens:
+        input_tokens = count_prompt_tokens(model, prompt)
+    if not output_tokens:
+        output_tokens = estimate_tokens(text)
+    return input_tokens, output_tokens
+
+
+class TokenStats:
+    """Per-tab input/output token totals, shared by every session in the process."""
+
+    def __init__(self):
+        self._tabs = {}
+        self._lock = threading.Lock()
+
+    def record(self, tab, input_tokens, output_tokens):
+        with self._lock:
+            entry = self._tabs.setdefault(tab, {"calls": 0, "input": 0, "output": 0})
+            entry["calls"] += 1
+            entry["input"] += input_tokens
+            entry["output"] += output_tokens
+
+    def rows(self, labels=None):
+        labels = labels or {}
+        with self._lock:
+            return [
+                {
+                    "Module": labels.get(tab, tab),
+                    "Calls": entry["calls"],
+                    "Avg Input Tokens": round(entry["input"] / entry["calls"]),
+                    "Avg Output Tokens": round(entry["output"] / entry["calls"]),
+                    "Total Tokens": entry["input"] + entry["output"],
+                }
+                for tab, entry in self._tabs.items()
+            ]